@@ -1,31 +1,147 @@
-from flask import Flask, request, jsonify, send_file
-from mysql_database import connect, add_product, get_all_products, get_product_by_barcode, adjust_product_quantity, create_product_group, get_all_product_groups, update_product_group, delete_product_group
-from inventory_importer import import_inventory_from_excel
-from time_log import get_time_logs,get_filtered_logs
-from exporter_timelog import export_logs_to_excel
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
+from mysql_database import get_pool_stats, PRODUCT_FIELDS, LOG_FIELDS
+from scan_engine import get_scan_stats
+from storage import get_backend, PRODUCT_NOT_FOUND
+from jobs import submit_job, get_job, get_job_file, list_jobs, cancel_job, JobQueueFull
+import job_tasks  # noqa: F401 - mendaftarkan job import/export/delete
+from time_log import get_time_logs,get_filtered_logs,get_time_logs_page,iter_time_logs,delete_time_logs
+from pagination import parse_limit, parse_fields
+from product_cache import product_cache
+from exporter_timelog import stream_logs_to_excel
+from export_formats import FORMATS, PRODUCT_COLUMNS, LOG_COLUMNS, parquet_available
 from exporter_products import export_products_to_excel
-from manage_staff import get_all_staff, add_staff, update_staff, delete_staff
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.exceptions import BadRequest
+from werkzeug.utils import secure_filename
+from auth_tokens import issue_token, verify_token, refresh_token, revoke_token, token_from_header, TokenError
+from functools import wraps
+import change_version
+import hashlib
 import os
 import logging
 import re
-import io
-import pandas as pd
+import time
+import uuid
 from datetime import datetime,timedelta
 from flask_cors import CORS
+from app_logging import setup_logging
+from json_provider import install_json_provider
+from compression import init_compression, etag_variants
+from metrics import init_metrics, record_rows, track_rows
 
+# Pasang handler antrian sebelum app.logger dibuat supaya Flask
+# tidak menambahkan handler stderr bawaannya
+setup_logging()
+
+# Backend penyimpanan untuk operasi inti (PINVENTORY_STORAGE=mysql|sqlite)
+backend = get_backend()
 
 app = Flask(__name__)
 CORS(app)
+install_json_provider(app)
+init_compression(app)
+# Sebelum authenticate: request yang ditolak 401 tetap tercatat
+init_metrics(app)
 
 app.logger.setLevel(logging.INFO)
 
+# --- AUTH ---
+# Kalau True, semua endpoint /api (kecuali health & login) wajib membawa token.
+# Default False supaya klien lama tanpa token tetap jalan.
+REQUIRE_AUTH = os.environ.get('PINVENTORY_REQUIRE_AUTH', '').lower() in ('1', 'true', 'yes')
+PUBLIC_ENDPOINTS = {'health', 'login', 'api_refresh_token', 'api_metrics'}
+ADMIN_ROLES = tuple(os.environ.get('PINVENTORY_ADMIN_ROLES', 'admin,supervisor').split(','))
+
+def warn_if_auth_disabled():
+    """Tanpa REQUIRE_AUTH, require_role tidak menolak siapa pun: ingatkan saat start."""
+    if not REQUIRE_AUTH:
+        app.logger.warning(
+            "PINVENTORY_REQUIRE_AUTH tidak aktif: endpoint khusus role %s (staff, import, "
+            "hapus log massal) terbuka tanpa token. Set PINVENTORY_REQUIRE_AUTH=1 setelah "
+            "semua klien mengirim token.", ', '.join(ADMIN_ROLES)
+        )
+
+warn_if_auth_disabled()
+
+@app.before_request
+def authenticate():
+    g.user = None
+    if request.method == 'OPTIONS' or request.endpoint in PUBLIC_ENDPOINTS:
+        return None
+
+    token = token_from_header(request.headers.get('Authorization'))
+    if token is None:
+        if REQUIRE_AUTH:
+            return jsonify(success=False, message='Token wajib disertakan'), 401
+        return None
+
+    # Verifikasi HMAC saja, tanpa hash password maupun query ke tabel users
+    try:
+        g.user = verify_token(token)
+    except TokenError as e:
+        return jsonify(success=False, message=str(e)), 401
+    return None
+
+def require_role(*roles):
+    """
+    Batasi endpoint ke role tertentu, memakai role yang tersimpan di token.
+    Hanya berlaku kalau REQUIRE_AUTH aktif: tanpa itu klien anonim boleh
+    lewat, jadi pemegang token role lain juga tidak boleh ditolak (kalau
+    tidak, login justru mengurangi akses).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not REQUIRE_AUTH:
+                return fn(*args, **kwargs)
+            if g.user is None:
+                return jsonify(success=False, message='Token wajib disertakan'), 401
+            if g.user.get('role') not in roles:
+                return jsonify(success=False, message='Akses ditolak untuk role ini'), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def conditional(scope):
+    """
+    ETag kuat dari versi data `scope` dan URL request. Kalau klien mengirim
+    If-None-Match yang cocok, jawab 304 tanpa query dan tanpa serialisasi.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            url_hash = hashlib.sha1(request.full_path.encode()).hexdigest()[:16]
+            etag = f"{change_version.current(scope)}-{url_hash}"
+            # Cocokkan juga ETag representasi gzip/br yang dikirim compress_response
+            matched = next((tag for tag in etag_variants(etag) if tag in request.if_none_match), None)
+            if matched:
+                response = Response(status=304)
+                response.set_etag(matched)
+                response.vary.add('Accept-Encoding')
+                return response
+
+            response = app.make_response(fn(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator
+
 # --- HEALTH CHECK ---
 @app.route('/api/health', methods=['GET'])
 def health():
     return jsonify(status='ok')
 
+@app.route('/api/db/pool', methods=['GET'])
+def api_pool_stats():
+    if backend.name != 'mysql':
+        return jsonify(success=False, message='Pool koneksi hanya ada di backend MySQL'), 501
+    return jsonify(get_pool_stats())
+
+@app.route('/api/cache/products', methods=['GET'])
+def api_product_cache_stats():
+    return jsonify(product_cache.stats())
+
 def is_password_hashed(password):
     return bool(re.match(r'^(\$2[aby]|pbkdf2:)', password))
 
@@ -40,17 +156,8 @@ def login():
         if not username_input or not password_input:
             return jsonify({'success': False, 'message': 'Username dan password wajib diisi'}), 400
 
-        conn = connect()
-        if conn is None:
-            return jsonify({'success': False, 'message': 'Gagal koneksi ke database'}), 500
-
-        cursor = conn.cursor()
-        cursor.execute("SELECT username, password, role, phone FROM users WHERE username = %s", (username_input,))
-        user = cursor.fetchone()
-
+        user = backend.get_user(username_input)
         if not user:
-            cursor.close()
-            conn.close()
             return jsonify({'success': False, 'message': 'User tidak ditemukan'}), 404
 
         username_db = user['username'].strip()
@@ -66,33 +173,79 @@ def login():
         else:
             password_valid = (password_db == password_input)
             if password_valid:
-                new_password_hash = generate_password_hash(password_input)
-                cursor.execute("UPDATE users SET password = %s WHERE username = %s", (new_password_hash, username_db))
-                conn.commit()
-
-        cursor.close()
-        conn.close()
+                backend.set_user_password(username_db, generate_password_hash(password_input))
 
         if not password_valid:
             return jsonify({'success': False, 'message': 'Password salah'}), 401
 
+        token, claims = issue_token(username_db, role)
+
         return jsonify({
             'success': True,
             'message': 'Login berhasil',
             'role': role,
             'username': username_db,
-            'phone': phone
+            'phone': phone,
+            'token': token,
+            'expires_at': claims['exp']
         }), 200
 
     except Exception as e:
-        app.logger.error(f"Login error: {e}")
+        app.logger.error("Login error: %s", e)
         return jsonify({'success': False, 'message': 'Internal Server Error'}), 500
 
+@app.route('/api/token/refresh', methods=['POST'])
+def api_refresh_token():
+    token = token_from_header(request.headers.get('Authorization'))
+    if token is None:
+        return jsonify(success=False, message='Token wajib disertakan'), 401
+    try:
+        new_token, claims = refresh_token(token)
+    except TokenError as e:
+        return jsonify(success=False, message=str(e)), 401
+    return jsonify(success=True, token=new_token, expires_at=claims['exp'])
+
+@app.route('/api/logout', methods=['POST'])
+def api_logout():
+    if g.user is not None:
+        revoke_token(g.user)
+    return jsonify(success=True, message='Logout berhasil')
+
 # --- PRODUCTS ---
 @app.route('/api/products', methods=['GET'])
+@conditional(change_version.PRODUCTS)
 def api_list_products():
-    prods = get_all_products()
-    return jsonify(prods)
+    # Tanpa parameter paging: kembalikan seluruh katalog seperti sebelumnya
+    if not any(k in request.args for k in ('limit', 'cursor', 'fields')):
+        prods = backend.get_all_products()
+        return jsonify(prods)
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        fields = parse_fields(request.args.get('fields'), PRODUCT_FIELDS)
+        items, next_cursor = backend.get_products_page(request.args.get('cursor'), limit, fields)
+    except ValueError as ve:
+        return jsonify(success=False, message=str(ve)), 400
+
+    return jsonify(items=items, next_cursor=next_cursor)
+
+@app.route('/api/products/barcode/<string:barcode>', methods=['GET'])
+def api_product_by_barcode(barcode):
+    # Lookup scanner sebelum konfirmasi scan; dilayani dari cache produk
+    product = backend.get_product_by_barcode(barcode)
+    if product is None:
+        return jsonify(success=False, message=PRODUCT_NOT_FOUND), 404
+    return jsonify(success=True, barcode=barcode, product=product)
+
+@app.route('/api/products/changes', methods=['GET'])
+def api_product_changes():
+    # Delta sync: hanya produk yang berubah setelah cursor `since`
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        changes = backend.get_product_changes(request.args.get('since'), limit)
+    except ValueError as ve:
+        return jsonify(success=False, message=str(ve)), 400
+    return jsonify(changes)
 
 @app.route('/api/scan', methods=['POST'])
 def api_scan():
@@ -106,81 +259,106 @@ def api_scan():
         if not barcode or not action:
             return jsonify(success=False, message='Barcode dan action wajib diisi'), 400
 
-        conn = connect()
-        cursor = conn.cursor()
+        success, result = backend.apply_scan(barcode, qty, action, username)
+        if not success:
+            status = 404 if result == PRODUCT_NOT_FOUND else 400
+            return jsonify(success=False, message=result), status
 
-        prod = get_product_by_barcode(barcode)
-        if not prod:
-            return jsonify(success=False, message='Barcode not found'), 404
+        return jsonify(success=True, product=result), 200
 
-        success, result = adjust_product_quantity(conn, barcode, qty, action)
-        if not success:
-            return jsonify(success=False, message=result), 400
+    except BadRequest as br:
+        return jsonify(success=False, message=str(br)), 400
+    except Exception as e:
+        app.logger.error("Scan error: %s", e)
+        return jsonify(success=False, message='Internal Server Error'), 500
 
-        updated_prod = get_product_by_barcode(barcode)
+@app.route('/api/scan/batch', methods=['POST'])
+def api_scan_batch():
+    try:
+        data = request.get_json()
+        events = data.get('events') if isinstance(data, dict) else data
 
-        insert_log_query = """
-            INSERT INTO inventory_logs (name, barcode, qty_change, action_type, timestamp, username, current_stock)
-            VALUES (%s, %s, %s, %s, NOW(), %s, %s)
-        """
-        cursor.execute(insert_log_query, (
-            prod['name'],
-            barcode,
-            qty if action == 'in' else -qty,
-            'IN' if action == 'in' else 'OUT',
-            username,
-            updated_prod['quantity']
-        ))
+        if not isinstance(events, list) or not events:
+            return jsonify(success=False, message='Daftar events wajib diisi'), 400
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+        try:
+            results = backend.apply_scan_batch(events)
+        except ValueError as ve:
+            return jsonify(success=False, message=str(ve)), 413
 
-        return jsonify(success=True, product=updated_prod), 200
+        applied = sum(1 for r in results if r['success'])
+        return jsonify(success=True, applied=applied, failed=len(results) - applied, results=results), 200
 
     except BadRequest as br:
         return jsonify(success=False, message=str(br)), 400
     except Exception as e:
-        app.logger.error(f"Scan error: {e}")
+        app.logger.error("Batch scan error: %s", e)
         return jsonify(success=False, message='Internal Server Error'), 500
 
+@app.route('/api/scan/stats', methods=['GET'])
+def api_scan_stats():
+    return jsonify(get_scan_stats())
+
 @app.route('/api/products/import', methods=['POST'])
+@require_role(*ADMIN_ROLES)
 def api_import_inventory():
     if 'file' not in request.files:
         return jsonify(error='No file part'), 400
     file = request.files['file']
     tmp_dir = 'tmp'
     os.makedirs(tmp_dir, exist_ok=True)
-    tmp_path = os.path.join(tmp_dir, file.filename)
-    file.save(tmp_path)
 
+    # Nama file dari klien tidak dipakai sebagai path (../ bisa keluar dari tmp);
+    # hanya ekstensinya yang diambil supaya pembaca Excel/CSV tetap tahu formatnya
+    ext = os.path.splitext(secure_filename(file.filename or ''))[1].lower()
+    tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}{ext}")
+
+    # Mode streaming/async: proses sebagai job background, progress dipantau
+    # lewat GET /api/jobs/<job_id>
+    mode = request.args.get('mode', request.form.get('mode'))
+    if mode == 'stream' or _wants_async():
+        if mode == 'stream' and ext not in ('.xlsx', '.csv'):
+            return jsonify(error='Mode stream hanya mendukung file .xlsx atau .csv'), 400
+        file.save(tmp_path)
+        response = _submit_job('products_import', filepath=tmp_path,
+                               username=request.form.get('username'),
+                               mode='stream' if mode == 'stream' else 'bulk')
+        if response[1] != 202 and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return response
+
+    file.save(tmp_path)
     try:
-        count = import_inventory_from_excel(tmp_path)
+        stats = backend.import_products(tmp_path, username=request.form.get('username'))
     except Exception as e:
-        os.remove(tmp_path)
         return jsonify(error=str(e)), 500
+    finally:
+        os.remove(tmp_path)
+    return jsonify(**stats)
 
-    os.remove(tmp_path)
-    return jsonify(imported=count)
+@app.route('/api/products/import/<string:import_id>', methods=['GET'])
+def api_import_progress(import_id):
+    return api_job_status(import_id)
 
 @app.route('/api/products/export', methods=['GET'])
 def export_products():
-    products = get_all_products()
-    today_str = datetime.today().strftime('%Y-%m-%d')
-    filename = f'products_{today_str}.xlsx'
+    fmt, error = _export_format()
+    if error:
+        return error
 
-    df = pd.DataFrame(products)
+    if _wants_async():
+        return _submit_job('products_export', format=fmt)
 
-    if 'barcode' in df.columns:
-        df['barcode'] = df['barcode'].apply(lambda x: f"'{str(x)}" if pd.notnull(x) else x)
+    today_str = datetime.today().strftime('%Y-%m-%d')
+    if fmt != 'xlsx':
+        return _stream_export(track_rows(backend.iter_products(), 'export', 'products'), PRODUCT_COLUMNS, fmt, f'products_{today_str}')
 
-    if 'id' in df.columns:
-        df = df.drop(columns=['id'])
+    products = backend.get_all_products()
+    filename = f'products_{today_str}.xlsx'
 
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
+    started = time.perf_counter()
+    output = export_products_to_excel(products)
+    record_rows('export', 'products', len(products), time.perf_counter() - started)
 
     # Cek apakah request datang dari aplikasi lokal EXE (dengan flag khusus)
     save_to_downloads = request.args.get('save', 'false').lower() == 'true'
@@ -204,6 +382,23 @@ def export_products():
         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
 
+def _export_format():
+    """Ambil parameter format= (default xlsx). Kembalikan (format, response_error)."""
+    fmt = request.args.get('format', 'xlsx').lower()
+    if fmt != 'xlsx' and fmt not in FORMATS:
+        return None, (jsonify(error=f"Format tidak didukung: {fmt}. Pilih xlsx, {', '.join(FORMATS)}"), 400)
+    if fmt == 'parquet' and not parquet_available():
+        return None, (jsonify(error="Export parquet membutuhkan paket pyarrow"), 501)
+    return fmt, None
+
+def _stream_export(rows, columns, fmt, basename):
+    mimetype, ext, writer = FORMATS[fmt]
+    return Response(
+        stream_with_context(writer(rows, columns)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={basename}.{ext}'}
+    )
+
 # --- TIME LOG ---
 @app.route('/api/timelog', methods=['GET'])
 def api_timelog():
@@ -211,11 +406,21 @@ def api_timelog():
     end = request.args.get('end')
     change_type = request.args.get('type', "Semua")
 
-    logs = get_time_logs(start, end, change_type)
+    if not any(k in request.args for k in ('limit', 'cursor', 'fields')):
+        logs = get_time_logs(start, end, change_type)
+        return jsonify(logs)
 
-    return jsonify(logs)
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        fields = parse_fields(request.args.get('fields'), LOG_FIELDS)
+        items, next_cursor = get_time_logs_page(start, end, change_type, request.args.get('cursor'), limit, fields)
+    except ValueError as ve:
+        return jsonify(success=False, message=str(ve)), 400
+
+    return jsonify(items=items, next_cursor=next_cursor)
 
 @app.route('/api/timelog/delete', methods=['POST'])
+@require_role(*ADMIN_ROLES)
 def api_timelog_bulk_delete():
     try:
         data = request.get_json()
@@ -226,68 +431,58 @@ def api_timelog_bulk_delete():
         if not start_date or not end_date:
             return jsonify(success=False, message="Start date dan end date wajib diisi"), 400
 
+        if _wants_async() or data.get('async'):
+            try:
+                datetime.strptime(start_date, '%Y-%m-%d')
+                datetime.strptime(end_date, '%Y-%m-%d')
+            except ValueError:
+                return jsonify(success=False, message="Format tanggal harus 'YYYY-MM-DD'"), 400
+            return _submit_job('timelog_delete', start_date=start_date, end_date=end_date, type=log_type)
+
         # Pakai format eksklusif: >= start_date AND < end_date
-        start_datetime = f"{start_date} 00:00:00"
-        end_datetime = f"{end_date} 00:00:00"
-
-        conn = connect()
-        cursor = conn.cursor()
-
-        if log_type == "Masuk":
-            delete_query = """
-                DELETE FROM inventory_logs
-                WHERE timestamp >= %s AND timestamp < %s
-                AND qty_change > 0
-            """
-        elif log_type == "Keluar":
-            delete_query = """
-                DELETE FROM inventory_logs
-                WHERE timestamp >= %s AND timestamp < %s
-                AND qty_change < 0
-            """
-        else:  # Semua
-            delete_query = """
-                DELETE FROM inventory_logs
-                WHERE timestamp >= %s AND timestamp < %s
-            """
-
-        cursor.execute(delete_query, (start_datetime, end_datetime))
-        conn.commit()
-        rows_deleted = cursor.rowcount
-
-        cursor.close()
-        conn.close()
+        try:
+            rows_deleted = delete_time_logs(start_date, end_date, log_type)
+        except ValueError as ve:
+            return jsonify(success=False, message=str(ve)), 400
 
         return jsonify(success=True, message=f"{rows_deleted} log berhasil dihapus."), 200
 
     except Exception as e:
-        app.logger.error(f"Bulk delete timelog error: {e}")
+        app.logger.error("Bulk delete timelog error: %s", e)
         return jsonify(success=False, message="Internal Server Error"), 500
 
 
 @app.route('/api/timelog/<int:log_id>', methods=['DELETE'])
+@require_role(*ADMIN_ROLES)
 def api_timelog_delete(log_id):
     try:
-        conn = connect()
-        cursor = conn.cursor()
-
-        delete_query = "DELETE FROM inventory_logs WHERE id = %s"
-        cursor.execute(delete_query, (log_id,))
-        conn.commit()
-
-        if cursor.rowcount == 0:
-            cursor.close()
-            conn.close()
+        if not backend.delete_inventory_log(log_id):
             return jsonify(success=False, message="Log tidak ditemukan"), 404
-
-        cursor.close()
-        conn.close()
         return jsonify(success=True, message="Log berhasil dihapus"), 200
 
     except Exception as e:
-        app.logger.error(f"Delete timelog error: {e}")
+        app.logger.error("Delete timelog error: %s", e)
         return jsonify(success=False, message="Internal Server Error"), 500
 
+@app.route('/api/timelog/summary', methods=['GET'])
+def api_timelog_summary():
+    # Total masuk/keluar per hari/barcode/staff (MySQL: dari tabel rollup harian)
+    today = datetime.today().strftime('%Y-%m-%d')
+    start = request.args.get('start', today)
+    end = request.args.get('end', start)
+    group_by = request.args.get('group_by', 'day')
+
+    try:
+        summary = backend.get_movement_summary(
+            start, end, group_by,
+            barcode=request.args.get('barcode'),
+            username=request.args.get('username')
+        )
+    except ValueError as ve:
+        return jsonify(success=False, message=str(ve)), 400
+
+    return jsonify(start=start, end=end, group_by=group_by, summary=summary)
+
 @app.route('/api/timelog/export', methods=['GET'])
 def api_timelog_export():
     start = request.args.get('start')
@@ -303,18 +498,28 @@ def api_timelog_export():
     except ValueError:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
 
-    logs = get_time_logs(start, end, change_type)
-    excel_file = export_logs_to_excel(logs)
+    fmt, error = _export_format()
+    if error:
+        return error
+
+    if _wants_async():
+        return _submit_job('timelog_export', start=start, end=end, type=change_type, format=fmt)
+
+    # Baris mengalir dari cursor server-side ke writer (xlsx constant-memory,
+    # CSV, NDJSON atau Parquet) lalu dikirim ke klien per chunk
+    logs = track_rows(iter_time_logs(start, end, change_type), 'export', 'timelog')
 
     today_str = datetime.today().strftime('%d-%m-%Y')  # Changed to dd-mm-yyyy
-    filename = f'timelog_{today_str}.xlsx'
 
-    response = send_file(
-        excel_file,
-        as_attachment=True,
-        download_name=filename,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
+    if fmt != 'xlsx':
+        response = _stream_export(logs, LOG_COLUMNS, fmt, f'timelog_{today_str}')
+    else:
+        filename = f'timelog_{today_str}.xlsx'
+        response = Response(
+            stream_with_context(stream_logs_to_excel(logs)),
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
     
     # Add headers to prevent caching
     response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
@@ -323,12 +528,68 @@ def api_timelog_export():
     
     return response
 
+# --- BACKGROUND JOBS ---
+def _wants_async():
+    return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+JOBS_UNAVAILABLE = 'Job background hanya tersedia dengan PINVENTORY_STORAGE=mysql'
+
+def require_jobs(fn):
+    """Endpoint /api/jobs: 501 kalau backend tidak menjalankan job (SQLite)."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not backend.supports_jobs:
+            return jsonify(success=False, message=JOBS_UNAVAILABLE), 501
+        return fn(*args, **kwargs)
+    return wrapper
+
+def _submit_job(kind, **params):
+    if not backend.supports_jobs:
+        return jsonify(success=False, message=JOBS_UNAVAILABLE), 501
+    try:
+        job_id = submit_job(kind, **params)
+    except JobQueueFull as e:
+        return jsonify(success=False, message=str(e)), 429
+    return jsonify(success=True, job_id=job_id, state='queued', status_url=f'/api/jobs/{job_id}'), 202
+
+@app.route('/api/jobs', methods=['GET'])
+@require_jobs
+def api_list_jobs():
+    return jsonify(list_jobs())
+
+@app.route('/api/jobs/<string:job_id>', methods=['GET'])
+@require_jobs
+def api_job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify(success=False, message='Job tidak ditemukan'), 404
+    if job['has_file'] and job['state'] == 'done':
+        job['download_url'] = f'/api/jobs/{job_id}/download'
+    return jsonify(job)
+
+@app.route('/api/jobs/<string:job_id>/download', methods=['GET'])
+@require_jobs
+def api_job_download(job_id):
+    result_file = get_job_file(job_id)
+    if result_file is None:
+        return jsonify(success=False, message='File hasil job tidak tersedia'), 404
+    path, download_name, mimetype = result_file
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=download_name, mimetype=mimetype)
+
+@app.route('/api/jobs/<string:job_id>/cancel', methods=['POST'])
+@require_jobs
+def api_job_cancel(job_id):
+    if not cancel_job(job_id):
+        return jsonify(success=False, message='Job tidak ditemukan atau sudah selesai'), 404
+    return jsonify(success=True, message='Pembatalan job diminta')
+
 # --- MANAGE STAFF ---
 @app.route('/api/staff', methods=['GET', 'POST'])
+@require_role(*ADMIN_ROLES)
 def api_staff():
     try:
         if request.method == 'GET':
-            staff_data = get_all_staff()
+            staff_data = backend.get_all_staff()
             # Pastikan 'role' juga dikirim ke Flutter
             staff_list = [{'id': s['id'], 'username': s['username'], 'phone': s['phone'], 'role': s['role']} for s in staff_data]
             return jsonify(success=True, staff=staff_list)
@@ -342,17 +603,18 @@ def api_staff():
             if not username or not password:
                 return jsonify(success=False, message="Username dan password wajib diisi"), 400
 
-            success = add_staff(username, password, phone)
+            success = backend.add_staff(username, password, phone)
             if success:
                 return jsonify(success=True, message="Staff berhasil dibuat")
             else:
                 return jsonify(success=False, message="Gagal membuat staff (kemungkinan username sudah ada)"), 500
 
     except Exception as e:
-        app.logger.error(f"Staff error: {e}")
+        app.logger.error("Staff error: %s", e)
         return jsonify(success=False, message=str(e)), 500
 
 @app.route('/api/staff/<string:username>', methods=['PUT', 'DELETE'])
+@require_role(*ADMIN_ROLES)
 def api_staff_modify(username):
     try:
         if request.method == 'PUT':
@@ -364,21 +626,21 @@ def api_staff_modify(username):
             if not password and phone is None and role is None: # Sertakan role dalam validasi
                 return jsonify(success=False, message="Minimal password, phone, atau role harus diisi"), 400
 
-            success = update_staff(username, password, phone, role) # Kirim role ke fungsi update_staff
+            success = backend.update_staff(username, password, phone, role) # Kirim role ke fungsi update_staff
             if success:
                 return jsonify(success=True, message="Staff berhasil diupdate")
             else:
                 return jsonify(success=False, message="Gagal update staff"), 400
 
         elif request.method == 'DELETE':
-            success = delete_staff(username)
+            success = backend.delete_staff(username)
             if success:
                 return jsonify(success=True, message="Staff berhasil dihapus")
             else:
                 return jsonify(success=False, message="Gagal hapus staff"), 400
 
     except Exception as e:
-        app.logger.error(f"Staff modify error: {e}")
+        app.logger.error("Staff modify error: %s", e)
         return jsonify(success=False, message=str(e)), 500
 
 @app.route("/api/ai/logs", methods=["GET"])
@@ -405,23 +667,52 @@ def api_create_group():
         if not group_name:
             return jsonify(success=False, message="Nama grup wajib diisi"), 400
 
-        success = create_product_group(group_name, description, product_ids)
+        success = backend.create_product_group(group_name, description, product_ids)
         if success:
             return jsonify(success=True, message="Grup produk berhasil dibuat"), 201
         else:
             return jsonify(success=False, message="Gagal membuat grup produk"), 500
     except Exception as e:
-        app.logger.error(f"Create group error: {e}")
+        app.logger.error("Create group error: %s", e)
         return jsonify(success=False, message=str(e)), 500
 
 @app.route('/api/groups', methods=['GET'])
+@conditional(change_version.GROUPS)
 def api_get_all_groups():
     try:
-        groups = get_all_product_groups()
+        # summary=1: hanya agregat per grup tanpa join seluruh anggota
+        if request.args.get('summary', '').lower() in ('1', 'true', 'yes'):
+            return jsonify(backend.get_product_group_summaries()), 200
+        groups = backend.get_all_product_groups()
         return jsonify(groups), 200
     except Exception as e:
-        app.logger.error(f"Get all groups error: {e}")
+        app.logger.error("Get all groups error: %s", e)
+        return jsonify(success=False, message=str(e)), 500
+
+@app.route('/api/groups/<int:group_id>', methods=['GET'])
+@conditional(change_version.GROUPS)
+def api_get_group(group_id):
+    try:
+        group = backend.get_product_group(group_id)
+        if group is None:
+            return jsonify(success=False, message="Grup produk tidak ditemukan"), 404
+        return jsonify(group), 200
+    except Exception as e:
+        app.logger.error("Get group error: %s", e)
+        return jsonify(success=False, message=str(e)), 500
+
+@app.route('/api/groups/<int:group_id>/products', methods=['GET'])
+@conditional(change_version.GROUPS)
+def api_get_group_products(group_id):
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        items, next_cursor = backend.get_group_members_page(group_id, request.args.get('cursor'), limit)
+    except ValueError as ve:
+        return jsonify(success=False, message=str(ve)), 400
+    except Exception as e:
+        app.logger.error("Get group products error: %s", e)
         return jsonify(success=False, message=str(e)), 500
+    return jsonify(items=items, next_cursor=next_cursor), 200
 
 @app.route('/api/groups/<int:group_id>', methods=['PUT'])
 def api_update_group(group_id):
@@ -431,25 +722,25 @@ def api_update_group(group_id):
         new_description = data.get('description')
         new_product_ids = data.get('product_ids') # Bisa null jika tidak ingin update products
 
-        success = update_product_group(group_id, new_group_name, new_description, new_product_ids)
+        success = backend.update_product_group(group_id, new_group_name, new_description, new_product_ids)
         if success:
             return jsonify(success=True, message="Grup produk berhasil diupdate"), 200
         else:
             return jsonify(success=False, message="Gagal update grup produk atau grup tidak ditemukan"), 404
     except Exception as e:
-        app.logger.error(f"Update group error: {e}")
+        app.logger.error("Update group error: %s", e)
         return jsonify(success=False, message=str(e)), 500
 
 @app.route('/api/groups/<int:group_id>', methods=['DELETE'])
 def api_delete_group(group_id):
     try:
-        success = delete_product_group(group_id)
+        success = backend.delete_product_group(group_id)
         if success:
             return jsonify(success=True, message="Grup produk berhasil dihapus"), 200
         else:
             return jsonify(success=False, message="Gagal menghapus grup produk atau grup tidak ditemukan"), 404
     except Exception as e:
-        app.logger.error(f"Delete group error: {e}")
+        app.logger.error("Delete group error: %s", e)
         return jsonify(success=False, message=str(e)), 500
 
 if __name__ == '__main__':
@@ -459,4 +750,10 @@ if __name__ == '__main__':
         routes.append(f"{methods} {rule.rule}")
     app.logger.info("Available routes:\n" + "\n".join(routes))
 
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Server development Werkzeug (reload + debugger) hanya kalau diminta;
+    # selain itu server produksi dari serve.py
+    if os.environ.get('PINVENTORY_DEBUG', '').lower() in ('1', 'true', 'yes'):
+        app.run(host='0.0.0.0', port=5000, debug=True)
+    else:
+        from serve import run
+        run(app)
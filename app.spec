@@ -1,12 +1,19 @@
 # -*- mode: python ; coding: utf-8 -*-
 
-
+# Entry point: launcher produksi (gunicorn di Linux, waitress di Windows).
+# Worker gunicorn dan app dimuat lewat nama/import dinamis, jadi didaftarkan
+# sebagai hiddenimports.
 a = Analysis(
-    ['app.py'],
+    ['serve.py'],
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=[
+        'app',
+        'gunicorn.glogging',
+        'gunicorn.workers.gthread',
+        'waitress',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
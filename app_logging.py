@@ -0,0 +1,111 @@
+"""
+Konfigurasi logging Pinventory.
+
+- Handler asinkron: thread request hanya menaruh record ke antrian
+  (QueueHandler), penulisan ke stdout dilakukan oleh QueueListener.
+- Level per modul lewat env PINVENTORY_LOG_LEVELS, contoh:
+  "mysql_database=DEBUG,inventory_importer=WARNING".
+- Sampling untuk event berfrekuensi tinggi: panggil logger dengan
+  extra={'sample_every': N} dan hanya 1 dari N record yang ditulis.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener = None
+_queue_handler = None
+_setup_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """Loloskan 1 dari N record yang membawa atribut `sample_every` = N."""
+
+    def __init__(self):
+        super().__init__()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, 'sample_every', None)
+        if not every or every <= 1:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+        return count % every == 0
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, level = item.split('=', 1)
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level=None, module_levels=None):
+    """
+    Pasang handler antrian di root logger. Aman dipanggil berkali-kali;
+    hanya panggilan pertama yang memasang handler.
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        root = logging.getLogger()
+        root.setLevel(level or os.environ.get('PINVENTORY_LOG_LEVEL', 'INFO').upper())
+
+        levels = _parse_levels(os.environ.get('PINVENTORY_LOG_LEVELS'))
+        levels.update(module_levels or {})
+        for name, module_level in levels.items():
+            logging.getLogger(name).setLevel(module_level)
+
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        # Sampling dilakukan sebelum masuk antrian supaya record yang dibuang
+        # tidak sempat diformat sama sekali
+        _queue_handler.addFilter(SamplingFilter())
+        root.addHandler(_queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def _restart_after_fork():
+    # Thread listener tidak ikut ter-fork (gunicorn preload): tanpa listener
+    # baru, record dari worker hanya menumpuk di antrian. Antrian juga baru,
+    # supaya record induk yang belum ditulis saat fork tidak tercetak dua kali
+    global _listener, _setup_lock
+    _setup_lock = threading.Lock()
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        _queue_handler.queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def shutdown_logging():
+    """Tulis sisa record di antrian lalu hentikan listener."""
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
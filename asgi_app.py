@@ -0,0 +1,554 @@
+"""
+Mode serving async (ASGI) untuk banyak scanner sekaligus.
+
+Endpoint yang paling sering dipanggil (login, scan, products, timelog,
+groups, staff) dilayani native di event loop dengan pool aiomysql, jadi
+request yang menunggu MySQL tidak memegang thread OS. Pekerjaan CPU
+dipindah ke executor: hash password ke thread pool, pembuatan Excel ke
+process pool (offload.py). Batch scan dan penulisan admin (grup, staff)
+memakai fungsi sinkron yang sudah ada di thread pool.
+
+Route lain (import, job, summary, delta sync, token refresh, export
+non-xlsx, dll.) diteruskan ke app Flask yang sama lewat adaptor WSGI,
+jadi semua /api tetap tersedia di satu port dengan format respons yang sama.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+Hanya untuk PINVENTORY_STORAGE=mysql.
+"""
+import contextlib
+import hashlib
+import logging
+import os
+from datetime import datetime
+from functools import wraps
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.routing import Mount, Route
+from werkzeug.http import parse_accept_header, parse_etags
+
+import async_db
+import change_version
+import offload
+from app import app as flask_app, backend, REQUIRE_AUTH, ADMIN_ROLES
+from auth_tokens import issue_token, verify_token, token_from_header, TokenError
+from compression import COMPRESS_MIN_SIZE, choose_encoding, compress, etag_variants
+from json_provider import dumps_bytes
+from mysql_database import PRODUCT_FIELDS, LOG_FIELDS
+from pagination import parse_limit, parse_fields
+from storage import STORAGE_BACKEND, PRODUCT_NOT_FOUND
+from time_log import parse_date_range, format_log_row, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+if STORAGE_BACKEND != 'mysql':
+    raise RuntimeError("Mode ASGI membutuhkan PINVENTORY_STORAGE=mysql")
+
+WSGI_THREADS = int(os.environ.get('PINVENTORY_WSGI_THREADS', 10))
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+TRUTHY = ('1', 'true', 'yes')
+
+
+class _BadRequest(Exception):
+    pass
+
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise _BadRequest("Body harus berupa JSON yang valid")
+
+
+def json_response(request, obj, status=200):
+    """
+    Respons JSON dengan format dan kompresi yang sama dengan app Flask
+    (json_provider + compression), termasuk ETag per encoding.
+    """
+    body = dumps_bytes(obj) + b"\n"
+    headers = {'Vary': 'Accept-Encoding'}
+    etag = getattr(request.state, 'etag', None) if status == 200 else None
+
+    if 200 <= status < 300 and len(body) >= COMPRESS_MIN_SIZE:
+        encoding = choose_encoding(parse_accept_header(request.headers.get('accept-encoding')))
+        if encoding is not None:
+            body = compress(body, encoding)
+            headers['Content-Encoding'] = encoding
+            if etag:
+                etag = f"{etag}-{encoding}"
+    if etag:
+        headers['ETag'] = f'"{etag}"'
+    return Response(body, status, headers=headers, media_type='application/json')
+
+
+def _error(request, message, status):
+    return json_response(request, {'success': False, 'message': message}, status)
+
+
+# --- AUTH ---
+
+def _authenticate(request, roles=None):
+    """Padanan authenticate + require_role di app.py. Kembalikan (user, response_error)."""
+    token = token_from_header(request.headers.get('authorization'))
+    if token is None:
+        if REQUIRE_AUTH:
+            return None, _error(request, 'Token wajib disertakan', 401)
+        return None, None
+    try:
+        user = verify_token(token)
+    except TokenError as e:
+        return None, _error(request, str(e), 401)
+    # Sama dengan require_role: role hanya ditegakkan kalau REQUIRE_AUTH aktif
+    if roles and REQUIRE_AUTH and user.get('role') not in roles:
+        return user, _error(request, 'Akses ditolak untuk role ini', 403)
+    return user, None
+
+
+def endpoint(roles=None, public=False):
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(request):
+            if not public:
+                user, error = _authenticate(request, roles)
+                if error is not None:
+                    return error
+                request.state.user = user
+            return await fn(request)
+        return wrapper
+    return decorator
+
+
+def conditional(scope):
+    """Padanan conditional() di app.py: ETag dari versi data `scope` dan URL, 304 kalau cocok."""
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(request):
+            full_path = f"{request.url.path}?{request.url.query}"
+            url_hash = hashlib.sha1(full_path.encode()).hexdigest()[:16]
+            etag = f"{change_version.current(scope)}-{url_hash}"
+            if_none_match = parse_etags(request.headers.get('if-none-match'))
+            matched = next((tag for tag in etag_variants(etag) if tag in if_none_match), None)
+            if matched:
+                return Response(status_code=304, headers={'ETag': f'"{matched}"', 'Vary': 'Accept-Encoding'})
+            request.state.etag = etag
+            return await fn(request)
+        return wrapper
+    return decorator
+
+
+# --- HEALTH ---
+
+@endpoint(public=True)
+async def health(request):
+    return json_response(request, {'status': 'ok'})
+
+
+@endpoint()
+async def api_async_pool_stats(request):
+    return json_response(request, async_db.get_pool_stats())
+
+
+# --- LOGIN ---
+
+@endpoint(public=True)
+async def login(request):
+    try:
+        data = await _read_json(request)
+        username_input = data.get('username')
+        password_input = data.get('password')
+
+        if not username_input or not password_input:
+            return _error(request, 'Username dan password wajib diisi', 400)
+
+        user = await async_db.get_user(username_input)
+        if not user:
+            return _error(request, 'User tidak ditemukan', 404)
+
+        username_db = user['username'].strip()
+        password_db = user['password'].strip()
+        password_input = password_input.strip()
+
+        if password_db.startswith('scrypt:') or password_db.startswith('pbkdf2:'):
+            password_valid = await offload.check_password_hash(password_db, password_input)
+        else:
+            password_valid = (password_db == password_input)
+            if password_valid:
+                await async_db.set_user_password(username_db, await offload.generate_password_hash(password_input))
+
+        if not password_valid:
+            return _error(request, 'Password salah', 401)
+
+        token, claims = issue_token(username_db, user['role'])
+        return json_response(request, {
+            'success': True,
+            'message': 'Login berhasil',
+            'role': user['role'],
+            'username': username_db,
+            'phone': user['phone'],
+            'token': token,
+            'expires_at': claims['exp']
+        })
+    except Exception as e:
+        logger.error("Login error: %s", e)
+        return _error(request, 'Internal Server Error', 500)
+
+
+# --- PRODUCTS ---
+
+@endpoint()
+@conditional(change_version.PRODUCTS)
+async def api_list_products(request):
+    args = request.query_params
+    if not any(k in args for k in ('limit', 'cursor', 'fields')):
+        return json_response(request, await async_db.get_all_products())
+
+    try:
+        limit = parse_limit(args.get('limit'))
+        fields = parse_fields(args.get('fields'), PRODUCT_FIELDS)
+        items, next_cursor = await async_db.get_products_page(args.get('cursor'), limit, fields)
+    except ValueError as ve:
+        return _error(request, str(ve), 400)
+    return json_response(request, {'items': items, 'next_cursor': next_cursor})
+
+
+# --- SCAN ---
+
+@endpoint()
+async def api_scan(request):
+    try:
+        data = await _read_json(request)
+        barcode = data.get('barcode')
+        qty = int(data.get('qty', 1))
+        action = data.get('action')
+        username = data.get('username')
+
+        if not barcode or not action:
+            return _error(request, 'Barcode dan action wajib diisi', 400)
+
+        success, result = await async_db.apply_scan(barcode, qty, action, username)
+        if not success:
+            return _error(request, result, 404 if result == PRODUCT_NOT_FOUND else 400)
+        return json_response(request, {'success': True, 'product': result})
+
+    except _BadRequest as br:
+        return _error(request, str(br), 400)
+    except Exception as e:
+        logger.error("Scan error: %s", e)
+        return _error(request, 'Internal Server Error', 500)
+
+
+@endpoint()
+async def api_scan_batch(request):
+    try:
+        data = await _read_json(request)
+        events = data.get('events') if isinstance(data, dict) else data
+
+        if not isinstance(events, list) or not events:
+            return _error(request, 'Daftar events wajib diisi', 400)
+
+        # Satu transaksi besar dengan perhitungan stok di memori: tetap
+        # memakai implementasi sinkron, di thread pool
+        try:
+            results = await run_in_threadpool(backend.apply_scan_batch, events)
+        except ValueError as ve:
+            return _error(request, str(ve), 413)
+
+        applied = sum(1 for r in results if r['success'])
+        return json_response(request, {
+            'success': True, 'applied': applied, 'failed': len(results) - applied, 'results': results
+        })
+
+    except _BadRequest as br:
+        return _error(request, str(br), 400)
+    except Exception as e:
+        logger.error("Batch scan error: %s", e)
+        return _error(request, 'Internal Server Error', 500)
+
+
+# --- TIME LOG ---
+
+@endpoint()
+async def api_timelog(request):
+    args = request.query_params
+    change_type = args.get('type', "Semua")
+
+    try:
+        start_date, end_date = parse_date_range(args.get('start'), args.get('end'))
+        if not any(k in args for k in ('limit', 'cursor', 'fields')):
+            rows = await async_db.get_inventory_logs_filtered(start_date, end_date, change_type)
+            return json_response(request, [format_log_row(row) for row in rows])
+
+        limit = parse_limit(args.get('limit'))
+        fields = parse_fields(args.get('fields'), LOG_FIELDS)
+        items, next_cursor = await async_db.get_inventory_logs_page(
+            start_date, end_date, change_type, after=args.get('cursor'), limit=limit, fields=fields
+        )
+    except ValueError as ve:
+        return _error(request, str(ve), 400)
+
+    for row in items:
+        if "timestamp" in row:
+            row["timestamp"] = format_timestamp(row["timestamp"])
+    return json_response(request, {'items': items, 'next_cursor': next_cursor})
+
+
+# --- EXPORT XLSX ---
+
+async def _export_products_xlsx(request):
+    products = await async_db.get_all_products()
+    data = await offload.build_products_xlsx(products)
+    filename = f"products_{datetime.today():%Y-%m-%d}.xlsx"
+    return Response(data, media_type=XLSX_MIMETYPE, headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
+async def _export_timelog_xlsx(request):
+    args = request.query_params
+    start, end = args.get('start'), args.get('end')
+    try:
+        if start:
+            datetime.strptime(start, '%Y-%m-%d')
+        if end:
+            datetime.strptime(end, '%Y-%m-%d')
+    except ValueError:
+        return json_response(request, {'error': 'Invalid date format. Use YYYY-MM-DD'}, 400)
+
+    path = await offload.write_timelog_xlsx(start, end, args.get('type', "Semua"))
+    return FileResponse(
+        path,
+        media_type=XLSX_MIMETYPE,
+        filename=f"timelog_{datetime.today():%d-%m-%Y}.xlsx",
+        headers={'Cache-Control': 'no-cache, no-store, must-revalidate', 'Pragma': 'no-cache', 'Expires': '0'},
+        background=BackgroundTask(os.remove, path),
+    )
+
+
+class XlsxExport:
+    """
+    Export xlsx langsung dibuat di process pool. Format lain (streaming),
+    async=1 (job) dan save=true diteruskan apa adanya ke app Flask.
+    """
+
+    def __init__(self, handler, fallback):
+        self.handler = handler
+        self.fallback = fallback
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        args = request.query_params
+        if (args.get('format', 'xlsx').lower() != 'xlsx'
+                or args.get('async', '').lower() in TRUTHY
+                or args.get('save', 'false').lower() == 'true'):
+            await self.fallback(scope, receive, send)
+            return
+
+        _, response = _authenticate(request)
+        if response is None:
+            try:
+                response = await self.handler(request)
+            except Exception as e:
+                logger.error("Export xlsx error: %s", e)
+                response = _error(request, 'Internal Server Error', 500)
+        await response(scope, receive, send)
+
+
+# --- MANAGE STAFF ---
+
+@endpoint(roles=ADMIN_ROLES)
+async def api_get_staff(request):
+    try:
+        staff_data = await async_db.get_all_staff()
+    except Exception as e:
+        logger.error("Staff error: %s", e)
+        return _error(request, str(e), 500)
+    staff_list = [{'id': s['id'], 'username': s['username'], 'phone': s['phone'], 'role': s['role']} for s in staff_data]
+    return json_response(request, {'success': True, 'staff': staff_list})
+
+
+@endpoint(roles=ADMIN_ROLES)
+async def api_add_staff(request):
+    try:
+        data = await _read_json(request)
+        username = data.get('username')
+        password = data.get('password')
+
+        if not username or not password:
+            return _error(request, "Username dan password wajib diisi", 400)
+
+        # add_staff meng-hash password (PBKDF2): jalankan di thread pool
+        if await run_in_threadpool(backend.add_staff, username, password, data.get('phone')):
+            return json_response(request, {'success': True, 'message': "Staff berhasil dibuat"})
+        return _error(request, "Gagal membuat staff (kemungkinan username sudah ada)", 500)
+    except Exception as e:
+        logger.error("Staff error: %s", e)
+        return _error(request, str(e), 500)
+
+
+@endpoint(roles=ADMIN_ROLES)
+async def api_update_staff(request):
+    username = request.path_params['username']
+    try:
+        data = await _read_json(request)
+        password = data.get('password')
+        phone = data.get('phone')
+        role = data.get('role')
+
+        if not password and phone is None and role is None:
+            return _error(request, "Minimal password, phone, atau role harus diisi", 400)
+
+        if await run_in_threadpool(backend.update_staff, username, password, phone, role):
+            return json_response(request, {'success': True, 'message': "Staff berhasil diupdate"})
+        return _error(request, "Gagal update staff", 400)
+    except Exception as e:
+        logger.error("Staff modify error: %s", e)
+        return _error(request, str(e), 500)
+
+
+@endpoint(roles=ADMIN_ROLES)
+async def api_delete_staff(request):
+    try:
+        if await run_in_threadpool(backend.delete_staff, request.path_params['username']):
+            return json_response(request, {'success': True, 'message': "Staff berhasil dihapus"})
+        return _error(request, "Gagal hapus staff", 400)
+    except Exception as e:
+        logger.error("Staff modify error: %s", e)
+        return _error(request, str(e), 500)
+
+
+# --- PRODUCT GROUPS ---
+
+@endpoint()
+@conditional(change_version.GROUPS)
+async def api_get_all_groups(request):
+    try:
+        if request.query_params.get('summary', '').lower() in TRUTHY:
+            return json_response(request, await async_db.get_product_group_summaries())
+        return json_response(request, await async_db.get_all_product_groups())
+    except Exception as e:
+        logger.error("Get all groups error: %s", e)
+        return _error(request, str(e), 500)
+
+
+@endpoint()
+@conditional(change_version.GROUPS)
+async def api_get_group(request):
+    try:
+        group = await async_db.get_product_group(request.path_params['group_id'])
+    except Exception as e:
+        logger.error("Get group error: %s", e)
+        return _error(request, str(e), 500)
+    if group is None:
+        return _error(request, "Grup produk tidak ditemukan", 404)
+    return json_response(request, group)
+
+
+@endpoint()
+@conditional(change_version.GROUPS)
+async def api_get_group_products(request):
+    try:
+        limit = parse_limit(request.query_params.get('limit'))
+        items, next_cursor = await async_db.get_group_members_page(
+            request.path_params['group_id'], request.query_params.get('cursor'), limit
+        )
+    except ValueError as ve:
+        return _error(request, str(ve), 400)
+    except Exception as e:
+        logger.error("Get group products error: %s", e)
+        return _error(request, str(e), 500)
+    return json_response(request, {'items': items, 'next_cursor': next_cursor})
+
+
+@endpoint()
+async def api_create_group(request):
+    try:
+        data = await _read_json(request)
+        group_name = data.get('group_name')
+        if not group_name:
+            return _error(request, "Nama grup wajib diisi", 400)
+
+        if await run_in_threadpool(backend.create_product_group, group_name, data.get('description'), data.get('product_ids', [])):
+            return json_response(request, {'success': True, 'message': "Grup produk berhasil dibuat"}, 201)
+        return _error(request, "Gagal membuat grup produk", 500)
+    except Exception as e:
+        logger.error("Create group error: %s", e)
+        return _error(request, str(e), 500)
+
+
+@endpoint()
+async def api_update_group(request):
+    try:
+        data = await _read_json(request)
+        success = await run_in_threadpool(
+            backend.update_product_group, request.path_params['group_id'],
+            data.get('group_name'), data.get('description'), data.get('product_ids')
+        )
+        if success:
+            return json_response(request, {'success': True, 'message': "Grup produk berhasil diupdate"})
+        return _error(request, "Gagal update grup produk atau grup tidak ditemukan", 404)
+    except Exception as e:
+        logger.error("Update group error: %s", e)
+        return _error(request, str(e), 500)
+
+
+@endpoint()
+async def api_delete_group(request):
+    try:
+        if await run_in_threadpool(backend.delete_product_group, request.path_params['group_id']):
+            return json_response(request, {'success': True, 'message': "Grup produk berhasil dihapus"})
+        return _error(request, "Gagal menghapus grup produk atau grup tidak ditemukan", 404)
+    except Exception as e:
+        logger.error("Delete group error: %s", e)
+        return _error(request, str(e), 500)
+
+
+# --- APP ---
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    try:
+        await async_db.get_pool()
+    except Exception as e:
+        # Pool dibuat ulang saat request pertama; server tetap jalan
+        logger.error("Gagal membuat pool aiomysql: %s", e)
+    yield
+    await async_db.close_pool()
+    offload.shutdown()
+
+
+flask_fallback = WSGIMiddleware(flask_app, workers=WSGI_THREADS)
+
+routes = [
+    Route('/api/health', health, methods=['GET']),
+    Route('/api/db/pool/async', api_async_pool_stats, methods=['GET']),
+    Route('/api/login', login, methods=['POST']),
+    Route('/api/products', api_list_products, methods=['GET']),
+    Route('/api/products/export', XlsxExport(_export_products_xlsx, flask_fallback), methods=['GET']),
+    Route('/api/scan', api_scan, methods=['POST']),
+    Route('/api/scan/batch', api_scan_batch, methods=['POST']),
+    Route('/api/timelog', api_timelog, methods=['GET']),
+    Route('/api/timelog/export', XlsxExport(_export_timelog_xlsx, flask_fallback), methods=['GET']),
+    Route('/api/staff', api_get_staff, methods=['GET']),
+    Route('/api/staff', api_add_staff, methods=['POST']),
+    Route('/api/staff/{username:str}', api_update_staff, methods=['PUT']),
+    Route('/api/staff/{username:str}', api_delete_staff, methods=['DELETE']),
+    Route('/api/groups', api_get_all_groups, methods=['GET']),
+    Route('/api/groups', api_create_group, methods=['POST']),
+    Route('/api/groups/{group_id:int}', api_get_group, methods=['GET']),
+    Route('/api/groups/{group_id:int}', api_update_group, methods=['PUT']),
+    Route('/api/groups/{group_id:int}', api_delete_group, methods=['DELETE']),
+    Route('/api/groups/{group_id:int}/products', api_get_group_products, methods=['GET']),
+    # Semua route lain: app Flask
+    Mount('/', app=flask_fallback),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
@@ -0,0 +1,202 @@
+"""
+Akses MySQL non-blocking untuk mode ASGI (asgi_app.py) memakai aiomysql.
+
+SQL diambil dari mysql_database, scan_engine, rollups dan product_changes,
+jadi kedua mode menulis baris yang sama; yang berbeda hanya driver dan
+pool-nya. Koneksi pool berjalan dengan autocommit supaya pembacaan tidak
+menahan snapshot transaksi; penulisan membuka transaksi sendiri.
+"""
+import asyncio
+import logging
+import os
+import time
+
+import aiomysql
+
+from change_version import products_changed
+from mysql_database import (
+    DB_CONFIG, ALL_GROUPS_QUERY, ALL_GROUP_SUMMARIES_QUERY, ONE_GROUP_SUMMARY_QUERY,
+    build_group_list, format_group_summary, products_page_query, finish_products_page,
+    logs_page_query, finish_logs_page, logs_filtered_query, group_members_query,
+)
+from product_cache import product_cache
+from product_changes import INSERT_CHANGE
+from rollups import movement_statements
+from scan_engine import UPDATE_STOCK, SELECT_PRODUCT, INSERT_LOG, record_scan_time
+from storage import PRODUCT_NOT_FOUND, NEGATIVE_STOCK
+
+logger = logging.getLogger(__name__)
+
+ASYNC_POOL_CONFIG = {
+    'minsize': int(os.environ.get('PINVENTORY_ASYNC_POOL_MIN', 1)),
+    # Satu koneksi melayani satu query yang sedang berjalan, bukan satu
+    # request yang sedang menunggu: 20 koneksi cukup untuk ratusan scanner
+    'maxsize': int(os.environ.get('PINVENTORY_ASYNC_POOL_SIZE', 20)),
+    'pool_recycle': float(os.environ.get('PINVENTORY_DB_POOL_IDLE_TIMEOUT', 300)),
+}
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool():
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    host=DB_CONFIG['host'],
+                    user=DB_CONFIG['user'],
+                    password=DB_CONFIG['password'],
+                    db=DB_CONFIG['database'],
+                    charset=DB_CONFIG['charset'],
+                    cursorclass=aiomysql.DictCursor,
+                    autocommit=True,
+                    **ASYNC_POOL_CONFIG
+                )
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+def get_pool_stats():
+    if _pool is None:
+        return {'size': 0, 'free': 0, 'maxsize': ASYNC_POOL_CONFIG['maxsize']}
+    return {'size': _pool.size, 'free': _pool.freesize, 'maxsize': _pool.maxsize}
+
+
+async def _fetchall(query, params=()):
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+
+async def _fetchone(query, params=()):
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
+
+
+# --- SCAN ---
+
+async def apply_scan(barcode, qty, action, username):
+    """Padanan async scan_engine.apply_scan: satu transaksi, UPDATE bersyarat, log, rollup, delta feed."""
+    started = time.perf_counter()
+    delta = qty if action == 'in' else -qty
+    pool = await get_pool()
+    try:
+        async with pool.acquire() as conn:
+            await conn.begin()
+            try:
+                async with conn.cursor() as cursor:
+                    success, result = await _apply(cursor, barcode, delta, action, username)
+                if success:
+                    await conn.commit()
+                else:
+                    await conn.rollback()
+            except Exception:
+                await conn.rollback()
+                raise
+
+        if success:
+            # Invalidate (bukan put) setelah commit, sama dengan scan_engine
+            product_cache.invalidate(barcode)
+            products_changed()
+        return success, result
+    finally:
+        record_scan_time((time.perf_counter() - started) * 1000)
+
+
+async def _apply(cursor, barcode, delta, action, username):
+    await cursor.execute(UPDATE_STOCK, (delta, barcode, max(-delta, 0)))
+    if cursor.rowcount == 0:
+        await cursor.execute(SELECT_PRODUCT, (barcode,))
+        if await cursor.fetchone() is None:
+            return False, PRODUCT_NOT_FOUND
+        return False, NEGATIVE_STOCK
+
+    await cursor.execute(SELECT_PRODUCT, (barcode,))
+    product = await cursor.fetchone()
+
+    await cursor.execute(INSERT_LOG, (
+        product['name'],
+        barcode,
+        delta,
+        'IN' if action == 'in' else 'OUT',
+        username,
+        product['quantity'],
+    ))
+    for query, params in movement_statements([(barcode, username, delta)]):
+        await cursor.execute(query, params)
+    await cursor.execute(INSERT_CHANGE, (barcode,))
+    return True, {"name": product['name'], "quantity": product['quantity']}
+
+
+# --- PRODUK ---
+
+async def get_all_products():
+    return await _fetchall("SELECT * FROM products")
+
+
+async def get_products_page(after=None, limit=100, fields=None):
+    query, params = products_page_query(after, limit, fields)
+    return finish_products_page(await _fetchall(query, params), limit, fields)
+
+
+# --- LOG ---
+
+async def get_inventory_logs_filtered(start_date=None, end_date=None, change_type=None):
+    query, params = logs_filtered_query(start_date, end_date, change_type)
+    return await _fetchall(query, params)
+
+
+async def get_inventory_logs_page(start_date=None, end_date=None, change_type=None, after=None, limit=100, fields=None):
+    query, params = logs_page_query(start_date, end_date, change_type, after, limit, fields)
+    return finish_logs_page(await _fetchall(query, params), limit, fields)
+
+
+# --- USER ---
+
+async def get_user(username):
+    return await _fetchone("SELECT username, password, role, phone FROM users WHERE username = %s", (username,))
+
+
+async def set_user_password(username, password_hash):
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute("UPDATE users SET password = %s WHERE username = %s", (password_hash, username))
+
+
+async def get_all_staff():
+    return await _fetchall("SELECT id, username, phone, role FROM users WHERE role IN ('staff', 'supervisor')")
+
+
+# --- GRUP PRODUK ---
+
+async def get_all_product_groups():
+    return build_group_list(await _fetchall(ALL_GROUPS_QUERY))
+
+
+async def get_product_group_summaries():
+    return [format_group_summary(row) for row in await _fetchall(ALL_GROUP_SUMMARIES_QUERY)]
+
+
+async def get_product_group(group_id):
+    row = await _fetchone(ONE_GROUP_SUMMARY_QUERY, (group_id,))
+    return format_group_summary(row) if row else None
+
+
+async def get_group_members_page(group_id, after=None, limit=100):
+    query, params = group_members_query(group_id, after, limit)
+    return finish_products_page(await _fetchall(query, params), limit)
@@ -0,0 +1,162 @@
+"""
+Token sesi bertanda tangan HMAC-SHA256.
+
+Hash password (pbkdf2/scrypt) hanya dihitung saat /api/login; request lain
+cukup memverifikasi HMAC token (mikrodetik) dan membaca role dari token,
+tanpa query ke tabel users.
+
+Format token: <payload base64url>.<signature base64url>
+Payload: {"sub": username, "role": role, "iat": ..., "exp": ..., "jti": ...}
+
+Token yang dicabut (logout, refresh) disimpan di tabel revoked_tokens lewat
+backend penyimpanan, jadi berlaku di semua worker gunicorn. Setiap proses
+menyimpan salinan daftar itu dan memuat ulang paling cepat tiap
+PINVENTORY_REVOCATION_SYNC_INTERVAL detik (default 1): token yang dicabut di
+worker lain bisa masih diterima selama jeda itu. Kalau database tidak bisa
+dibaca, salinan terakhir tetap dipakai.
+
+Benchmark verifikasi:
+    python auth_tokens.py
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from storage import get_backend
+
+logger = logging.getLogger(__name__)
+
+TOKEN_TTL = int(os.environ.get('PINVENTORY_TOKEN_TTL', 12 * 3600))
+# Token yang sudah kedaluwarsa masih boleh di-refresh selama jendela ini
+REFRESH_GRACE = int(os.environ.get('PINVENTORY_TOKEN_REFRESH_GRACE', 24 * 3600))
+REVOCATION_SYNC_INTERVAL = float(os.environ.get('PINVENTORY_REVOCATION_SYNC_INTERVAL', 1.0))
+
+_secret = os.environ.get('PINVENTORY_SECRET_KEY', '').encode()
+if not _secret:
+    # Tanpa secret bersama, token hanya valid di proses ini dan hilang saat restart
+    logger.warning("PINVENTORY_SECRET_KEY tidak diset, memakai secret acak per proses")
+    _secret = secrets.token_bytes(32)
+
+_revoked = {}  # jti -> expires_at, salinan tabel revoked_tokens
+_revoked_synced_at = None
+_revoked_lock = threading.Lock()
+
+
+class TokenError(Exception):
+    """Token tidak valid, kedaluwarsa, atau sudah dicabut."""
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(payload_b64):
+    return _b64encode(hmac.new(_secret, payload_b64.encode(), hashlib.sha256).digest())
+
+
+def _revoked_tokens():
+    """Daftar cabut proses ini, dimuat ulang dari database kalau sudah basi."""
+    global _revoked, _revoked_synced_at
+    now = time.monotonic()
+    if _revoked_synced_at is not None and now - _revoked_synced_at < REVOCATION_SYNC_INTERVAL:
+        return _revoked
+    # Thread lain yang sedang memuat ulang: pakai salinan yang ada, jangan menunggu
+    if not _revoked_lock.acquire(blocking=False):
+        return _revoked
+    try:
+        try:
+            _revoked = get_backend().get_revoked_tokens()
+        except Exception as e:
+            logger.warning("Gagal memuat daftar token yang dicabut: %s", e)
+        _revoked_synced_at = now
+    finally:
+        _revoked_lock.release()
+    return _revoked
+
+
+def issue_token(username, role, ttl=TOKEN_TTL):
+    """Buat token baru. Kembalikan (token, claims)."""
+    now = int(time.time())
+    claims = {'sub': username, 'role': role, 'iat': now, 'exp': now + ttl, 'jti': secrets.token_hex(8)}
+    payload_b64 = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    return f"{payload_b64}.{_sign(payload_b64)}", claims
+
+
+def verify_token(token, allow_expired_for=0):
+    """
+    Verifikasi tanda tangan, masa berlaku, dan daftar cabut.
+    Kembalikan claims; lempar TokenError kalau tidak valid.
+    """
+    try:
+        payload_b64, signature = token.split('.', 1)
+    except (AttributeError, ValueError):
+        raise TokenError("Format token tidak valid")
+
+    if not hmac.compare_digest(signature, _sign(payload_b64)):
+        raise TokenError("Tanda tangan token tidak valid")
+
+    try:
+        claims = json.loads(_b64decode(payload_b64))
+    except ValueError:
+        raise TokenError("Payload token tidak valid")
+
+    if claims.get('exp', 0) + allow_expired_for < time.time():
+        raise TokenError("Token kedaluwarsa")
+    if claims.get('jti') in _revoked_tokens():
+        raise TokenError("Token sudah dicabut")
+    return claims
+
+
+def revoke_token(claims):
+    """Cabut token sampai masa refresh-nya habis (setelah itu tidak valid juga)."""
+    expires_at = claims['exp'] + REFRESH_GRACE
+    try:
+        get_backend().add_revoked_token(claims['jti'], expires_at)
+    except Exception as e:
+        logger.error("Gagal menyimpan token yang dicabut (hanya berlaku di proses ini): %s", e)
+    # Ditulis ke database dulu supaya sync yang berjalan bersamaan tidak menimpanya;
+    # worker lain melihatnya setelah sync berikutnya
+    with _revoked_lock:
+        _revoked[claims['jti']] = expires_at
+
+
+def refresh_token(token):
+    """Tukar token (boleh baru saja kedaluwarsa) dengan token baru; token lama dicabut."""
+    claims = verify_token(token, allow_expired_for=REFRESH_GRACE)
+    revoke_token(claims)
+    return issue_token(claims['sub'], claims['role'])
+
+
+def token_from_header(header_value):
+    if header_value and header_value.startswith('Bearer '):
+        return header_value[7:].strip()
+    return None
+
+
+if __name__ == '__main__':
+    from werkzeug.security import generate_password_hash, check_password_hash
+
+    token, _ = issue_token('bench', 'staff')
+    rounds = 20000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        verify_token(token)
+    token_us = (time.perf_counter() - started) / rounds * 1e6
+
+    pw_hash = generate_password_hash('bench-password', method='pbkdf2:sha256', salt_length=16)
+    started = time.perf_counter()
+    for _ in range(5):
+        check_password_hash(pw_hash, 'bench-password')
+    hash_us = (time.perf_counter() - started) / 5 * 1e6
+
+    print(f"verify_token        : {token_us:10.1f} us")
+    print(f"check_password_hash : {hash_us:10.1f} us")
@@ -0,0 +1,366 @@
+"""
+Benchmark Pinventory terhadap database lokal (MySQL, atau server
+kompatibel seperti MariaDB di container).
+
+Database diisi ulang dengan data sintetis, jadi arahkan ke database
+khusus benchmark lewat PINVENTORY_DB_* (nama database wajib mengandung
+"bench", kecuali memakai --force):
+
+    PINVENTORY_DB_NAME=inventory_bench python bench.py run --products 20000 --logs 500000
+    python bench.py run --only scan,timelog_query --output hasil.json
+    python bench.py compare sebelum.json sesudah.json
+
+Hasil disimpan sebagai JSON (default bench_results/<waktu>.json) supaya
+beberapa run bisa dibandingkan.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+RESULTS_DIR = 'bench_results'
+SEED_CHUNK = 5000
+BENCHMARKS = ('timelog_query', 'scan', 'export_logs', 'export_products', 'import')
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _timed(fn, *args, **kwargs):
+    """Jalankan fn dan kembalikan (hasil, detik, puncak alokasi Python dalam MB)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / (1024 * 1024)
+
+
+# --- SEED ---
+
+def _barcode(i):
+    return f"{8990000000000 + i}"
+
+
+def seed(products=20000, logs=200000, days=90):
+    """Kosongkan tabel lalu isi products dan inventory_logs sintetis."""
+    from migrations import migrate
+    from mysql_database import connect
+    from rollups import rebuild_rollups
+
+    migrate()
+    started = time.perf_counter()
+    with connect() as conn:
+        cursor = conn.cursor()
+        # grouping_products punya foreign key ke products, jadi products tidak
+        # bisa di-TRUNCATE (error 1701); DELETE ikut menghapus keanggotaan grup
+        cursor.execute("DELETE FROM products")
+        for table in ('inventory_logs', 'inventory_daily_rollups', 'product_changes'):
+            cursor.execute(f"TRUNCATE TABLE {table}")
+        conn.commit()
+
+        rows = [(f"Produk {i}", _barcode(i), 1000) for i in range(products)]
+        for start in range(0, len(rows), SEED_CHUNK):
+            cursor.executemany(
+                "INSERT INTO products (name, barcode, quantity) VALUES (%s, %s, %s)",
+                rows[start:start + SEED_CHUNK]
+            )
+            conn.commit()
+
+        rng = random.Random(42)
+        first = datetime.now() - timedelta(days=days)
+        step = days * 86400 / max(logs, 1)
+        batch = []
+        for i in range(logs):
+            product = rng.randrange(products)
+            qty = rng.choice((-3, -2, -1, 1, 2, 5))
+            batch.append((
+                f"Produk {product}", _barcode(product), qty, 'IN' if qty > 0 else 'OUT',
+                first + timedelta(seconds=i * step), f"staff{i % 20}", 1000,
+            ))
+            if len(batch) == SEED_CHUNK or i == logs - 1:
+                cursor.executemany(
+                    "INSERT INTO inventory_logs (name, barcode, qty_change, action_type, timestamp, username, current_stock) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                    batch
+                )
+                conn.commit()
+                batch = []
+        cursor.close()
+
+    rebuild_rollups()
+    return {'products': products, 'logs': logs, 'days': days,
+            'seconds': round(time.perf_counter() - started, 2)}
+
+
+# --- BENCHMARKS ---
+
+def bench_timelog_query(days=90, repeat=5):
+    """Waktu get_inventory_logs_filtered untuk beberapa rentang umum."""
+    from mysql_database import get_inventory_logs_filtered
+
+    now = datetime.now()
+    cases = {
+        'today': (now.replace(hour=0, minute=0, second=0), now, "Semua"),
+        'last_7_days': (now - timedelta(days=7), now, "Semua"),
+        'last_30_days_masuk': (now - timedelta(days=30), now, "Masuk"),
+        'all': (now - timedelta(days=days + 1), now, "Semua"),
+    }
+    results = {}
+    for name, (start, end, change_type) in cases.items():
+        timings = []
+        rows = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(get_inventory_logs_filtered(start, end, change_type))
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = {'rows': rows, 'median_ms': round(statistics.median(timings), 2),
+                         'min_ms': round(min(timings), 2)}
+    return results
+
+
+def bench_scan(products=20000, scans=5000, threads=8):
+    """
+    Throughput dan persentil latensi POST /api/scan lewat Flask test client
+    (routing, parsing JSON, transaksi database, serialisasi respons).
+    """
+    from app import app, REQUIRE_AUTH
+    from auth_tokens import issue_token
+
+    headers = {}
+    if REQUIRE_AUTH:
+        token, _ = issue_token('bench', 'admin')
+        headers['Authorization'] = f"Bearer {token}"
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    # Sisa pembagian dibagi ke thread pertama supaya total tetap `scans`
+    per_thread = [scans // threads + (1 if n < scans % threads else 0) for n in range(threads)]
+
+    def worker(seed_value, count):
+        rng = random.Random(seed_value)
+        client = app.test_client()
+        local = []
+        failed = 0
+        for i in range(count):
+            payload = {'barcode': _barcode(rng.randrange(products)), 'qty': 1,
+                       'action': 'in' if i % 2 == 0 else 'out', 'username': 'bench'}
+            started = time.perf_counter()
+            response = client.post('/api/scan', json=payload, headers=headers)
+            local.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    workers = [threading.Thread(target=worker, args=(n, per_thread[n])) for n in range(threads) if per_thread[n]]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        'scans': len(latencies), 'threads': len(workers), 'errors': sum(errors),
+        'seconds': round(seconds, 3),
+    }
+    if latencies:
+        result.update({
+            'scans_per_sec': round(len(latencies) / seconds, 1),
+            'p50_ms': round(_percentile(latencies, 50), 2),
+            'p95_ms': round(_percentile(latencies, 95), 2),
+            'p99_ms': round(_percentile(latencies, 99), 2),
+            'max_ms': round(latencies[-1], 2),
+        })
+    return result
+
+
+def bench_export_logs(days=30):
+    """export_logs_to_excel untuk log `days` hari terakhir (seperti /api/timelog/export)."""
+    from exporter_timelog import export_logs_to_excel
+    from mysql_database import get_inventory_logs_filtered
+
+    now = datetime.now()
+    logs = get_inventory_logs_filtered(now - timedelta(days=days), now, "Semua")
+    output, seconds, peak_mb = _timed(export_logs_to_excel, logs)
+    return {'rows': len(logs), 'seconds': round(seconds, 3), 'peak_mb': round(peak_mb, 1),
+            'bytes': len(output.getvalue())}
+
+
+def bench_export_products():
+    from exporter_products import export_products_to_excel
+    from mysql_database import get_all_products
+
+    products = get_all_products()
+    output, seconds, peak_mb = _timed(export_products_to_excel, products)
+    return {'rows': len(products), 'seconds': round(seconds, 3), 'peak_mb': round(peak_mb, 1),
+            'bytes': len(output.getvalue())}
+
+
+def bench_import(rows=20000):
+    """import_inventory_from_excel pada file xlsx sintetis. Mengganti isi tabel products."""
+    import pandas as pd
+    from inventory_importer import import_inventory_from_excel_with_stats
+
+    frame = pd.DataFrame({
+        'name': [f"Produk {i}" for i in range(rows)],
+        'barcode': [_barcode(i) for i in range(rows)],
+        'quantity': [1000] * rows,
+    })
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        frame.to_excel(path, index=False)
+        stats, seconds, peak_mb = _timed(import_inventory_from_excel_with_stats, path, 'bench')
+    finally:
+        os.remove(path)
+    return {'rows': rows, 'imported': stats['imported'], 'seconds': round(seconds, 3),
+            'rows_per_sec': round(stats['imported'] / seconds, 1), 'peak_mb': round(peak_mb, 1)}
+
+
+# --- RUN / COMPARE ---
+
+def _environment():
+    from mysql_database import DB_CONFIG, connect
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT VERSION() AS version")
+        server = cursor.fetchone()['version']
+        cursor.close()
+
+    return {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'database': DB_CONFIG['database'],
+        'server_version': server,
+    }
+
+
+def run(args):
+    from mysql_database import DB_CONFIG
+
+    if 'bench' not in DB_CONFIG['database'] and not args.force:
+        print(f"Database '{DB_CONFIG['database']}' akan dikosongkan. "
+              "Pakai PINVENTORY_DB_NAME=..._bench atau --force.")
+        return 2
+
+    selected = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"Benchmark tidak dikenal: {', '.join(unknown)}")
+        return 2
+
+    report = {'environment': _environment(), 'params': vars(args), 'results': {}}
+    if not args.no_seed:
+        print(f"[SEED] {args.products} produk, {args.logs} log, {args.days} hari")
+        report['seed'] = seed(args.products, args.logs, args.days)
+
+    runners = {
+        'timelog_query': lambda: bench_timelog_query(args.days, args.repeat),
+        'scan': lambda: bench_scan(args.products, args.scans, args.threads),
+        'export_logs': lambda: bench_export_logs(args.export_days),
+        'export_products': bench_export_products,
+        # Terakhir: import mengganti seluruh katalog
+        'import': lambda: bench_import(args.import_rows),
+    }
+    for name in BENCHMARKS:
+        if name in selected:
+            print(f"[BENCH] {name}")
+            report['results'][name] = runners[name]()
+            print(json.dumps(report['results'][name], indent=2))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Hasil disimpan di {output}")
+    return 0
+
+
+def _flatten(results, prefix=''):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+
+def compare(before_path, after_path):
+    """Cetak perubahan setiap metrik numerik antara dua file hasil."""
+    with open(before_path) as f:
+        before = dict(_flatten(json.load(f)['results']))
+    with open(after_path) as f:
+        after = dict(_flatten(json.load(f)['results']))
+
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+        print(f"{key:40} {old:>14} {new:>14} {change:>9}")
+    return 0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark Pinventory")
+    sub = parser.add_subparsers(dest='command')
+
+    run_parser = sub.add_parser('run')
+    run_parser.add_argument('--products', type=int, default=20000)
+    run_parser.add_argument('--logs', type=int, default=200000)
+    run_parser.add_argument('--days', type=int, default=90)
+    run_parser.add_argument('--scans', type=int, default=5000)
+    run_parser.add_argument('--threads', type=int, default=8)
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--export-days', type=int, default=30)
+    run_parser.add_argument('--import-rows', type=int, default=20000)
+    run_parser.add_argument('--only', help="daftar dipisah koma: " + ",".join(BENCHMARKS))
+    run_parser.add_argument('--no-seed', action='store_true', help="pakai data yang sudah ada")
+    run_parser.add_argument('--output')
+    run_parser.add_argument('--force', action='store_true')
+
+    compare_parser = sub.add_parser('compare')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+
+    args = parser.parse_args(argv[1:])
+    if args.command == 'run':
+        return run(args)
+    if args.command == 'compare':
+        return compare(args.before, args.after)
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
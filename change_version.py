@@ -0,0 +1,51 @@
+"""
+Penanda versi data katalog (products, groups) untuk ETag.
+
+Setiap jalur tulis memanggil bump() setelah commit. Versi adalah mtime
+(nanodetik) sebuah file kecil per scope, jadi semua worker proses di host
+yang sama melihat perubahan yang sama. bump() hanya satu os.utime dan
+current() hanya satu os.stat: tanpa query database.
+"""
+import os
+import time
+
+STATE_DIR = os.environ.get('PINVENTORY_STATE_DIR', os.path.join('tmp', 'state'))
+
+PRODUCTS = 'products'
+GROUPS = 'groups'
+
+
+def _path(scope):
+    return os.path.join(STATE_DIR, f"{scope}.version")
+
+
+def bump(*scopes):
+    """Tandai bahwa data pada scope-scope ini berubah."""
+    now = time.time_ns()
+    for scope in scopes:
+        path = _path(scope)
+        try:
+            os.utime(path, ns=(now, now))
+        except FileNotFoundError:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            open(path, 'a').close()
+            os.utime(path, ns=(now, now))
+
+
+def current(scope):
+    """Versi terkini untuk `scope`; dibuat kalau belum ada."""
+    try:
+        st = os.stat(_path(scope))
+    except FileNotFoundError:
+        bump(scope)
+        st = os.stat(_path(scope))
+    return f"{st.st_ino:x}{st.st_mtime_ns:x}"
+
+
+def products_changed():
+    # Daftar grup ikut menampilkan quantity produk, jadi ikut berubah
+    bump(PRODUCTS, GROUPS)
+
+
+def groups_changed():
+    bump(GROUPS)
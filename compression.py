@@ -0,0 +1,77 @@
+"""
+Kompresi respons sesuai Accept-Encoding (brotli kalau tersedia, lalu gzip).
+
+Hanya respons teks (JSON, CSV, NDJSON) yang ukurannya minimal
+COMPRESS_MIN_SIZE byte yang dikompresi; respons kecil tidak sebanding
+dengan biaya CPU-nya. Respons streaming (export) dilewati karena body-nya
+belum ada saat after_request berjalan.
+"""
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get('PINVENTORY_COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('PINVENTORY_GZIP_LEVEL', 6))
+# Kualitas 4-5 sudah lebih kecil dari gzip 6 dengan waktu yang sebanding;
+# kualitas 11 hanya cocok untuk aset statis
+BROTLI_QUALITY = int(os.environ.get('PINVENTORY_BROTLI_QUALITY', 4))
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html',
+}
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings):
+    """Pilih encoding dengan quality tertinggi dari header Accept-Encoding, atau None."""
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def etag_variants(etag):
+    """ETag untuk setiap representasi: representasi terkompresi punya ETag sendiri."""
+    return [etag] + [f"{etag}-{encoding}" for encoding in ENCODINGS]
+
+
+def init_compression(app):
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or response.status_code < 200 or response.status_code >= 300
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < COMPRESS_MIN_SIZE:
+            return response
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
@@ -0,0 +1,223 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Bit SERVER_STATUS_IN_TRANS dari protokol MySQL
+SERVER_STATUS_IN_TRANS = 1
+
+
+class PoolExhausted(Exception):
+    """Semua koneksi sedang dipakai dan batas overflow sudah tercapai."""
+
+
+class PooledConnection:
+    """
+    Pembungkus koneksi pymysql dari pool.
+    Semua atribut diteruskan ke koneksi asli, tapi close()
+    mengembalikan koneksi ke pool alih-alih memutuskannya.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+        self._after_commit = []
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def on_commit(self, callback):
+        """
+        Jalankan `callback` setelah commit() berikutnya berhasil. Dibuang
+        kalau transaksi di-rollback atau koneksi dikembalikan tanpa commit.
+        """
+        self._after_commit.append(callback)
+
+    def commit(self):
+        self._raw.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def rollback(self):
+        self._after_commit = []
+        self._raw.rollback()
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._after_commit = []
+        self._pool._release(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            try:
+                self._raw.rollback()
+            except Exception:
+                pass
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Pool koneksi thread-safe dengan batas ukuran.
+
+    - size: jumlah koneksi idle yang disimpan untuk dipakai ulang
+    - max_overflow: koneksi tambahan yang boleh dibuka saat pool penuh
+    - timeout: detik menunggu koneksi bebas sebelum PoolExhausted
+    - idle_timeout: koneksi idle lebih lama dari ini ditutup, bukan dipakai ulang
+    - ping_interval: koneksi idle lebih lama dari ini di-ping sebelum dipinjam
+    """
+
+    def __init__(self, creator, size=5, max_overflow=10, timeout=10.0,
+                 idle_timeout=300.0, ping_interval=30.0):
+        self._creator = creator
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+
+        self._idle = deque()  # (raw_conn, last_used)
+        self._cond = threading.Condition()
+        self._total = 0
+        self._checked_out = 0
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'discarded': 0,
+            'health_check_failed': 0,
+            'waits': 0,
+            'timeouts': 0,
+        }
+
+    # --- checkout / checkin ---
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                raw = self._take_idle()
+                if raw is not None:
+                    self._checked_out += 1
+                    self._stats['reused'] += 1
+                    return PooledConnection(self, raw)
+
+                if self._total < self.size + self.max_overflow:
+                    # Reservasi slot dulu, buat koneksi di luar lock
+                    self._total += 1
+                    self._checked_out += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolExhausted(
+                        f"Pool koneksi penuh ({self._total} koneksi dipakai)"
+                    )
+                self._stats['waits'] += 1
+                self._cond.wait(remaining)
+
+        try:
+            raw = self._creator()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats['created'] += 1
+        return PooledConnection(self, raw)
+
+    def _take_idle(self):
+        # Dipanggil dengan lock dipegang. Ambil koneksi terbaru (LIFO)
+        # agar koneksi lama yang jarang dipakai bisa kedaluwarsa.
+        now = time.monotonic()
+        while self._idle:
+            raw, last_used = self._idle.pop()
+            idle_for = now - last_used
+
+            if idle_for > self.idle_timeout:
+                self._discard(raw)
+                continue
+
+            if idle_for > self.ping_interval and not self._is_healthy(raw):
+                self._stats['health_check_failed'] += 1
+                self._discard(raw)
+                continue
+
+            return raw
+        return None
+
+    def _is_healthy(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _release(self, raw):
+        # Batalkan transaksi yang belum di-commit supaya peminjam
+        # berikutnya mulai dari keadaan bersih
+        healthy = getattr(raw, 'open', True)
+        if healthy and getattr(raw, 'server_status', 0) & SERVER_STATUS_IN_TRANS:
+            try:
+                raw.rollback()
+            except Exception:
+                healthy = False
+
+        with self._cond:
+            self._checked_out -= 1
+            if healthy and len(self._idle) < self.size:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._discard(raw)
+            self._cond.notify()
+
+    def _discard(self, raw):
+        # Dipanggil dengan lock dipegang
+        self._total -= 1
+        self._stats['discarded'] += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            conn.close()
+
+    def dispose(self):
+        """Tutup semua koneksi idle (mis. saat shutdown atau setelah fork)."""
+        with self._cond:
+            while self._idle:
+                raw, _ = self._idle.pop()
+                self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'total': self._total,
+                'checked_out': self._checked_out,
+                'idle': len(self._idle),
+                **self._stats,
+            }
@@ -0,0 +1,181 @@
+"""
+Writer streaming untuk export machine-readable (CSV, NDJSON, Parquet).
+Semua writer menerima iterator baris dict yang sama dengan export xlsx.
+
+Benchmark throughput antar format:
+    python export_formats.py [jumlah_baris]
+"""
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# (kolom, tipe) untuk setiap dataset; tipe dipakai untuk skema Parquet
+PRODUCT_COLUMNS = [('id', 'int'), ('name', 'str'), ('barcode', 'str'), ('quantity', 'int')]
+LOG_COLUMNS = [
+    ('name', 'str'), ('barcode', 'str'), ('qty_change', 'int'), ('timestamp', 'datetime'),
+    ('username', 'str'), ('current_stock', 'int'),
+]
+
+FLUSH_ROWS = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return str(value)
+
+
+def iter_csv(rows, columns):
+    """Generator bytes CSV; di-flush tiap FLUSH_ROWS baris."""
+    names = [name for name, _ in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+
+    pending = 0
+    for row in rows:
+        writer.writerow([
+            value.isoformat(sep=' ') if isinstance(value, datetime) else value
+            for value in (row.get(name) for name in names)
+        ])
+        pending += 1
+        if pending >= FLUSH_ROWS:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(rows, columns):
+    """Generator bytes NDJSON (satu objek JSON per baris)."""
+    names = [name for name, _ in columns]
+    dumps = json.JSONEncoder(default=_json_default, ensure_ascii=False, separators=(',', ':')).encode
+    lines = []
+    for row in rows:
+        lines.append(dumps({name: row.get(name) for name in names}))
+        if len(lines) >= FLUSH_ROWS:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def write_parquet(rows, columns, path, batch_size=10000):
+    """Tulis baris ke file Parquet per row group. Butuh pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'int': pa.int64(), 'str': pa.string(), 'datetime': pa.timestamp('s')}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    names = [name for name, _ in columns]
+
+    count = 0
+    with pq.ParquetWriter(path, schema, compression='snappy') as writer:
+        batch = {name: [] for name in names}
+        for row in rows:
+            for name in names:
+                batch[name].append(row.get(name))
+            count += 1
+            if count % batch_size == 0:
+                writer.write_table(pa.table(batch, schema=schema))
+                batch = {name: [] for name in names}
+        if batch[names[0]]:
+            writer.write_table(pa.table(batch, schema=schema))
+    return count
+
+
+def iter_parquet(rows, columns, chunk_size=CHUNK_SIZE):
+    """
+    Generator bytes Parquet. Footer Parquet baru ada setelah semua row group
+    ditulis, jadi file dibuat di disk sementara lalu dikirim per chunk.
+    """
+    fd, path = tempfile.mkstemp(prefix="export_", suffix=".parquet")
+    os.close(fd)
+    try:
+        write_parquet(rows, columns, path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# format -> (mimetype, ekstensi file, writer)
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv', iter_csv),
+    'ndjson': ('application/x-ndjson', 'ndjson', iter_ndjson),
+    'parquet': ('application/vnd.apache.parquet', 'parquet', iter_parquet),
+}
+
+
+# --- BENCHMARK ---
+
+def _synthetic_logs(count):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield {
+            'name': f"Produk {i % 5000}",
+            'barcode': f"{8990000000000 + i % 5000}",
+            'qty_change': (i % 7) - 3 or 1,
+            'timestamp': start + timedelta(seconds=i * 13),
+            'username': f"staff{i % 20}",
+            'current_stock': i % 500,
+        }
+
+
+def benchmark_formats(row_count=100000):
+    """Ukur rows/detik dan ukuran output tiap format untuk data log sintetis."""
+    from exporter_timelog import write_logs_xlsx
+
+    results = {}
+    writers = {name: spec[2] for name, spec in FORMATS.items()}
+    if not parquet_available():
+        writers.pop('parquet')
+
+    for name, writer in writers.items():
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in writer(_synthetic_logs(row_count), LOG_COLUMNS))
+        seconds = time.perf_counter() - started
+        results[name] = {'seconds': round(seconds, 3), 'rows_per_sec': round(row_count / seconds), 'bytes': size}
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        started = time.perf_counter()
+        write_logs_xlsx(_synthetic_logs(row_count), path)
+        seconds = time.perf_counter() - started
+        results['xlsx'] = {'seconds': round(seconds, 3), 'rows_per_sec': round(row_count / seconds),
+                           'bytes': os.path.getsize(path)}
+    finally:
+        os.remove(path)
+
+    return results
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for fmt, result in benchmark_formats(rows).items():
+        print(f"{fmt:8} {result['rows_per_sec']:>10} baris/detik  {result['seconds']:>8}s  {result['bytes']:>12} bytes")
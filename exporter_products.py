@@ -1,9 +1,11 @@
 import io
 import os
-import pandas as pd
 from datetime import datetime
 
 def export_products_to_excel(products):
+    # pandas + openpyxl baru dimuat saat export pertama, bukan saat startup
+    import pandas as pd
+
     df = pd.DataFrame(products)
 
     if 'barcode' in df.columns:
@@ -1,10 +1,23 @@
+import os
+import tempfile
 from datetime import datetime
 from io import BytesIO
-from openpyxl import Workbook
-from openpyxl.styles import NamedStyle, Font, Alignment
-from openpyxl.utils import get_column_letter
+
+LOG_HEADERS = [
+    ("Staff", 20),
+    ("Barcode", 15),
+    ("Item Name", 30),
+    ("Quantity", 10),
+    ("Type", 10),
+    ("Timestamp", 20)
+]
+STREAM_CHUNK_SIZE = 64 * 1024
 
 def export_logs_to_excel(logs):
+    from openpyxl import Workbook
+    from openpyxl.styles import NamedStyle, Font
+    from openpyxl.utils import get_column_letter
+
     output = BytesIO()
     wb = Workbook()
     ws = wb.active
@@ -38,7 +51,7 @@ def export_logs_to_excel(logs):
 
         # Parse timestamp and format as dd/mm/yyyy string
         try:
-            dt = datetime.strptime(raw_timestamp, "%Y-%m-%d %H:%M:%S")
+            dt = raw_timestamp if isinstance(raw_timestamp, datetime) else datetime.strptime(raw_timestamp, "%Y-%m-%d %H:%M:%S")
             formatted_timestamp = dt.strftime("%d/%m/%Y %H:%M:%S")
             is_valid_date = True
         except (ValueError, TypeError):
@@ -68,4 +81,66 @@ def export_logs_to_excel(logs):
 
     wb.save(output)
     output.seek(0)
-    return output
\ No newline at end of file
+    return output
+
+
+def write_logs_xlsx(rows, path):
+    """
+    Tulis baris log (timestamp datetime asli) ke file xlsx di `path` memakai
+    mode constant_memory xlsxwriter: setiap baris langsung di-flush ke disk,
+    jadi memori tetap datar berapapun jumlah barisnya.
+    Kembalikan jumlah baris yang ditulis.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        ws = workbook.add_worksheet("Time Logs")
+        header_format = workbook.add_format({'bold': True})
+        date_format = workbook.add_format({'num_format': 'dd/mm/yyyy hh:mm:ss'})
+
+        for col_idx, (header, width) in enumerate(LOG_HEADERS):
+            ws.set_column(col_idx, col_idx, width)
+            ws.write_string(0, col_idx, header, header_format)
+
+        row_idx = 0
+        for row_idx, log in enumerate(rows, start=1):
+            qty = log.get("qty_change") or 0
+            ws.write(row_idx, 0, log.get("username") or "")
+            ws.write_string(row_idx, 1, str(log.get("barcode") or ""))
+            ws.write(row_idx, 2, log.get("name") or "")
+            ws.write_number(row_idx, 3, abs(qty))
+            ws.write_string(row_idx, 4, "Masuk" if qty > 0 else "Keluar")
+
+            timestamp = log.get("timestamp")
+            if isinstance(timestamp, datetime):
+                ws.write_datetime(row_idx, 5, timestamp, date_format)
+            else:
+                ws.write_string(row_idx, 5, str(timestamp or ""))
+
+        ws.autofilter(0, 0, row_idx, len(LOG_HEADERS) - 1)
+        ws.freeze_panes(1, 0)
+    finally:
+        workbook.close()
+    return row_idx
+
+
+def stream_logs_to_excel(rows, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Generator bytes xlsx untuk dikirim sebagai response streaming.
+    Format xlsx adalah zip yang baru lengkap saat workbook ditutup, jadi
+    baris ditulis dulu ke file sementara (memori datar) lalu file itu
+    dikirim per chunk dan dihapus setelahnya.
+    """
+    fd, path = tempfile.mkstemp(prefix="timelog_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_logs_xlsx(rows, path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
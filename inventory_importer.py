@@ -1,9 +1,147 @@
-import pandas as pd
+import logging
 import os
 import time
-from mysql_database import connect, inventory_change
+from mysql_database import connect
+from product_cache import product_cache
+from change_version import products_changed
+from rollups import record_movements
+from product_changes import record_catalog_reset
+from metrics import record_rows
 
-def import_inventory_from_excel(filepath):
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ['name', 'barcode', 'quantity']
+IMPORT_CHUNK_SIZE = 5000
+STREAM_BATCH_SIZE = 2000
+
+INSERT_PRODUCTS = "INSERT INTO products (name, barcode, quantity) VALUES (%s, %s, %s)"
+# Versi streaming: barcode duplikat di batch berbeda digabung oleh unique index
+# uq_products_barcode (migrasi 002). Tanpa index itu ON DUPLICATE KEY tidak
+# pernah terpicu dan barcode ganda masuk sebagai baris baru.
+UPSERT_PRODUCTS = """
+    INSERT INTO products (name, barcode, quantity) VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+"""
+INSERT_IMPORT_LOGS = """
+    INSERT INTO inventory_logs (name, barcode, qty_change, action_type, username, current_stock)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+# Index unik yang hanya berisi kolom barcode
+UNIQUE_BARCODE_INDEX_QUERY = """
+    SELECT index_name FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'products' AND non_unique = 0
+    GROUP BY index_name
+    HAVING COUNT(*) = 1 AND MAX(column_name) = 'barcode'
+"""
+
+
+class MissingBarcodeIndex(RuntimeError):
+    """Import streaming butuh index unik pada products.barcode."""
+
+
+def clean_inventory_frame(df):
+    """
+    Bersihkan kolom name/barcode/quantity secara vectorized.
+    Baris tanpa nama/barcode atau dengan quantity bukan angka dibuang,
+    barcode duplikat digabung (nama pertama, quantity dijumlah).
+    Kembalikan (df_bersih, jumlah_baris_dibuang).
+    """
+    missing = set(REQUIRED_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"Excel harus berisi kolom: {set(REQUIRED_COLUMNS)}")
+
+    import pandas as pd
+
+    df = df[REQUIRED_COLUMNS].copy()
+    total = len(df)
+
+    df['name'] = df['name'].fillna('').astype(str).str.strip()
+    # buang tanda kutip di awal jika ada (hasil export_products)
+    df['barcode'] = df['barcode'].fillna('').astype(str).str.strip().str.lstrip("'")
+    df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce')
+
+    valid = (df['name'] != '') & (df['barcode'] != '') & df['quantity'].notna()
+    df = df[valid]
+    df['quantity'] = df['quantity'].astype('int64')
+
+    df = df.groupby('barcode', sort=False, as_index=False).agg(
+        name=('name', 'first'),
+        quantity=('quantity', 'sum'),
+    )[REQUIRED_COLUMNS]
+
+    return df, total - int(valid.sum())
+
+
+def bulk_import_inventory(df, username=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Ganti isi tabel products dengan isi `df` (sudah dibersihkan) dan tulis
+    satu log inventory per produk. INSERT dikirim per chunk lewat executemany
+    (pymysql menggabungkannya jadi INSERT multi-row), semuanya dalam satu commit.
+    Kembalikan jumlah baris yang diimport.
+    """
+    rows = list(df.itertuples(index=False, name=None))
+
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        # Hapus semua isi tabel products
+        cursor.execute("DELETE FROM products")
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            cursor.executemany(INSERT_PRODUCTS, chunk)
+            cursor.executemany(INSERT_IMPORT_LOGS, [
+                (name, barcode, quantity, 'IN', username, quantity)
+                for name, barcode, quantity in chunk
+            ])
+            record_movements(cursor, [(barcode, username, quantity) for _, barcode, quantity in chunk])
+
+        record_catalog_reset(cursor)
+        conn.commit()
+        product_cache.clear()
+        products_changed()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    return len(rows)
+
+
+def import_inventory_from_excel_with_stats(filepath, username=None):
+    """
+    Seperti import_inventory_from_excel, tapi kembalikan dict berisi
+    imported, skipped, seconds dan rows_per_sec.
+    """
+    import pandas as pd
+
+    started = time.perf_counter()
+    df = pd.read_excel(filepath, dtype={'barcode': str})
+    df, skipped = clean_inventory_frame(df)
+
+    try:
+        imported = bulk_import_inventory(df, username=username)
+    except Exception as e:
+        logger.error("Gagal import: %s", e)
+        raise
+
+    seconds = time.perf_counter() - started
+    record_rows('import', 'products', imported, seconds)
+    rows_per_sec = imported / seconds if seconds > 0 else 0.0
+    logger.info("Import selesai! %d baris (%d dilewati) dalam %.2f detik, %.0f baris/detik",
+                imported, skipped, seconds, rows_per_sec)
+
+    return {
+        'imported': imported,
+        'skipped': skipped,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows_per_sec, 1),
+    }
+
+
+def import_inventory_from_excel(filepath, username=None):
     """
     Membaca file Excel pada `filepath`,
     kosongkan tabel products,
@@ -11,61 +149,143 @@ def import_inventory_from_excel(filepath):
     dan buat log inventory untuk tiap baris.
     Kembalikan jumlah baris yang diimport.
     """
-    df = pd.read_excel(filepath)
+    return import_inventory_from_excel_with_stats(filepath, username)['imported']
+
+
+# --- STREAMING IMPORT ---
+
+def iter_file_batches(filepath, batch_size=STREAM_BATCH_SIZE):
+    """
+    Baca file .xlsx (openpyxl read-only) atau .csv (pandas chunksize)
+    baris demi baris dan hasilkan DataFrame berukuran maksimal `batch_size`.
+    Memori tetap datar berapapun ukuran file.
+    """
+    import pandas as pd
 
-    # Pastikan kolom penting ada
-    required_columns = {'name', 'barcode', 'quantity'}
-    if not required_columns.issubset(df.columns):
-        raise ValueError(f"Excel harus berisi kolom: {required_columns}")
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == '.csv':
+        yield from pd.read_csv(filepath, dtype={'barcode': str}, chunksize=batch_size)
+        return
 
-    conn = None
-    cursor = None
-    imported_rows = 0
-    total_rows = len(df)
+    from openpyxl import load_workbook
 
+    wb = load_workbook(filepath, read_only=True, data_only=True)
     try:
-        conn = connect()
-        cursor = conn.cursor()
+        ws = wb.active
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(h).strip() if h is not None else '' for h in header]
 
-        # Hapus semua isi tabel products
-        cursor.execute("DELETE FROM products")
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        wb.close()
 
-        for index, row in df.iterrows():
-            name = str(row['name']).strip()
-            barcode = str(row['barcode']).strip().lstrip("'")  # buang tanda kutip di awal jika ada
-            quantity = int(row['quantity'])
 
-            if name and barcode:
-                try:
-                    cursor.execute(
-                        "INSERT INTO products (name, barcode, quantity) VALUES (%s, %s, %s)",
-                        (name, barcode, quantity)
-                    )
-                    # Kirim cursor + conn ke inventory_change
-                    inventory_change(name, barcode, quantity, conn=conn, cursor=cursor)
+def has_unique_barcode_index(cursor):
+    cursor.execute(UNIQUE_BARCODE_INDEX_QUERY)
+    return cursor.fetchone() is not None
 
-                    imported_rows += 1
 
-                except Exception as e:
-                    print(f"[ERROR] Gagal update/insert: {name}, {barcode}, {quantity} | {e}")
+def _current_stock(cursor, barcodes):
+    """Quantity terkini per barcode, dibaca di transaksi pemanggil (setelah upsert)."""
+    placeholders = ', '.join(['%s'] * len(barcodes))
+    cursor.execute(f"SELECT barcode, quantity FROM products WHERE barcode IN ({placeholders})", barcodes)
+    return {row['barcode']: row['quantity'] for row in cursor.fetchall()}
 
-            # Progress Bar
-            progress = int((index + 1) / total_rows * 100)
-            print(f"\rImporting: {progress}% ({index + 1}/{total_rows})", end="")
 
-        conn.commit()
-        print("\nImport selesai!")
+def _catalog_replaced(conn, cursor):
+    # Klien delta sync wajib resync; dicatat lagi di akhir karena batch
+    # yang di-commit sesudah reset pertama tidak masuk product_changes
+    record_catalog_reset(cursor)
+    conn.commit()
+    product_cache.clear()
+    products_changed()
 
-    except Exception as e:
-        if conn:
+
+def stream_import_inventory(filepath, username=None, on_progress=None, batch_size=STREAM_BATCH_SIZE):
+    """
+    Import streaming: kosongkan products lalu tulis file per batch
+    (upsert products + log inventory), satu transaksi per batch supaya
+    lock baris products dilepas di antara batch dan /api/scan tidak
+    tertahan sepanjang import.
+
+    Karena itu import tidak lagi all-or-nothing: kalau batch gagal atau
+    `on_progress` melempar exception (mis. pembatalan job), katalog berisi
+    batch yang sudah di-commit dan import perlu diulang. Selama import,
+    produk yang belum sampai batch-nya belum ada di katalog.
+
+    `on_progress(processed=, imported=, skipped=)` dipanggil tiap batch.
+    Kembalikan dict statistik import. Lempar MissingBarcodeIndex kalau
+    products.barcode belum punya index unik.
+    """
+    started = time.perf_counter()
+    processed = imported = skipped = 0
+
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        if not has_unique_barcode_index(cursor):
+            raise MissingBarcodeIndex(
+                "Import streaming membutuhkan index unik products.barcode. "
+                "Jalankan `python migrations.py migrate`, atau pakai mode import biasa."
+            )
+        cursor.execute("DELETE FROM products")
+        _catalog_replaced(conn, cursor)
+
+        try:
+            for batch in iter_file_batches(filepath, batch_size):
+                processed += len(batch)
+                clean, dropped = clean_inventory_frame(batch)
+                skipped += dropped
+
+                # clean_inventory_frame menggabungkan barcode ganda dalam satu
+                # batch, jadi stok setelah upsert tepat untuk setiap baris log
+                rows = [(str(name), str(barcode), int(quantity))
+                        for name, barcode, quantity in clean.itertuples(index=False, name=None)]
+                if rows:
+                    cursor.executemany(UPSERT_PRODUCTS, rows)
+                    stock = _current_stock(cursor, [barcode for _, barcode, _ in rows])
+                    cursor.executemany(INSERT_IMPORT_LOGS, [
+                        (name, barcode, quantity, 'IN', username, stock[barcode])
+                        for name, barcode, quantity in rows
+                    ])
+                    record_movements(cursor, [(barcode, username, quantity) for _, barcode, quantity in rows])
+                    conn.commit()
+                    product_cache.clear()
+                    products_changed()
+                    imported += len(rows)
+
+                if on_progress:
+                    on_progress(processed=processed, imported=imported, skipped=skipped)
+                logger.debug("Import batch: %d baris diproses, %d diimport", processed, imported)
+        except Exception:
+            # Batch yang gagal di-rollback; batch sebelumnya sudah di-commit
             conn.rollback()
-        print(f"[ERROR] Gagal import: {e}")
+            _catalog_replaced(conn, cursor)
+            raise
+        _catalog_replaced(conn, cursor)
+    except Exception:
+        conn.rollback()
         raise
-
     finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        cursor.close()
+        conn.close()
+
+    seconds = time.perf_counter() - started
+    record_rows('import', 'products', imported, seconds)
+    return {
+        'imported': imported,
+        'skipped': skipped,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(imported / seconds, 1) if seconds > 0 else 0.0,
+    }
 
-    return imported_rows
@@ -0,0 +1,73 @@
+"""Definisi job background: import produk, export produk/timelog, hapus timelog."""
+import os
+import time
+from datetime import datetime
+from jobs import register_job
+from inventory_importer import import_inventory_from_excel_with_stats, stream_import_inventory
+from mysql_database import get_all_products, iter_products
+from time_log import iter_time_logs, delete_time_logs
+from exporter_products import export_products_to_excel
+from exporter_timelog import write_logs_xlsx
+from export_formats import FORMATS, PRODUCT_COLUMNS, LOG_COLUMNS
+from metrics import record_rows, track_rows
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _write_format(ctx, rows, columns, fmt, basename):
+    mimetype, ext, writer = FORMATS[fmt]
+    path = ctx.output_path(ext)
+    ctx.set_result_file(path, f"{basename}.{ext}", mimetype)
+    with open(path, 'wb') as f:
+        for chunk in writer(ctx.track(rows), columns):
+            f.write(chunk)
+
+
+@register_job('products_import', input_file='filepath')
+def run_products_import(ctx, filepath, username=None, mode='bulk'):
+    try:
+        if mode == 'stream':
+            def on_progress(**progress):
+                ctx.report(**progress)
+                ctx.check_cancelled()
+            return stream_import_inventory(filepath, username=username, on_progress=on_progress)
+        return import_inventory_from_excel_with_stats(filepath, username=username)
+    finally:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+
+@register_job('products_export')
+def run_products_export(ctx, format='xlsx'):
+    basename = f"products_{datetime.today():%Y-%m-%d}"
+    if format != 'xlsx':
+        _write_format(ctx, track_rows(iter_products(), 'export', 'products'), PRODUCT_COLUMNS, format, basename)
+        return {}
+
+    path = ctx.output_path('xlsx')
+    ctx.set_result_file(path, f"{basename}.xlsx", XLSX_MIMETYPE)
+    products = get_all_products()
+    ctx.report(force=True, rows=len(products))
+    started = time.perf_counter()
+    with open(path, 'wb') as f:
+        f.write(export_products_to_excel(products).getbuffer())
+    record_rows('export', 'products', len(products), time.perf_counter() - started)
+    return {'rows': len(products)}
+
+
+@register_job('timelog_export')
+def run_timelog_export(ctx, start=None, end=None, type="Semua", format='xlsx'):
+    logs = track_rows(iter_time_logs(start, end, type), 'export', 'timelog')
+    basename = f"timelog_{datetime.today():%d-%m-%Y}"
+    if format != 'xlsx':
+        _write_format(ctx, logs, LOG_COLUMNS, format, basename)
+        return {}
+
+    path = ctx.output_path('xlsx')
+    ctx.set_result_file(path, f"{basename}.xlsx", XLSX_MIMETYPE)
+    return {'rows': write_logs_xlsx(ctx.track(logs), path)}
+
+
+@register_job('timelog_delete')
+def run_timelog_delete(ctx, start_date, end_date, type="Semua"):
+    return {'deleted': delete_time_logs(start_date, end_date, type)}
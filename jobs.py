@@ -0,0 +1,382 @@
+"""
+Job runner background untuk pekerjaan berat (import, export, bulk delete).
+
+Status job disimpan di tabel `jobs` (bukan di memori) supaya bisa dipantau
+dari worker/proses mana pun. Eksekusi memakai thread pool berukuran tetap
+dengan antrian terbatas; pembatalan bersifat kooperatif lewat
+JobContext.check_cancelled().
+
+Thread pool hanya ada di proses yang menerima job (kolom owner =
+host:pid). fail_stale_jobs() menandai 'failed' job 'queued'/'running' yang
+pemiliknya di host ini sudah mati (worker crash atau restart), atau yang
+pemiliknya di host lain tidak memberi kabar selama JOB_STALE_TIMEOUT detik.
+Dipanggil dari purge_old_results() (setiap submit) dan saat status job dibaca.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from mysql_database import connect
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get('PINVENTORY_JOB_WORKERS', 2))
+JOB_MAX_PENDING = int(os.environ.get('PINVENTORY_JOB_MAX_PENDING', 20))
+JOB_OUTPUT_DIR = os.environ.get('PINVENTORY_JOB_DIR', os.path.join('tmp', 'jobs'))
+JOB_RESULT_TTL = 24 * 3600
+# Tanpa progress selama ini, job dianggap yatim (pemilik di host lain yang mati)
+JOB_STALE_TIMEOUT = int(os.environ.get('PINVENTORY_JOB_STALE_TIMEOUT', 3600))
+
+_PROGRESS_INTERVAL = 0.5
+_CANCEL_CHECK_INTERVAL = 1.0
+
+
+class JobCancelled(Exception):
+    """Dilempar di dalam job ketika pembatalan diminta."""
+
+
+class JobQueueFull(Exception):
+    """Antrian job penuh; klien sebaiknya mencoba lagi nanti."""
+
+
+class JobContext:
+    """Diberikan ke fungsi job untuk melaporkan progress dan cek pembatalan."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.result_file = None
+        self._last_report = 0.0
+        self._last_cancel_check = 0.0
+
+    def report(self, force=False, **progress):
+        now = time.monotonic()
+        if not force and now - self._last_report < _PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        _update_job(self.job_id, progress=json.dumps(progress, default=str),
+                    heartbeat_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+
+    def check_cancelled(self):
+        now = time.monotonic()
+        if now - self._last_cancel_check < _CANCEL_CHECK_INTERVAL:
+            return
+        self._last_cancel_check = now
+        if _cancel_requested(self.job_id):
+            raise JobCancelled()
+
+    def track(self, rows, every=1000):
+        """Bungkus iterator baris: lapor jumlah baris dan cek pembatalan tiap `every` baris."""
+        count = 0
+        for row in rows:
+            yield row
+            count += 1
+            if count % every == 0:
+                self.report(rows=count)
+                self.check_cancelled()
+        self.report(force=True, rows=count)
+
+    def output_path(self, ext):
+        os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+        return os.path.join(JOB_OUTPUT_DIR, f"{self.job_id}.{ext}")
+
+    def set_result_file(self, path, download_name, mimetype):
+        self.result_file = (path, download_name, mimetype)
+
+
+# --- JOB STORE (tabel jobs) ---
+
+def _update_job(job_id, **fields):
+    assignments = ', '.join(f"{column} = %s" for column in fields)
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"UPDATE jobs SET {assignments} WHERE id = %s", (*fields.values(), job_id))
+        conn.commit()
+        cursor.close()
+
+
+def _cancel_requested(job_id):
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT cancel_requested FROM jobs WHERE id = %s", (job_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    return bool(row and row['cancel_requested'])
+
+
+def get_job(job_id):
+    fail_stale_jobs(job_id)
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM jobs WHERE id = %s", (job_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    if row is None:
+        return None
+    for key in ('params', 'progress', 'result'):
+        row[key] = json.loads(row[key]) if row.get(key) else None
+    row['cancel_requested'] = bool(row['cancel_requested'])
+    row['has_file'] = bool(row.pop('result_path', None))
+    return row
+
+
+def get_job_file(job_id):
+    """Kembalikan (path, download_name, mimetype) untuk job yang selesai, atau None."""
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT result_path, result_name, result_mimetype FROM jobs WHERE id = %s AND state = 'done'",
+            (job_id,)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+    if not row or not row['result_path'] or not os.path.exists(row['result_path']):
+        return None
+    return row['result_path'], row['result_name'], row['result_mimetype']
+
+
+def list_jobs(limit=50):
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, kind, state, created_at, started_at, finished_at, error FROM jobs "
+            "ORDER BY created_at DESC LIMIT %s",
+            (limit,)
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+# --- RUNNER ---
+
+_registry = {}
+_executor = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(JOB_MAX_PENDING)
+_futures = {}
+_input_files = {}   # job_id -> file upload milik job yang masih antri/berjalan
+
+
+def register_job(kind, input_file=None):
+    """
+    Dekorator untuk mendaftarkan fungsi job: fn(ctx, **params) -> dict hasil.
+    `input_file` adalah nama parameter berisi file sementara milik job; file
+    itu dihapus runner kalau job dibatalkan sebelum sempat berjalan.
+    """
+    def decorator(fn):
+        _registry[kind] = (fn, input_file)
+        return fn
+    return decorator
+
+
+def _owner():
+    # Dihitung tiap kali: pid berubah setelah fork worker gunicorn
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner):
+    """
+    True/False kalau `owner` adalah proses di host ini (hidup/mati), None
+    kalau tidak bisa diperiksa (host lain, owner kosong, Windows).
+    """
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    if int(pid) == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill di Windows menghentikan proses, bukan memeriksa
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='job')
+        return _executor
+
+
+def submit_job(kind, **params):
+    """Masukkan job ke antrian. Kembalikan job_id; lempar JobQueueFull kalau antrian penuh."""
+    if kind not in _registry:
+        raise ValueError(f"Jenis job tidak dikenal: {kind}")
+    if not _pending.acquire(blocking=False):
+        raise JobQueueFull(f"Antrian job penuh ({JOB_MAX_PENDING})")
+
+    try:
+        job_id = uuid.uuid4().hex
+        with connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO jobs (id, kind, state, params, owner) VALUES (%s, %s, 'queued', %s, %s)",
+                (job_id, kind, json.dumps(params, default=str), _owner())
+            )
+            conn.commit()
+            cursor.close()
+        input_file = _registry[kind][1]
+        if input_file and params.get(input_file):
+            _input_files[job_id] = params[input_file]
+        _futures[job_id] = _get_executor().submit(_run_job, job_id, kind, params)
+    except Exception:
+        _input_files.pop(job_id, None)
+        _pending.release()
+        raise
+
+    purge_old_results()
+    return job_id
+
+
+def _run_job(job_id, kind, params):
+    ctx = JobContext(job_id)
+    started = False
+    try:
+        if _cancel_requested(job_id):
+            raise JobCancelled()
+        now = time.strftime('%Y-%m-%d %H:%M:%S')
+        _update_job(job_id, state='running', started_at=now, heartbeat_at=now)
+
+        started = True
+        result = _registry[kind][0](ctx, **params)
+
+        fields = {'state': 'done', 'result': json.dumps(result or {}, default=str)}
+        if ctx.result_file:
+            fields['result_path'], fields['result_name'], fields['result_mimetype'] = ctx.result_file
+        _finish(job_id, **fields)
+    except JobCancelled:
+        _finish(job_id, state='cancelled')
+        _remove_file(ctx.result_file)
+    except Exception as e:
+        logger.error("Job %s (%s) gagal: %s", job_id, kind, e)
+        _finish(job_id, state='failed', error=str(e))
+        _remove_file(ctx.result_file)
+    finally:
+        _futures.pop(job_id, None)
+        input_path = _input_files.pop(job_id, None)
+        # Fungsi job menghapus inputnya sendiri; yang berhenti sebelum sampai
+        # ke sana (dibatalkan sebelum mulai, gagal update status) dibereskan di sini
+        if not started:
+            _remove_input(input_path)
+        _pending.release()
+
+
+def _finish(job_id, **fields):
+    _update_job(job_id, finished_at=time.strftime('%Y-%m-%d %H:%M:%S'), **fields)
+
+
+def _remove_file(result_file):
+    if result_file and os.path.exists(result_file[0]):
+        os.remove(result_file[0])
+
+
+def _remove_input(path):
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning("Gagal menghapus file input job %s: %s", path, e)
+
+
+def cancel_job(job_id):
+    """
+    Minta pembatalan job. Job yang masih antri langsung dibatalkan,
+    job yang berjalan berhenti di pengecekan berikutnya.
+    Kembalikan False kalau job tidak ada atau sudah selesai.
+    """
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = %s AND state IN ('queued', 'running')",
+            (job_id,)
+        )
+        conn.commit()
+        updated = cursor.rowcount > 0
+        cursor.close()
+
+    future = _futures.get(job_id)
+    if updated and future is not None and future.cancel():
+        # Belum sempat dijalankan worker, jadi _run_job (dan pembersihan
+        # file upload di dalam fungsi job) tidak akan dipanggil
+        _futures.pop(job_id, None)
+        _remove_input(_input_files.pop(job_id, None))
+        _pending.release()
+        _finish(job_id, state='cancelled')
+    return updated
+
+
+def fail_stale_jobs(job_id=None, timeout=JOB_STALE_TIMEOUT):
+    """
+    Tandai 'failed' job queued/running yang pemiliknya sudah mati, atau yang
+    pemiliknya tidak bisa diperiksa dan tidak memberi kabar lebih dari
+    `timeout` detik, lalu hapus file inputnya.
+    Batasi ke satu job kalau `job_id` diberikan. Kembalikan jumlah job.
+    """
+    query = (
+        "SELECT id, kind, params, owner, "
+        "COALESCE(heartbeat_at, started_at, created_at) < NOW() - INTERVAL %s SECOND AS expired "
+        "FROM jobs WHERE state IN ('queued', 'running')"
+    )
+    params = [timeout]
+    if job_id is not None:
+        query += " AND id = %s"
+        params.append(job_id)
+
+    stale = []
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        for row in cursor.fetchall():
+            # Pemilik di host ini diperiksa langsung: job antri lama di
+            # worker yang masih hidup tidak boleh kena timeout
+            alive = _owner_alive(row['owner'])
+            if alive is False:
+                reason = f"Worker {row['owner']} berhenti sebelum job selesai"
+            elif alive is None and row['expired']:
+                reason = f"Tidak ada kabar dari worker {row['owner'] or '?'} selama {timeout} detik"
+            else:
+                continue
+            cursor.execute(
+                "UPDATE jobs SET state = 'failed', error = %s, finished_at = NOW() "
+                "WHERE id = %s AND state IN ('queued', 'running')",
+                (reason, row['id'])
+            )
+            if cursor.rowcount:
+                stale.append(row)
+                logger.warning("Job %s (%s): %s", row['id'], row['kind'], reason)
+        conn.commit()
+        cursor.close()
+
+    for row in stale:
+        input_file = _registry.get(row['kind'], (None, None))[1]
+        if input_file and row['params']:
+            _remove_input(json.loads(row['params']).get(input_file))
+    return len(stale)
+
+
+def purge_old_results(max_age=JOB_RESULT_TTL):
+    """Hapus file hasil job yang lebih tua dari `max_age` detik, dan tandai job yatim 'failed'."""
+    try:
+        fail_stale_jobs()
+    except Exception as e:
+        logger.warning("Pemeriksaan job yatim gagal: %s", e)
+    if not os.path.isdir(JOB_OUTPUT_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(JOB_OUTPUT_DIR):
+        path = os.path.join(JOB_OUTPUT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
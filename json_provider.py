@@ -0,0 +1,136 @@
+"""
+JSON provider Flask berbasis orjson.
+
+Format keluaran sama dengan DefaultJSONProvider bawaan Flask (datetime
+sebagai HTTP date, Decimal sebagai string, key diurutkan), hanya jauh lebih
+cepat untuk list besar dari DictCursor. Kalau orjson tidak terpasang atau
+PINVENTORY_JSON=default, provider bawaan Flask tetap dipakai.
+
+Benchmark (provider bawaan vs orjson, plus ukuran setelah kompresi):
+    python json_provider.py [jumlah_baris]
+"""
+import dataclasses
+import decimal
+import json
+import logging
+import os
+import sys
+import time
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND = os.environ.get('PINVENTORY_JSON', 'orjson')
+
+
+def _default(value):
+    # Sama dengan DefaultJSONProvider supaya klien tidak melihat perbedaan format
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, sort_keys=True, indent=False):
+    """Serialisasi ke bytes dengan format yang sama dengan respons Flask (dipakai juga asgi_app)."""
+    if orjson is None:
+        return json.dumps(obj, default=_default, sort_keys=sort_keys, indent=2 if indent else None,
+                          ensure_ascii=True).encode()
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider dengan dumps/loads/response memakai orjson."""
+
+    def _dumps_bytes(self, obj, sort_keys, indent):
+        return dumps_bytes(obj, sort_keys, indent)
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, kwargs.get('sort_keys', self.sort_keys), kwargs.get('indent')).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # Langsung bytes: tanpa decode ke str lalu encode lagi di Response
+        body = self._dumps_bytes(obj, self.sort_keys, indent) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app):
+    """Pasang OrjsonProvider ke `app` kalau tersedia. Kembalikan nama backend yang aktif."""
+    if JSON_BACKEND == 'orjson' and orjson is not None:
+        app.json = OrjsonProvider(app)
+        return 'orjson'
+    if JSON_BACKEND == 'orjson':
+        logger.info("orjson tidak terpasang, memakai JSON provider bawaan Flask")
+    return 'default'
+
+
+def benchmark_providers(row_count=20000):
+    """
+    Ukur waktu serialisasi dan ukuran respons untuk payload seperti
+    /api/products (list produk) dan /api/timelog (list log).
+    """
+    from datetime import datetime, timedelta
+    from flask import Flask
+    from compression import compress, brotli
+
+    app = Flask(__name__)
+    products = [
+        {'id': i, 'name': f"Produk {i}", 'barcode': f"{8990000000000 + i}", 'quantity': i % 500}
+        for i in range(row_count)
+    ]
+    start = datetime(2024, 1, 1)
+    # Bentuk sama dengan get_time_logs: timestamp sudah berupa string
+    logs = [
+        {'name': f"Produk {i % 5000}", 'barcode': f"{8990000000000 + i % 5000}",
+         'qty_change': (i % 7) - 3 or 1, 'timestamp': f"{start + timedelta(seconds=i * 13):%Y-%m-%d %H:%M:%S}",
+         'username': f"staff{i % 20}", 'current_stock': i % 500}
+        for i in range(row_count)
+    ]
+
+    providers = {'default': DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = OrjsonProvider(app)
+
+    results = {}
+    for payload_name, payload in (('products', products), ('timelog', logs)):
+        for provider_name, provider in providers.items():
+            with app.app_context():
+                started = time.perf_counter()
+                body = provider.response(payload).get_data()
+                encode_ms = (time.perf_counter() - started) * 1000
+
+            result = {'encode_ms': round(encode_ms, 1), 'bytes': len(body)}
+            for encoding in ('gzip', 'br') if brotli is not None else ('gzip',):
+                started = time.perf_counter()
+                result[f'{encoding}_bytes'] = len(compress(body, encoding))
+                result[f'{encoding}_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            results[f"{payload_name}/{provider_name}"] = result
+    return results
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, result in benchmark_providers(rows).items():
+        print(f"{name:18} " + "  ".join(f"{key}={value}" for key, value in result.items()))
@@ -0,0 +1,183 @@
+"""
+Load test scanner serentak lewat HTTP, untuk membandingkan mode serving
+WSGI (app Flask) dengan mode ASGI (asgi_app.py) di data yang sama.
+
+Setiap scanner virtual memegang satu koneksi keep-alive dan mengirim
+POST /api/scan berurutan seperti perangkat sungguhan, bergantian in/out
+supaya stok tidak habis. Barcode default sama dengan data sintetis
+bench.py, jadi isi dulu databasenya dengan `python bench.py run --only scan`.
+
+    uvicorn asgi_app:app --port 5000
+    python loadtest.py --url http://127.0.0.1:5000 --scanners 80 --duration 30 --output asgi.json
+
+    python loadtest.py --url http://127.0.0.1:5000 --scanners 80 --duration 30 --output wsgi.json
+    python bench.py compare wsgi.json asgi.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from bench import RESULTS_DIR, _barcode, _percentile
+
+
+class _Connection:
+    """Klien HTTP/1.1 minimal dengan keep-alive; cukup untuk respons JSON API."""
+
+    def __init__(self, host, port, token=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=b''):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+        if self.token:
+            lines.append(f"Authorization: Bearer {self.token}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Koneksi ditutup server")
+        status = int(status_line.split()[1])
+
+        length, chunked, close = 0, False, status_line.startswith(b"HTTP/1.0")
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'transfer-encoding':
+                chunked = 'chunked' in value
+            elif name == 'connection':
+                close = value == 'close'
+
+        if chunked:
+            data = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                data += chunk[:-2]
+        else:
+            data = await self.reader.readexactly(length)
+
+        if close:
+            self.close()
+        return status, data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _scanner(index, args, host, port, barcodes, deadline, latencies, counters):
+    connection = _Connection(host, port, args.token)
+    sent = 0
+    while time.perf_counter() < deadline:
+        barcode = barcodes[(index * 7919 + sent) % len(barcodes)]
+        body = json.dumps({
+            'barcode': barcode, 'qty': 1, 'action': 'in' if sent % 2 == 0 else 'out',
+            'username': f"load{index}",
+        }).encode()
+        sent += 1
+
+        started = time.perf_counter()
+        try:
+            status, _ = await asyncio.wait_for(connection.request('POST', '/api/scan', body), args.timeout)
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            connection.close()
+            counters['errors'] += 1
+            continue
+
+        if status == 200:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            counters[f"status_{status}"] = counters.get(f"status_{status}", 0) + 1
+        if args.think_ms:
+            await asyncio.sleep(args.think_ms / 1000)
+    connection.close()
+
+
+async def run_load(args):
+    parts = urlsplit(args.url)
+    host, port = parts.hostname, parts.port or 80
+    barcodes = args.barcodes.split(',') if args.barcodes else [_barcode(i) for i in range(args.products)]
+
+    latencies, counters = [], {'errors': 0}
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        _scanner(i, args, host, port, barcodes, deadline, latencies, counters)
+        for i in range(args.scanners)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'scanners': args.scanners,
+        'duration_s': round(elapsed, 1),
+        'ok': len(latencies),
+        'scans_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(_percentile(latencies, 50) or 0, 2),
+        'p95_ms': round(_percentile(latencies, 95) or 0, 2),
+        'p99_ms': round(_percentile(latencies, 99) or 0, 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0,
+        **counters,
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Load test /api/scan dengan banyak scanner serentak")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--scanners', type=int, default=80)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--think-ms', type=float, default=0, help="jeda antar scan per scanner")
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--products', type=int, default=20000, help="jumlah barcode data sintetis bench.py")
+    parser.add_argument('--barcodes', help="daftar barcode dipisah koma (ganti data sintetis)")
+    parser.add_argument('--token', default=os.environ.get('PINVENTORY_TOKEN'))
+    parser.add_argument('--output')
+    args = parser.parse_args(argv[1:])
+
+    print(f"[LOAD] {args.scanners} scanner selama {args.duration}s ke {args.url}")
+    result = asyncio.run(run_load(args))
+    print(json.dumps(result, indent=2))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"load-{datetime.now():%Y%m%d-%H%M%S}.json")
+    report = {
+        'environment': {'started_at': datetime.now().isoformat(timespec='seconds'), 'cpu_count': os.cpu_count()},
+        'params': {key: value for key, value in vars(args).items() if key != 'token'},
+        # Bentuk sama dengan bench.py supaya bisa dibandingkan dengan `bench.py compare`
+        'results': {'loadtest': result},
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Hasil disimpan di {output}")
+    return 0 if result['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,200 @@
+"""
+Partisi bulanan (RANGE COLUMNS timestamp) untuk inventory_logs.
+
+Pemakaian:
+    python log_partitions.py enable     # ubah tabel jadi berpartisi (sekali, rebuild tabel)
+    python log_partitions.py maintain   # buat partisi bulan-bulan ke depan (jalankan via cron)
+    python log_partitions.py status     # daftar partisi dan perkiraan jumlah baris
+"""
+import logging
+import sys
+from datetime import datetime
+from mysql_database import connect
+
+logger = logging.getLogger(__name__)
+
+MONTHS_AHEAD = 3
+DELETE_CHUNK_SIZE = 5000
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def _add_months(value, months):
+    month = value.month - 1 + months
+    return datetime(value.year + month // 12, month % 12 + 1, 1)
+
+
+def _partition_name(month_start):
+    return f"p{month_start:%Y%m}"
+
+
+def _partition_clause(month_start):
+    upper = _add_months(month_start, 1)
+    return f"PARTITION {_partition_name(month_start)} VALUES LESS THAN ('{upper:%Y-%m-%d %H:%M:%S}')"
+
+
+def list_partitions(cursor):
+    """
+    Kembalikan list dict {name, lower, upper, rows} urut posisi.
+    lower partisi pertama None (tak terbatas), upper pmax None (MAXVALUE).
+    Kembalikan list kosong kalau tabel tidak berpartisi.
+    """
+    cursor.execute("""
+        SELECT partition_name AS name, partition_description AS description, table_rows AS `rows`
+        FROM information_schema.partitions
+        WHERE table_schema = DATABASE() AND table_name = 'inventory_logs'
+          AND partition_name IS NOT NULL
+        ORDER BY partition_ordinal_position
+    """)
+    partitions = []
+    lower = None
+    for row in cursor.fetchall():
+        description = (row['description'] or '').strip("'")
+        upper = None if description.upper() == 'MAXVALUE' else datetime.strptime(description, "%Y-%m-%d %H:%M:%S")
+        partitions.append({'name': row['name'], 'lower': lower, 'upper': upper, 'rows': row['rows']})
+        lower = upper
+    return partitions
+
+
+def enable_partitioning(months_ahead=MONTHS_AHEAD):
+    """
+    Ubah inventory_logs jadi tabel berpartisi bulanan. MySQL mewajibkan kolom
+    partisi ada di setiap unique key, jadi primary key menjadi (id, timestamp).
+    Operasi ini membangun ulang tabel; jalankan di luar jam sibuk.
+    """
+    with connect() as conn:
+        cursor = conn.cursor()
+        if list_partitions(cursor):
+            logger.info("inventory_logs sudah berpartisi")
+            return False
+
+        cursor.execute("SELECT MIN(timestamp) AS first_ts FROM inventory_logs")
+        first_ts = cursor.fetchone()['first_ts'] or datetime.now()
+
+        month = _month_start(first_ts)
+        last = _add_months(_month_start(datetime.now()), months_ahead)
+        clauses = []
+        while month <= last:
+            clauses.append(_partition_clause(month))
+            month = _add_months(month, 1)
+        clauses.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+
+        cursor.execute("ALTER TABLE inventory_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp)")
+        cursor.execute(
+            "ALTER TABLE inventory_logs PARTITION BY RANGE COLUMNS(timestamp) (" + ", ".join(clauses) + ")"
+        )
+        cursor.close()
+    return True
+
+
+def ensure_future_partitions(months_ahead=MONTHS_AHEAD):
+    """
+    Pastikan partisi sampai `months_ahead` bulan ke depan sudah ada dengan
+    memecah pmax. Memecah pmax yang masih kosong hanya mengubah metadata.
+    Kembalikan list nama partisi yang dibuat.
+    """
+    with connect() as conn:
+        cursor = conn.cursor()
+        partitions = list_partitions(cursor)
+        if not partitions:
+            return []
+
+        bounded = [p for p in partitions if p['upper'] is not None]
+        next_month = bounded[-1]['upper'] if bounded else _month_start(datetime.now())
+        target = _add_months(_month_start(datetime.now()), months_ahead)
+
+        clauses = []
+        created = []
+        while next_month <= target:
+            clauses.append(_partition_clause(next_month))
+            created.append(_partition_name(next_month))
+            next_month = _add_months(next_month, 1)
+
+        if clauses:
+            clauses.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+            cursor.execute(
+                "ALTER TABLE inventory_logs REORGANIZE PARTITION pmax INTO (" + ", ".join(clauses) + ")"
+            )
+        cursor.close()
+    return created
+
+
+def _delete_in_chunks(cursor, conn, start, end, sign_filter, chunk_size):
+    deleted = 0
+    while True:
+        cursor.execute(
+            f"DELETE FROM inventory_logs WHERE timestamp >= %s AND timestamp < %s{sign_filter} LIMIT %s",
+            (start, end, chunk_size)
+        )
+        conn.commit()
+        deleted += cursor.rowcount
+        if cursor.rowcount < chunk_size:
+            return deleted
+
+
+def bulk_delete_logs(start, end, log_type="Semua", chunk_size=DELETE_CHUNK_SIZE):
+    """
+    Hapus log dengan timestamp di [start, end).
+    Partisi yang seluruh rentangnya tercakup di-TRUNCATE (tanpa lock baris),
+    sisa di tepi rentang dihapus per chunk kecil dengan commit tiap chunk
+    supaya INSERT dari /api/scan tidak tertahan. Filter Masuk/Keluar dan
+    tabel tanpa partisi selalu memakai penghapusan per chunk.
+    Kembalikan jumlah baris yang dihapus.
+    """
+    sign_filter = {"Masuk": " AND qty_change > 0", "Keluar": " AND qty_change < 0"}.get(log_type, "")
+
+    with connect() as conn:
+        cursor = conn.cursor()
+        covered = []
+        if not sign_filter:
+            covered = [
+                p for p in list_partitions(cursor)
+                if p['lower'] is not None and p['upper'] is not None
+                and p['lower'] >= start and p['upper'] <= end
+            ]
+
+        if not covered:
+            deleted = _delete_in_chunks(cursor, conn, start, end, sign_filter, chunk_size)
+            cursor.close()
+            return deleted
+
+        deleted = 0
+        names = [p['name'] for p in covered]
+        for name in names:
+            cursor.execute(f"SELECT COUNT(*) AS total FROM inventory_logs PARTITION ({name})")
+            deleted += cursor.fetchone()['total']
+        cursor.execute(f"ALTER TABLE inventory_logs TRUNCATE PARTITION {', '.join(names)}")
+        logger.info("Partisi %s di-truncate (%d log)", ", ".join(names), deleted)
+
+        # Tepi kiri dan kanan yang tidak mencakup satu partisi penuh
+        deleted += _delete_in_chunks(cursor, conn, start, covered[0]['lower'], sign_filter, chunk_size)
+        deleted += _delete_in_chunks(cursor, conn, covered[-1]['upper'], end, sign_filter, chunk_size)
+        cursor.close()
+    return deleted
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'status'
+    if command == 'enable':
+        print("Partisi diaktifkan" if enable_partitioning() else "inventory_logs sudah berpartisi")
+        return 0
+    if command == 'maintain':
+        created = ensure_future_partitions()
+        print(f"Partisi baru: {', '.join(created) if created else '-'}")
+        return 0
+    if command == 'status':
+        with connect() as conn:
+            partitions = list_partitions(conn.cursor())
+        if not partitions:
+            print("inventory_logs tidak berpartisi")
+        for p in partitions:
+            print(f"{p['name']:10} {str(p['lower']):20} -> {str(p['upper']):20} ~{p['rows']} baris")
+        return 0
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
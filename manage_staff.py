@@ -14,7 +14,7 @@ def hash_password(plain_password):
 def get_all_staff():
     conn = connect()
     try:
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        cursor = conn.cursor()
         # Ubah query di sini untuk menyertakan 'supervisor'
         cursor.execute("SELECT id, username, phone, role FROM users WHERE role IN ('staff', 'supervisor')")
         users = cursor.fetchall()
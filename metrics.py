@@ -0,0 +1,260 @@
+"""
+Metrik aplikasi dalam format teks Prometheus (GET /api/metrics).
+
+- Per route Flask: jumlah request per status, histogram latensi, request
+  yang sedang berjalan, serta jumlah dan waktu query DB selama request.
+- Query dihitung oleh cursor pymysql bertimer (mysql_database) atau koneksi
+  sqlite3 bertimer (sqlite_backend), jadi semua modul yang memakai connect()
+  atau backend SQLite ikut terukur. Query di luar request (job, CLI)
+  dicatat dengan route="background".
+- Saat scrape: utilisasi pool koneksi MySQL (hanya kalau backend-nya MySQL)
+  dan hit rate cache produk.
+- Throughput import/export: jumlah baris dan detik per operasi.
+
+Metrik disimpan per proses; dengan beberapa worker gunicorn, setiap scrape
+menjawab dari satu worker (label `pid` membedakannya). Endpoint tidak
+memerlukan token: batasi aksesnya di level jaringan/reverse proxy.
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BACKGROUND_ROUTE = 'background'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_lock = threading.Lock()
+_requests = {}      # (route, method, status) -> count
+_latency = {}       # (route, method) -> [bucket_counts, sum, count]
+_in_flight = {}     # route -> gauge
+_db = {}            # route -> [queries, seconds]
+_rows = {}          # (operation, kind) -> [rows, seconds]
+
+# [queries, seconds] milik request yang sedang berjalan di thread/context ini
+_current_db = contextvars.ContextVar('pinventory_db_stats', default=None)
+
+
+# --- PENCATATAN ---
+
+def record_query(seconds):
+    """Dipanggil cursor bertimer setelah setiap execute."""
+    stats = _current_db.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += seconds
+        return
+    with _lock:
+        entry = _db.setdefault(BACKGROUND_ROUTE, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def record_rows(operation, kind, rows, seconds):
+    """Catat `rows` baris import/export yang selesai dalam `seconds` detik."""
+    with _lock:
+        entry = _rows.setdefault((operation, kind), [0, 0.0])
+        entry[0] += rows
+        entry[1] += seconds
+
+
+def track_rows(rows, operation, kind):
+    """Generator yang meneruskan `rows` sambil menghitungnya untuk record_rows."""
+    started = time.perf_counter()
+    count = 0
+    try:
+        for row in rows:
+            count += 1
+            yield row
+    finally:
+        record_rows(operation, kind, count, time.perf_counter() - started)
+
+
+class QueryTimerMixin:
+    """Mixin untuk kelas cursor pymysql: ukur setiap execute()."""
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            record_query(time.perf_counter() - started)
+
+
+# --- FLASK ---
+
+def init_metrics(app):
+    """
+    Pasang hook request dan route GET /api/metrics. Panggil sebelum
+    before_request lain didaftarkan: before_request yang mengembalikan
+    respons (mis. auth 401) menghentikan hook sesudahnya.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def start_request_metrics():
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        g.metrics_route = route
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_token = _current_db.set([0, 0.0])
+        with _lock:
+            _in_flight[route] = _in_flight.get(route, 0) + 1
+
+    @app.after_request
+    def record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        route = g.pop('metrics_route', None)
+        if route is None:
+            return
+        elapsed = time.perf_counter() - g.pop('metrics_started')
+        token = g.pop('metrics_db_token')
+        queries, db_seconds = _current_db.get()
+        _current_db.reset(token)
+
+        status = g.pop('metrics_status', 500 if exc is not None else 200)
+        method = request.method
+        index = bisect.bisect_left(LATENCY_BUCKETS, elapsed)
+        with _lock:
+            _in_flight[route] -= 1
+            key = (route, method, status)
+            _requests[key] = _requests.get(key, 0) + 1
+
+            histogram = _latency.get((route, method))
+            if histogram is None:
+                histogram = _latency[(route, method)] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += elapsed
+            histogram[2] += 1
+
+            if queries:
+                entry = _db.setdefault(route, [0, 0.0])
+                entry[0] += queries
+                entry[1] += db_seconds
+
+    @app.route('/api/metrics', methods=['GET'])
+    def api_metrics():
+        return Response(render(), content_type=CONTENT_TYPE)
+
+
+# --- EKSPOSISI ---
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+        self.pid = os.getpid()
+
+    def metric(self, name, kind, help_text, samples):
+        """samples: iterable (suffix, labels_dict, value)."""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            self.lines.append(f"{name}{suffix}{_labels(pid=self.pid, **labels)} {_format(value)}")
+
+
+def _pool_samples():
+    # Backend SQLite tidak memakai pool: jangan sampai scrape membuat pool MySQL
+    from storage import get_backend
+    if get_backend().name != 'mysql':
+        return None
+    from mysql_database import get_pool_stats
+    return get_pool_stats()
+
+
+def _cache_samples():
+    from product_cache import product_cache
+    return product_cache.stats()
+
+
+def render():
+    """Semua metrik dalam format teks Prometheus."""
+    with _lock:
+        requests = dict(_requests)
+        latency = {key: (list(h[0]), h[1], h[2]) for key, h in _latency.items()}
+        in_flight = dict(_in_flight)
+        db = {route: tuple(entry) for route, entry in _db.items()}
+        rows = {key: tuple(entry) for key, entry in _rows.items()}
+
+    out = _Writer()
+    out.metric('pinventory_http_requests_total', 'counter', 'Request HTTP per route, method dan status.', (
+        ('', {'route': route, 'method': method, 'status': status}, count)
+        for (route, method, status), count in sorted(requests.items())
+    ))
+
+    histogram_samples = []
+    for (route, method), (buckets, total, count) in sorted(latency.items()):
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + (float('inf'),), buckets):
+            cumulative += bucket_count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            histogram_samples.append(('_bucket', {'route': route, 'method': method, 'le': le}, cumulative))
+        histogram_samples.append(('_sum', {'route': route, 'method': method}, total))
+        histogram_samples.append(('_count', {'route': route, 'method': method}, count))
+    out.metric('pinventory_http_request_duration_seconds', 'histogram',
+               'Latensi request HTTP per route.', histogram_samples)
+
+    out.metric('pinventory_http_requests_in_flight', 'gauge', 'Request yang sedang diproses per route.', (
+        ('', {'route': route}, value) for route, value in sorted(in_flight.items())
+    ))
+    out.metric('pinventory_db_queries_total', 'counter', 'Query database per route.', (
+        ('', {'route': route}, queries) for route, (queries, _) in sorted(db.items())
+    ))
+    out.metric('pinventory_db_query_seconds_total', 'counter', 'Total waktu query database per route.', (
+        ('', {'route': route}, seconds) for route, (_, seconds) in sorted(db.items())
+    ))
+    out.metric('pinventory_rows_total', 'counter', 'Baris import/export yang diproses.', (
+        ('', {'operation': operation, 'kind': kind}, count) for (operation, kind), (count, _) in sorted(rows.items())
+    ))
+    out.metric('pinventory_rows_seconds_total', 'counter', 'Waktu yang dihabiskan import/export.', (
+        ('', {'operation': operation, 'kind': kind}, seconds) for (operation, kind), (_, seconds) in sorted(rows.items())
+    ))
+
+    try:
+        pool = _pool_samples()
+    except Exception:
+        pool = None
+    if pool is not None:
+        out.metric('pinventory_db_pool_connections', 'gauge', 'Koneksi pool per keadaan.', (
+            ('', {'state': state}, pool[state]) for state in ('checked_out', 'idle', 'total')
+        ))
+        out.metric('pinventory_db_pool_capacity', 'gauge', 'Batas koneksi pool (size + max_overflow).', (
+            ('', {}, pool['size'] + pool['max_overflow']),
+        ))
+        out.metric('pinventory_db_pool_events_total', 'counter', 'Kejadian pool (created, reused, waits, timeouts, ...).', (
+            ('', {'event': event}, pool[event])
+            for event in ('created', 'reused', 'discarded', 'health_check_failed', 'waits', 'timeouts')
+        ))
+
+    cache = _cache_samples()
+    out.metric('pinventory_product_cache_lookups_total', 'counter', 'Lookup cache produk per hasil.', (
+        ('', {'result': 'hit'}, cache['hits']),
+        ('', {'result': 'miss'}, cache['misses']),
+    ))
+    out.metric('pinventory_product_cache_hit_ratio', 'gauge', 'Rasio hit cache produk sejak start.', (
+        ('', {}, float(cache['hit_rate'])),
+    ))
+    out.metric('pinventory_product_cache_entries', 'gauge', 'Entri di cache produk.', (
+        ('', {}, cache['size']),
+    ))
+    out.metric('pinventory_product_cache_evictions_total', 'counter', 'Entri cache produk yang dibuang karena penuh.', (
+        ('', {}, cache['evictions']),
+    ))
+    return '\n'.join(out.lines) + '\n'
@@ -0,0 +1,389 @@
+"""
+Migrasi skema database Pinventory.
+
+Pemakaian:
+    python migrations.py migrate   # jalankan migrasi yang belum diterapkan
+    python migrations.py status    # tampilkan versi skema
+    python migrations.py check     # EXPLAIN query penting, tandai full table scan
+    python migrations.py merge-duplicate-barcodes   # gabungkan produk berbarcode sama
+"""
+import sys
+from mysql_database import connect
+
+DUPLICATE_SAMPLE = 20
+
+
+class MigrationError(Exception):
+    """Migrasi tidak bisa diterapkan dengan data yang ada; pesan berisi langkah perbaikan."""
+
+
+# --- HELPER ---
+
+def _index_exists(cursor, table, index_name):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index_name))
+    return cursor.fetchone() is not None
+
+
+def _add_index(cursor, table, index_name, definition):
+    # Tabel lama mungkin sudah punya index yang sama, jadi cek dulu
+    if not _index_exists(cursor, table, index_name):
+        cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+
+
+def _duplicates(cursor, table, column, limit=DUPLICATE_SAMPLE):
+    """(jumlah nilai yang ganda, contoh [(nilai, jumlah baris)]) untuk `column`."""
+    cursor.execute(f"""
+        SELECT {column} AS value, COUNT(*) AS copies FROM {table}
+        GROUP BY {column} HAVING COUNT(*) > 1
+        ORDER BY copies DESC, {column}
+    """)
+    rows = cursor.fetchall()
+    return len(rows), [(row['value'], row['copies']) for row in rows[:limit]]
+
+
+def _require_unique(cursor, table, column, index_name, fix_hint):
+    """Lempar MigrationError kalau index unik `index_name` akan gagal karena data ganda (error 1062)."""
+    if _index_exists(cursor, table, index_name):
+        return
+    total, sample = _duplicates(cursor, table, column)
+    if total:
+        listed = ', '.join(f"{value!r} ({copies}x)" for value, copies in sample)
+        more = f" dan {total - len(sample)} lainnya" if total > len(sample) else ""
+        raise MigrationError(
+            f"{table}.{column} berisi {total} nilai ganda sehingga {index_name} tidak bisa dibuat: "
+            f"{listed}{more}. {fix_hint}"
+        )
+
+
+def merge_duplicate_barcodes():
+    """
+    Gabungkan produk dengan barcode sama jadi satu baris (id terkecil):
+    quantity dijumlah dan keanggotaan grup dipindah ke baris yang
+    dipertahankan. Kembalikan jumlah baris yang dihapus.
+    """
+    from change_version import products_changed
+
+    removed = 0
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT barcode, MIN(id) AS keep_id, SUM(quantity) AS total
+            FROM products GROUP BY barcode HAVING COUNT(*) > 1
+        """)
+        for row in cursor.fetchall():
+            cursor.execute("UPDATE products SET quantity = %s WHERE id = %s", (row['total'], row['keep_id']))
+            cursor.execute("""
+                INSERT IGNORE INTO grouping_products (group_id, product_id)
+                SELECT gp.group_id, %s FROM grouping_products gp
+                JOIN products p ON p.id = gp.product_id
+                WHERE p.barcode = %s AND p.id <> %s
+            """, (row['keep_id'], row['barcode'], row['keep_id']))
+            # Keanggotaan baris lama ikut terhapus lewat ON DELETE CASCADE
+            cursor.execute("DELETE FROM products WHERE barcode = %s AND id <> %s", (row['barcode'], row['keep_id']))
+            removed += cursor.rowcount
+        conn.commit()
+        cursor.close()
+    if removed:
+        products_changed()
+    return removed
+
+
+# --- MIGRATIONS ---
+
+def _001_create_tables(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS products (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            barcode VARCHAR(64) NOT NULL,
+            quantity INT NOT NULL DEFAULT 0
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_logs (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255),
+            barcode VARCHAR(64) NOT NULL,
+            qty_change INT NOT NULL,
+            action_type VARCHAR(16),
+            timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            username VARCHAR(100),
+            current_stock INT
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(100) NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            phone VARCHAR(32),
+            role VARCHAR(20) NOT NULL DEFAULT 'staff'
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_groups (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            group_name VARCHAR(255) NOT NULL,
+            description TEXT
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS grouping_products (
+            group_id INT NOT NULL,
+            product_id INT NOT NULL,
+            PRIMARY KEY (group_id, product_id),
+            CONSTRAINT fk_grouping_group FOREIGN KEY (group_id)
+                REFERENCES product_groups (id) ON DELETE CASCADE,
+            CONSTRAINT fk_grouping_product FOREIGN KEY (product_id)
+                REFERENCES products (id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+def _002_hot_query_indexes(cursor):
+    # Importer lama mengizinkan barcode/username ganda; cek sebelum ALTER
+    # apa pun supaya migrasi gagal dengan pesan jelas, bukan error 1062
+    _require_unique(cursor, 'products', 'barcode', 'uq_products_barcode',
+                    "Jalankan `python migrations.py merge-duplicate-barcodes` "
+                    "(quantity dijumlah ke baris dengan id terkecil) lalu migrate lagi.")
+    _require_unique(cursor, 'users', 'username', 'uq_users_username',
+                    "Hapus atau ganti nama user yang ganda lalu migrate lagi.")
+
+    # Lookup scan/import per barcode; juga melayani WHERE name = ? AND barcode = ?
+    # karena barcode unik, jadi index (name, barcode) tidak diperlukan
+    _add_index(cursor, 'products', 'uq_products_barcode', "UNIQUE KEY uq_products_barcode (barcode)")
+
+    # Range scan timelog (ORDER BY timestamp DESC, id DESC): secondary index
+    # InnoDB sudah membawa primary key, jadi ini efektif (timestamp, id)
+    _add_index(cursor, 'inventory_logs', 'idx_logs_timestamp', "INDEX idx_logs_timestamp (timestamp)")
+    _add_index(cursor, 'inventory_logs', 'idx_logs_barcode_timestamp', "INDEX idx_logs_barcode_timestamp (barcode, timestamp)")
+
+    _add_index(cursor, 'users', 'uq_users_username', "UNIQUE KEY uq_users_username (username)")
+    _add_index(cursor, 'users', 'idx_users_role', "INDEX idx_users_role (role)")
+
+    _add_index(cursor, 'product_groups', 'idx_groups_name', "INDEX idx_groups_name (group_name)")
+    _add_index(cursor, 'grouping_products', 'idx_grouping_product', "INDEX idx_grouping_product (product_id)")
+
+
+def _003_daily_rollups(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS inventory_daily_rollups (
+            day DATE NOT NULL,
+            barcode VARCHAR(64) NOT NULL,
+            username VARCHAR(100) NOT NULL DEFAULT '',
+            qty_in BIGINT NOT NULL DEFAULT 0,
+            qty_out BIGINT NOT NULL DEFAULT 0,
+            events INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, barcode, username),
+            INDEX idx_rollups_barcode_day (barcode, day),
+            INDEX idx_rollups_username_day (username, day)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+def _004_jobs(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id CHAR(32) PRIMARY KEY,
+            kind VARCHAR(50) NOT NULL,
+            state VARCHAR(16) NOT NULL,
+            params TEXT,
+            progress TEXT,
+            result TEXT,
+            result_path VARCHAR(255),
+            result_name VARCHAR(255),
+            result_mimetype VARCHAR(100),
+            error TEXT,
+            cancel_requested TINYINT(1) NOT NULL DEFAULT 0,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            started_at DATETIME NULL,
+            finished_at DATETIME NULL,
+            INDEX idx_jobs_created (created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+def _005_product_changes(cursor):
+    # barcode NULL menandai seluruh katalog diganti (import)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_changes (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            barcode VARCHAR(64) NULL,
+            changed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_product_changes_barcode (barcode, id),
+            INDEX idx_product_changes_changed_at (changed_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+def _006_revoked_tokens(cursor):
+    # Daftar cabut token dibagi semua worker; expires_at dalam detik epoch
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            jti VARCHAR(32) PRIMARY KEY,
+            expires_at BIGINT NOT NULL,
+            INDEX idx_revoked_tokens_expires (expires_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+def _007_job_owner(cursor):
+    # Proses pemilik thread pool (host:pid) dan kabar terakhir, untuk mendeteksi job yatim
+    cursor.execute("""
+        ALTER TABLE jobs
+            ADD COLUMN owner VARCHAR(128) NULL,
+            ADD COLUMN heartbeat_at DATETIME NULL,
+            ADD INDEX idx_jobs_state (state)
+    """)
+
+
+# (versi, deskripsi, fungsi). Tambahkan migrasi baru di akhir, jangan ubah yang lama.
+MIGRATIONS = [
+    (1, "create core tables", _001_create_tables),
+    (2, "indexes for hot query shapes", _002_hot_query_indexes),
+    (3, "daily stock movement rollups", _003_daily_rollups),
+    (4, "background jobs", _004_jobs),
+    (5, "product change feed for delta sync", _005_product_changes),
+    (6, "shared token revocation list", _006_revoked_tokens),
+    (7, "job owner and heartbeat", _007_job_owner),
+]
+
+
+def _ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+def get_schema_version():
+    with connect() as conn:
+        cursor = conn.cursor()
+        _ensure_version_table(cursor)
+        cursor.execute("SELECT COALESCE(MAX(version), 0) AS version FROM schema_migrations")
+        return cursor.fetchone()['version']
+
+
+def migrate(target=None):
+    """
+    Terapkan migrasi yang belum dijalankan sampai `target` (default: terbaru).
+    DDL MySQL auto-commit, jadi versi dicatat setelah tiap migrasi selesai.
+    Kembalikan list versi yang diterapkan.
+    """
+    applied = []
+    with connect() as conn:
+        cursor = conn.cursor()
+        _ensure_version_table(cursor)
+        cursor.execute("SELECT version FROM schema_migrations")
+        done = {row['version'] for row in cursor.fetchall()}
+
+        for version, description, step in MIGRATIONS:
+            if version in done or (target is not None and version > target):
+                continue
+            print(f"[MIGRATE] {version:03d} {description}")
+            step(cursor)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            conn.commit()
+            applied.append(version)
+        cursor.close()
+    return applied
+
+
+# --- INDEX CHECK ---
+
+# Bentuk query yang dipanggil di jalur panas (lihat mysql_database.py, scan_engine.py)
+HOT_QUERIES = [
+    ("product by barcode",
+     "SELECT name, quantity FROM products WHERE barcode = %s", ('0',)),
+    ("product by name+barcode",
+     "SELECT id FROM products WHERE name = %s AND barcode = %s", ('x', '0')),
+    ("guarded stock update",
+     "UPDATE products SET quantity = quantity + %s WHERE barcode = %s AND quantity >= %s", (1, '0', 0)),
+    ("products keyset page",
+     "SELECT id, name, barcode, quantity FROM products WHERE id > %s ORDER BY id LIMIT %s", (0, 100)),
+    ("timelog range (Masuk)",
+     "SELECT name, barcode, qty_change, timestamp, username, current_stock FROM inventory_logs "
+     "WHERE timestamp >= %s AND timestamp <= %s AND qty_change > 0 ORDER BY timestamp DESC",
+     ('2000-01-01', '2000-01-31 23:59:59')),
+    ("timelog keyset page",
+     "SELECT id, timestamp FROM inventory_logs WHERE timestamp >= %s AND timestamp <= %s "
+     "AND (timestamp < %s OR (timestamp = %s AND id < %s)) ORDER BY timestamp DESC, id DESC LIMIT %s",
+     ('2000-01-01', '2000-01-31 23:59:59', '2000-01-31', '2000-01-31', 1, 100)),
+    ("timelog bulk delete range",
+     "DELETE FROM inventory_logs WHERE timestamp >= %s AND timestamp < %s", ('2000-01-01', '2000-01-02')),
+    ("user by username",
+     "SELECT username, password, role, phone FROM users WHERE username = %s", ('x',)),
+    ("staff by role",
+     "SELECT id, username, phone, role FROM users WHERE role IN ('staff', 'supervisor')", ()),
+    ("rollup summary by barcode",
+     "SELECT barcode, SUM(qty_in), SUM(qty_out) FROM inventory_daily_rollups "
+     "WHERE day >= %s AND day <= %s AND barcode = %s GROUP BY barcode", ('2000-01-01', '2000-01-31', '0')),
+    ("product changes since cursor",
+     "SELECT barcode, MAX(id) AS change_id FROM product_changes WHERE id > %s AND barcode IS NOT NULL "
+     "GROUP BY barcode ORDER BY change_id LIMIT %s", (0, 100)),
+    ("group members",
+     "SELECT product_id FROM grouping_products WHERE group_id = %s", (0,)),
+]
+
+
+def check_indexes():
+    """
+    Jalankan EXPLAIN untuk setiap HOT_QUERIES dan tandai yang melakukan
+    full table scan (type = ALL). Kembalikan list (label, tabel, rows) yang bermasalah.
+    """
+    flagged = []
+    with connect() as conn:
+        cursor = conn.cursor()
+        for label, query, params in HOT_QUERIES:
+            cursor.execute("EXPLAIN " + query, params)
+            for plan in cursor.fetchall():
+                scan_type = plan.get('type')
+                status = "FULL SCAN" if scan_type == 'ALL' else "ok"
+                print(f"[{status:9}] {label:28} table={plan.get('table')} type={scan_type} "
+                      f"key={plan.get('key')} rows={plan.get('rows')}")
+                if scan_type == 'ALL':
+                    flagged.append((label, plan.get('table'), plan.get('rows')))
+        cursor.close()
+    return flagged
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'migrate'
+    if command == 'migrate':
+        try:
+            applied = migrate()
+        except MigrationError as e:
+            print(f"[MIGRATE] Gagal: {e}")
+            return 1
+        print(f"Migrasi selesai, {len(applied)} diterapkan. Versi skema: {get_schema_version()}")
+        return 0
+    if command == 'merge-duplicate-barcodes':
+        print(f"{merge_duplicate_barcodes()} baris produk ganda digabung")
+        return 0
+    if command == 'status':
+        latest = MIGRATIONS[-1][0]
+        print(f"Versi skema: {get_schema_version()} (terbaru: {latest})")
+        return 0
+    if command == 'check':
+        flagged = check_indexes()
+        if flagged:
+            print(f"{len(flagged)} query melakukan full table scan")
+            return 1
+        print("Semua query memakai index")
+        return 0
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
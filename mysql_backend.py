@@ -0,0 +1,122 @@
+"""
+Backend penyimpanan MySQL: membungkus fungsi yang sudah ada di
+mysql_database, scan_engine, manage_staff, inventory_importer,
+product_changes, rollups dan log_partitions.
+"""
+import logging
+import inventory_importer
+import log_partitions
+import manage_staff
+import mysql_database
+import product_changes
+import rollups
+import scan_engine
+from storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+class MySQLBackend(StorageBackend):
+
+    name = 'mysql'
+    supports_jobs = True
+
+    def get_all_products(self):
+        return mysql_database.get_all_products()
+
+    def get_products_page(self, after=None, limit=100, fields=None):
+        return mysql_database.get_products_page(after, limit, fields)
+
+    def iter_products(self):
+        return mysql_database.iter_products()
+
+    def import_products(self, filepath, username=None):
+        return inventory_importer.import_inventory_from_excel_with_stats(filepath, username=username)
+
+    def get_product_changes(self, since=None, limit=100):
+        return product_changes.get_product_changes(since, limit)
+
+    def get_product_by_barcode(self, barcode):
+        return mysql_database.get_product_by_barcode(barcode)
+
+    def add_product(self, name, barcode, quantity, username):
+        return mysql_database.add_product(name, barcode, quantity, username)
+
+    def apply_scan(self, barcode, qty, action, username):
+        return scan_engine.apply_scan(barcode, qty, action, username)
+
+    def apply_scan_batch(self, events):
+        return scan_engine.apply_scan_batch(events)
+
+    def get_inventory_logs_filtered(self, start_date=None, end_date=None, change_type=None):
+        return mysql_database.get_inventory_logs_filtered(start_date, end_date, change_type)
+
+    def get_inventory_logs_page(self, start_date=None, end_date=None, change_type=None, after=None, limit=100, fields=None):
+        return mysql_database.get_inventory_logs_page(start_date, end_date, change_type, after=after, limit=limit, fields=fields)
+
+    def iter_inventory_logs(self, start_date=None, end_date=None, change_type=None):
+        return mysql_database.iter_inventory_logs(start_date, end_date, change_type)
+
+    def delete_inventory_log(self, log_id):
+        return mysql_database.delete_inventory_log(log_id)
+
+    def delete_inventory_logs(self, start_date, end_date, change_type="Semua"):
+        # Partisi bulanan yang tercakup penuh di-truncate, sisanya dihapus
+        # per chunk kecil supaya insert dari /api/scan tidak tertahan lock
+        rows_deleted = log_partitions.bulk_delete_logs(start_date, end_date, change_type)
+
+        # Rollup hari-hari yang terdampak dihitung ulang dari log yang tersisa
+        if rows_deleted:
+            try:
+                rollups.rebuild_rollups(start_date, end_date)
+            except Exception as e:
+                logger.warning("Rebuild rollup %s..%s gagal: %s", start_date, end_date, e)
+        return rows_deleted
+
+    def get_movement_summary(self, start_date, end_date, group_by='day', barcode=None, username=None):
+        return rollups.get_rollup_summary(start_date, end_date, group_by, barcode=barcode, username=username)
+
+    def get_user(self, username):
+        return mysql_database.get_user(username)
+
+    def set_user_password(self, username, password_hash):
+        return mysql_database.set_user_password(username, password_hash)
+
+    def add_revoked_token(self, jti, expires_at):
+        return mysql_database.add_revoked_token(jti, expires_at)
+
+    def get_revoked_tokens(self):
+        return mysql_database.get_revoked_tokens()
+
+    def get_all_staff(self):
+        return manage_staff.get_all_staff()
+
+    def add_staff(self, username, password, phone=None):
+        return manage_staff.add_staff(username, password, phone)
+
+    def update_staff(self, username, password=None, phone=None, role=None):
+        return manage_staff.update_staff(username, password, phone, role)
+
+    def delete_staff(self, username):
+        return manage_staff.delete_staff(username)
+
+    def create_product_group(self, group_name, description=None, product_ids=()):
+        return mysql_database.create_product_group(group_name, description, list(product_ids))
+
+    def get_all_product_groups(self):
+        return mysql_database.get_all_product_groups()
+
+    def get_product_group(self, group_id):
+        return mysql_database.get_product_group(group_id)
+
+    def get_product_group_summaries(self):
+        return mysql_database.get_product_group_summaries()
+
+    def get_group_members_page(self, group_id, after=None, limit=100):
+        return mysql_database.get_group_members_page(group_id, after, limit)
+
+    def update_product_group(self, group_id, new_group_name=None, new_description=None, new_product_ids=None):
+        return mysql_database.update_product_group(group_id, new_group_name, new_description, new_product_ids)
+
+    def delete_product_group(self, group_id):
+        return mysql_database.delete_product_group(group_id)
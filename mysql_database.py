@@ -1,20 +1,92 @@
+import os
+import logging
+import threading
+import time
 import pymysql
-from pymysql.cursors import DictCursor
-from mysql.connector.cursor import MySQLCursorDict
+from pymysql.cursors import DictCursor, SSDictCursor
 from datetime import datetime,timedelta
+from db_pool import ConnectionPool, PoolExhausted
+from pagination import encode_cursor, decode_cursor
+from product_cache import product_cache, MISS
+from change_version import products_changed, groups_changed
+from metrics import QueryTimerMixin
+
+logger = logging.getLogger(__name__)
+
+DB_CONFIG = {
+    'host': os.environ.get('PINVENTORY_DB_HOST', 'localhost'),
+    'user': os.environ.get('PINVENTORY_DB_USER', 'root'),          # Ganti sesuai konfigurasi
+    'password': os.environ.get('PINVENTORY_DB_PASSWORD', ''),      # Isi password MySQL kamu jika ada
+    'database': os.environ.get('PINVENTORY_DB_NAME', 'inventory_db'),
+    'charset': 'utf8mb4',
+}
+
+POOL_CONFIG = {
+    'size': int(os.environ.get('PINVENTORY_DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.environ.get('PINVENTORY_DB_POOL_OVERFLOW', 10)),
+    'timeout': float(os.environ.get('PINVENTORY_DB_POOL_TIMEOUT', 10)),
+    'idle_timeout': float(os.environ.get('PINVENTORY_DB_POOL_IDLE_TIMEOUT', 300)),
+    'ping_interval': float(os.environ.get('PINVENTORY_DB_POOL_PING_INTERVAL', 30)),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class TimedDictCursor(QueryTimerMixin, DictCursor):
+    """DictCursor yang mencatat jumlah dan waktu query ke metrics."""
+
+
+class TimedSSDictCursor(QueryTimerMixin, SSDictCursor):
+    pass
+
+
+def _create_connection():
+    return pymysql.connect(cursorclass=TimedDictCursor, **DB_CONFIG)
+
+
+def _reset_pool_after_fork():
+    # Socket koneksi milik proses induk tidak boleh dipakai bersama worker
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(_create_connection, **POOL_CONFIG)
+    return _pool
+
+
+def reset_pool():
+    """Tutup pool saat ini; koneksi berikutnya dibuat ulang dengan DB_CONFIG terkini (dipakai tests)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.dispose()
+        _pool = None
+
+
+def get_pool_stats():
+    return get_pool().stats()
+
+
 def connect():
+    """
+    Pinjam koneksi dari pool. conn.close() mengembalikan koneksi ke pool.
+    Bisa juga dipakai sebagai context manager: `with connect() as conn:`.
+    """
     try:
-        conn = pymysql.connect(
-            host="localhost",
-            user="root",        # Ganti sesuai konfigurasi
-            password="",        # Isi password MySQL kamu jika ada
-            database="inventory_db",
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        return conn
-    except pymysql.MySQLError as e:
-        print(f"[ERROR] Gagal koneksi ke database: {e}")
+        return get_pool().acquire()
+    except (pymysql.MySQLError, PoolExhausted) as e:
+        logger.error("Gagal koneksi ke database: %s", e)
         return None
 
 def add_product(name, barcode, quantity, username):
@@ -27,7 +99,7 @@ def add_product(name, barcode, quantity, username):
         cursor.execute("SELECT id, quantity, name FROM products WHERE barcode = %s", (barcode,))
         result = cursor.fetchone()
 
-        print("DEBUG >> Hasil SELECT:", result)  # Debug sementara
+        logger.debug("add_product SELECT %s -> %s", barcode, result)
 
         if result and 'quantity' in result:
             product_id = result['id']
@@ -39,7 +111,7 @@ def add_product(name, barcode, quantity, username):
                 cursor.execute("UPDATE products SET quantity = %s WHERE id = %s", (new_qty, product_id))
                 name_to_log = existing_name
             except ValueError:
-                print("Error: 'quantity' di database bukan angka:", current_qty)
+                logger.error("'quantity' di database bukan angka: %r", current_qty)
                 conn.rollback()
                 return
 
@@ -49,10 +121,13 @@ def add_product(name, barcode, quantity, username):
                 (name, barcode, quantity)
             )
 
+        _record_change(cursor, barcode)
         conn.commit()
+        product_cache.invalidate(barcode)
+        products_changed()
 
     except Exception as e:
-        print("Error saat tambah/update produk:", e)
+        logger.error("Error saat tambah/update produk: %s", e)
         conn.rollback()
 
     finally:
@@ -65,29 +140,32 @@ def add_product(name, barcode, quantity, username):
 
 
 def update_quantity(barcode, qty_change):
-    conn = connect()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE products SET quantity = quantity + %s WHERE barcode = %s", (qty_change, barcode))
-    conn.commit()
-    conn.close()
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE products SET quantity = quantity + %s WHERE barcode = %s", (qty_change, barcode))
+        _record_change(cursor, barcode)
+        conn.commit()
+    product_cache.invalidate(barcode)
+    products_changed()
 
 def update_quantity_by_name_barcode(name, barcode, quantity_change):
-    conn = connect()
-    cursor = conn.cursor()
-    cursor.execute("SELECT quantity FROM products WHERE name = %s AND barcode = %s", (name, barcode))
-    result = cursor.fetchone()
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT quantity FROM products WHERE name = %s AND barcode = %s", (name, barcode))
+        result = cursor.fetchone()
 
-    if result is None:
-        print(f"[WARNING] Produk '{name}' dengan barcode '{barcode}' tidak ditemukan. Lewati.")
-        conn.close()
-        return
+        if result is None:
+            logger.warning("Produk '%s' dengan barcode '%s' tidak ditemukan. Lewati.", name, barcode)
+            return
 
-    current_qty = result['quantity']  # gunakan nama kolom, bukan index!
-    new_qty = current_qty + quantity_change
+        current_qty = result['quantity']  # gunakan nama kolom, bukan index!
+        new_qty = current_qty + quantity_change
 
-    cursor.execute("UPDATE products SET quantity = %s WHERE name = %s AND barcode = %s", (new_qty, name, barcode))
-    conn.commit()
-    conn.close()
+        cursor.execute("UPDATE products SET quantity = %s WHERE name = %s AND barcode = %s", (new_qty, name, barcode))
+        _record_change(cursor, barcode)
+        conn.commit()
+    product_cache.invalidate(barcode)
+    products_changed()
 
 def adjust_product_quantity(conn, barcode, qty, action):
     cursor = conn.cursor()
@@ -103,19 +181,26 @@ def adjust_product_quantity(conn, barcode, qty, action):
 
     # Update stok
     cursor.execute("UPDATE products SET quantity = %s WHERE barcode = %s", (new_qty, barcode))
+    _record_change(cursor, barcode)
     conn.commit()
+    product_cache.invalidate(barcode)
+    products_changed()
     return True, new_qty
 
 
 def check_product_exists(name, barcode):
-    conn = connect()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM products WHERE name = %s AND barcode = %s", (name, barcode))
-    result = cursor.fetchone()
-    conn.close()
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM products WHERE name = %s AND barcode = %s", (name, barcode))
+        result = cursor.fetchone()
     return result is not None
 
 def get_product_by_barcode(barcode):
+    cached = product_cache.get(barcode)
+    if cached is not MISS:
+        return cached
+
+    token = product_cache.begin_read()
     conn = connect()
     cursor = conn.cursor()
 
@@ -123,29 +208,29 @@ def get_product_by_barcode(barcode):
         cursor.execute("SELECT name, quantity FROM products WHERE barcode = %s", (barcode,))
         result = cursor.fetchone()
 
-        print(f"DEBUG >> Raw result: {result}")  # Tambahkan ini
+        logger.debug("get_product_by_barcode %s -> %s", barcode, result, extra={'sample_every': 100})
 
         if result:
             name = result['name']
             quantity = result['quantity']
-            return {"name": name, "quantity": quantity}
+            product = {"name": name, "quantity": quantity}
+            product_cache.put_if_fresh(barcode, product, token)
+            return product
         else:
-            print(f"DEBUG >> Produk dengan barcode '{barcode}' tidak ditemukan")
+            logger.debug("Produk dengan barcode '%s' tidak ditemukan", barcode)
             return None
     except Exception as e:
-        print("DEBUG >> Error saat mengambil produk:", e)
+        logger.error("Error saat mengambil produk: %s", e)
         return None
     finally:
         cursor.close()
         conn.close()
 
 
-def get_inventory_logs_filtered(start_date=None, end_date=None, change_type=None):
-    conn = connect()
-    cursor = conn.cursor()
-
+def logs_filtered_query(start_date=None, end_date=None, change_type=None):
+    """SQL dan parameter untuk get_inventory_logs_filtered (dipakai juga mode async)."""
     query = """
-    SELECT name, barcode, qty_change, timestamp, username, current_stock
+    SELECT id, name, barcode, qty_change, timestamp, username, current_stock
     FROM inventory_logs
     WHERE 1 = 1
     """
@@ -162,33 +247,186 @@ def get_inventory_logs_filtered(start_date=None, end_date=None, change_type=None
         query += " AND qty_change < 0"
 
     query += " ORDER BY timestamp DESC"
+    return query, params
+
+
+def get_inventory_logs_filtered(start_date=None, end_date=None, change_type=None):
+    query, params = logs_filtered_query(start_date, end_date, change_type)
 
-    # DEBUG QUERY
-    print("==== DEBUG get_inventory_logs_filtered ====")
-    print("Query:", query)
-    print("Params:", params)
+    logger.debug("get_inventory_logs_filtered query=%s params=%s", query, params)
 
-    cursor.execute(query, params)
-    result = cursor.fetchall()
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        result = cursor.fetchall()
+        cursor.close()
 
-    print("Result count:", len(result))
-    for idx, row in enumerate(result):
-        print(f"Row {idx+1}: timestamp={row['timestamp']}, name={row['name']}, qty_change={row['qty_change']}")
+    logger.debug("get_inventory_logs_filtered result count=%d", len(result))
 
-    cursor.close()
-    conn.close()
     return result
 
 
 def get_all_products():
-    conn = connect()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM products")
-    result = cursor.fetchall()  # List of dicts
-    cursor.close()
-    conn.close()
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM products")
+        result = cursor.fetchall()  # List of dicts
+        cursor.close()
     return result
 
+def iter_inventory_logs(start_date=None, end_date=None, change_type=None, batch_size=2000):
+    """
+    Generator baris inventory_logs (timestamp tetap datetime) dari cursor
+    server-side (SSDictCursor), jadi hasil query tidak pernah dimuat
+    seluruhnya ke memori. Koneksi dipegang sampai generator habis/ditutup.
+    """
+    query = """
+    SELECT name, barcode, qty_change, timestamp, username, current_stock
+    FROM inventory_logs
+    WHERE 1 = 1
+    """
+    params = []
+
+    if start_date and end_date:
+        query += " AND timestamp >= %s AND timestamp <= %s"
+        params.extend([start_date, end_date])
+
+    if change_type == "Masuk":
+        query += " AND qty_change > 0"
+    elif change_type == "Keluar":
+        query += " AND qty_change < 0"
+
+    query += " ORDER BY timestamp DESC"
+
+    with connect() as conn:
+        cursor = conn.cursor(TimedSSDictCursor)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+
+def iter_products(batch_size=2000):
+    """Generator semua produk urut id dari cursor server-side."""
+    with connect() as conn:
+        cursor = conn.cursor(TimedSSDictCursor)
+        try:
+            cursor.execute("SELECT id, name, barcode, quantity FROM products ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+
+PRODUCT_FIELDS = ('id', 'name', 'barcode', 'quantity')
+LOG_FIELDS = ('id', 'name', 'barcode', 'qty_change', 'action_type', 'timestamp', 'username', 'current_stock')
+
+
+def products_page_query(after=None, limit=100, fields=None):
+    """SQL dan parameter untuk get_products_page (dipakai juga mode async)."""
+    fields = list(fields or PRODUCT_FIELDS)
+    columns = fields if 'id' in fields else ['id'] + fields
+
+    query = f"SELECT {', '.join(columns)} FROM products"
+    params = []
+    cursor_parts = decode_cursor(after, 1)
+    if cursor_parts:
+        query += " WHERE id > %s"
+        params.append(int(cursor_parts[0]))
+    query += " ORDER BY id LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+
+def finish_products_page(rows, limit, fields=None):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['id'])
+
+    if fields and 'id' not in fields:
+        rows = [{f: row[f] for f in fields} for row in rows]
+    return rows, next_cursor
+
+
+def get_products_page(after=None, limit=100, fields=None):
+    """
+    Ambil satu halaman produk urut id (keyset pagination).
+    `after` adalah cursor dari halaman sebelumnya, `fields` list kolom
+    dari PRODUCT_FIELDS. Kembalikan (rows, next_cursor_atau_None).
+    """
+    query, params = products_page_query(after, limit, fields)
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+    return finish_products_page(rows, limit, fields)
+
+
+def logs_page_query(start_date=None, end_date=None, change_type=None, after=None, limit=100, fields=None):
+    """SQL dan parameter untuk get_inventory_logs_page (dipakai juga mode async)."""
+    fields = list(fields or LOG_FIELDS)
+    columns = list(dict.fromkeys(fields + ['id', 'timestamp']))
+
+    query = f"SELECT {', '.join(columns)} FROM inventory_logs WHERE 1 = 1"
+    params = []
+
+    if start_date and end_date:
+        query += " AND timestamp >= %s AND timestamp <= %s"
+        params.extend([start_date, end_date])
+
+    if change_type == "Masuk":
+        query += " AND qty_change > 0"
+    elif change_type == "Keluar":
+        query += " AND qty_change < 0"
+
+    cursor_parts = decode_cursor(after, 2)
+    if cursor_parts:
+        last_ts = datetime.fromisoformat(cursor_parts[0])
+        last_id = int(cursor_parts[1])
+        query += " AND (timestamp < %s OR (timestamp = %s AND id < %s))"
+        params.extend([last_ts, last_ts, last_id])
+
+    query += " ORDER BY timestamp DESC, id DESC LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+
+def finish_logs_page(rows, limit, fields=None):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['timestamp'], rows[-1]['id'])
+
+    fields = list(fields or LOG_FIELDS)
+    if 'id' not in fields or 'timestamp' not in fields:
+        rows = [{f: row[f] for f in fields} for row in rows]
+    return rows, next_cursor
+
+
+def get_inventory_logs_page(start_date=None, end_date=None, change_type=None, after=None, limit=100, fields=None):
+    """
+    Ambil satu halaman inventory_logs urut timestamp DESC, id DESC
+    (keyset pagination di (timestamp, id)). Kembalikan (rows, next_cursor_atau_None).
+    """
+    query, params = logs_page_query(start_date, end_date, change_type, after, limit, fields)
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+    return finish_logs_page(rows, limit, fields)
+
+
 def inventory_change(name, barcode, quantity, conn=None, cursor=None):
     """
     Update atau insert quantity produk.
@@ -206,19 +444,26 @@ def inventory_change(name, barcode, quantity, conn=None, cursor=None):
         result = cursor.fetchone()
 
         if result is not None:
-            existing_qty = result[0]
+            existing_qty = result['quantity']
             new_qty = existing_qty + quantity
             cursor.execute("UPDATE products SET quantity = %s WHERE barcode = %s", (new_qty, barcode))
-            print(f"[UPDATE] {name} (barcode: {barcode}) -> Qty: {existing_qty} + {quantity} = {new_qty}")
+            logger.debug("[UPDATE] %s (barcode: %s) -> Qty: %s + %s = %s", name, barcode, existing_qty, quantity, new_qty,
+                         extra={'sample_every': 1000})
         else:
             cursor.execute("INSERT INTO products (name, barcode, quantity) VALUES (%s, %s, %s)", (name, barcode, quantity))
-            print(f"[INSERT] {name} (barcode: {barcode}) -> Qty: {quantity}")
+            logger.debug("[INSERT] %s (barcode: %s) -> Qty: %s", name, barcode, quantity, extra={'sample_every': 1000})
 
+        _record_change(cursor, barcode)
         if not external_connection:
             conn.commit()
+            _invalidate_product(barcode)
+        else:
+            # Commit dilakukan pemanggil; invalidate sebelum itu membuka
+            # jendela bagi pembaca untuk mengisi cache dengan baris lama
+            conn.on_commit(lambda: _invalidate_product(barcode))
 
     except Exception as e:
-        print(f"[ERROR] Gagal update/insert: {name}, {barcode}, {quantity} | {e}")
+        logger.error("Gagal update/insert: %s, %s, %s | %s", name, barcode, quantity, e)
         if not external_connection:
             conn.rollback()
 
@@ -229,32 +474,111 @@ def inventory_change(name, barcode, quantity, conn=None, cursor=None):
 
 
 
+def _invalidate_product(barcode):
+    product_cache.invalidate(barcode)
+    products_changed()
+
+
 def log_inventory_change(name, barcode, qty_change, username):
-    conn = connect()
-    cursor = conn.cursor()
+    with connect() as conn:
+        cursor = conn.cursor()
 
-    # Ambil stok saat ini dari tabel products
-    cursor.execute("SELECT quantity FROM products WHERE barcode = %s", (barcode,))
-    result = cursor.fetchone()
-    current_stock = result["quantity"] if result else 0
+        # Ambil stok saat ini dari tabel products
+        cursor.execute("SELECT quantity FROM products WHERE barcode = %s", (barcode,))
+        result = cursor.fetchone()
+        current_stock = result["quantity"] if result else 0
 
-    # Simpan log beserta current_stock
-    cursor.execute("""
-        INSERT INTO inventory_logs (name, barcode, qty_change, username, current_stock)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (name, barcode, qty_change, username, current_stock))
+        # Simpan log beserta current_stock
+        cursor.execute("""
+            INSERT INTO inventory_logs (name, barcode, qty_change, username, current_stock)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (name, barcode, qty_change, username, current_stock))
+        _record_rollup(cursor, barcode, username, qty_change)
 
-    conn.commit()
-    conn.close()
+        conn.commit()
+
+
+def _record_rollup(cursor, barcode, username, qty_change):
+    # Import lokal: rollups.py sendiri bergantung pada modul ini
+    from rollups import record_movements
+    record_movements(cursor, [(barcode, username, int(qty_change))])
+
+
+def _record_change(cursor, barcode):
+    # Import lokal, sama seperti _record_rollup
+    from product_changes import record_product_changes
+    record_product_changes(cursor, [barcode])
+
+
+def delete_inventory_log(log_id):
+    """Hapus satu log dan kurangi rollup hari itu. Kembalikan False kalau log tidak ada."""
+    from rollups import remove_movement
+
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT timestamp, barcode, username, qty_change FROM inventory_logs WHERE id = %s FOR UPDATE",
+            (log_id,)
+        )
+        log_row = cursor.fetchone()
+        if log_row is None:
+            cursor.close()
+            return False
+
+        cursor.execute("DELETE FROM inventory_logs WHERE id = %s", (log_id,))
+        remove_movement(cursor, log_row)
+        conn.commit()
+        cursor.close()
+    return True
+
+
+def get_user(username):
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT username, password, role, phone FROM users WHERE username = %s", (username,))
+        user = cursor.fetchone()
+        cursor.close()
+    return user
+
+
+def set_user_password(username, password_hash):
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE users SET password = %s WHERE username = %s", (password_hash, username))
+        conn.commit()
+        cursor.close()
+
+
+def add_revoked_token(jti, expires_at):
+    """Simpan jti yang dicabut sampai `expires_at` (epoch) dan buang entri yang sudah lewat."""
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO revoked_tokens (jti, expires_at) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE expires_at = GREATEST(expires_at, VALUES(expires_at))",
+            (jti, expires_at)
+        )
+        cursor.execute("DELETE FROM revoked_tokens WHERE expires_at < %s", (int(time.time()),))
+        conn.commit()
+        cursor.close()
+
+
+def get_revoked_tokens():
+    """Dict jti -> expires_at untuk token yang dicabut dan belum lewat masanya."""
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT jti, expires_at FROM revoked_tokens WHERE expires_at >= %s", (int(time.time()),))
+        rows = cursor.fetchall()
+        cursor.close()
+    return {row['jti']: int(row['expires_at']) for row in rows}
 
 
 def verify_user(username, password):
-    conn = connect()
-    cursor = conn.cursor()
-    cursor.execute("SELECT role FROM users WHERE username = %s AND password = %s", (username, password))
-    result = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT role FROM users WHERE username = %s AND password = %s", (username, password))
+        result = cursor.fetchone()
+        cursor.close()
 
     if result:
         # Jika result berupa dict (bukan tuple), ambil dengan key
@@ -275,7 +599,7 @@ def add_staff(username, password, phone):
         conn.commit()
         return True
     except Exception as e:
-        print("Gagal menambahkan staff:", e)
+        logger.error("Gagal menambahkan staff: %s", e)
         return False
     finally:
         conn.close()
@@ -345,55 +669,133 @@ def create_product_group(group_name, description=None, product_ids=[]):
                     values
                 )
         conn.commit()
+        groups_changed()
         return True
     except Exception as e:
-        print(f"[ERROR] Gagal membuat grup produk: {e}")
+        logger.error("Gagal membuat grup produk: %s", e)
         conn.rollback()
         return False
     finally:
         if conn:
             conn.close()
 
+ALL_GROUPS_QUERY = """
+    SELECT pg.id, pg.group_name, pg.description,
+           p.id AS product_id, p.name AS product_name, p.barcode, p.quantity
+    FROM product_groups pg
+    LEFT JOIN grouping_products gp ON pg.id = gp.group_id
+    LEFT JOIN products p ON gp.product_id = p.id
+    ORDER BY pg.group_name, p.name
+"""
+
+
+def build_group_list(raw_data):
+    """Satukan baris join ALL_GROUPS_QUERY jadi list grup beserta produknya."""
+    groups = {}
+    for row in raw_data:
+        group_id = row['id']
+        if group_id not in groups:
+            groups[group_id] = {
+                'id': row['id'],
+                'group_name': row['group_name'],
+                'description': row['description'],
+                'products': []
+            }
+        if row['product_id'] is not None:
+            groups[group_id]['products'].append({
+                'id': row['product_id'],
+                'name': row['product_name'],
+                'barcode': row['barcode'],
+                'quantity': row['quantity']
+            })
+    return list(groups.values())
+
+
 def get_all_product_groups():
     conn = connect()
     cursor = conn.cursor()
     try:
-        query = """
-        SELECT pg.id, pg.group_name, pg.description,
-               p.id AS product_id, p.name AS product_name, p.barcode, p.quantity
-        FROM product_groups pg
-        LEFT JOIN grouping_products gp ON pg.id = gp.group_id
-        LEFT JOIN products p ON gp.product_id = p.id
-        ORDER BY pg.group_name, p.name
-        """
-        cursor.execute(query)
-        raw_data = cursor.fetchall()
-
-        groups = {}
-        for row in raw_data:
-            group_id = row['id']
-            if group_id not in groups:
-                groups[group_id] = {
-                    'id': row['id'],
-                    'group_name': row['group_name'],
-                    'description': row['description'],
-                    'products': []
-                }
-            if row['product_id'] is not None:
-                groups[group_id]['products'].append({
-                    'id': row['product_id'],
-                    'name': row['product_name'],
-                    'barcode': row['barcode'],
-                    'quantity': row['quantity']
-                })
-        return list(groups.values())
+        cursor.execute(ALL_GROUPS_QUERY)
+        return build_group_list(cursor.fetchall())
     except Exception as e:
-        print(f"[ERROR] Gagal mengambil grup produk: {e}")
+        logger.error("Gagal mengambil grup produk: %s", e)
         return []
     finally:
         if conn:
             conn.close()
 
+GROUP_SUMMARY_QUERY = """
+    SELECT pg.id, pg.group_name, pg.description,
+           COUNT(p.id) AS member_count,
+           COALESCE(SUM(p.quantity), 0) AS total_quantity
+    FROM product_groups pg
+    LEFT JOIN grouping_products gp ON pg.id = gp.group_id
+    LEFT JOIN products p ON gp.product_id = p.id
+"""
+
+
+def format_group_summary(row):
+    row['member_count'] = int(row['member_count'])
+    row['total_quantity'] = int(row['total_quantity'])
+    return row
+
+
+ALL_GROUP_SUMMARIES_QUERY = GROUP_SUMMARY_QUERY + " GROUP BY pg.id, pg.group_name, pg.description ORDER BY pg.group_name"
+ONE_GROUP_SUMMARY_QUERY = GROUP_SUMMARY_QUERY + " WHERE pg.id = %s GROUP BY pg.id, pg.group_name, pg.description"
+
+
+def get_product_group_summaries():
+    """Daftar grup dengan jumlah anggota dan total quantity dihitung di SQL, tanpa daftar produk."""
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ALL_GROUP_SUMMARIES_QUERY)
+        rows = cursor.fetchall()
+        cursor.close()
+    return [format_group_summary(row) for row in rows]
+
+
+def get_product_group(group_id):
+    """Satu grup beserta agregatnya, atau None kalau tidak ada."""
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ONE_GROUP_SUMMARY_QUERY, (group_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    return format_group_summary(row) if row else None
+
+
+def group_members_query(group_id, after=None, limit=100):
+    """SQL dan parameter untuk get_group_members_page (dipakai juga mode async)."""
+    query = """
+        SELECT p.id, p.name, p.barcode, p.quantity
+        FROM grouping_products gp
+        JOIN products p ON p.id = gp.product_id
+        WHERE gp.group_id = %s
+    """
+    params = [group_id]
+    cursor_parts = decode_cursor(after, 1)
+    if cursor_parts:
+        query += " AND gp.product_id > %s"
+        params.append(int(cursor_parts[0]))
+    query += " ORDER BY gp.product_id LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+
+def get_group_members_page(group_id, after=None, limit=100):
+    """
+    Anggota grup urut product id (keyset pagination di primary key
+    grouping_products). Kembalikan (rows, next_cursor_atau_None).
+    """
+    query, params = group_members_query(group_id, after, limit)
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+    return finish_products_page(rows, limit)
+
+
 def update_product_group(group_id, new_group_name=None, new_description=None, new_product_ids=None):
     conn = connect()
     cursor = conn.cursor()
@@ -413,23 +815,36 @@ def update_product_group(group_id, new_group_name=None, new_description=None, ne
             params.append(group_id)
             cursor.execute(query, tuple(params))
 
-        # Update associated products in grouping_products table
+        # Update associated products in grouping_products table:
+        # hanya tulis selisihnya (yang ditambah dan yang dihapus)
         if new_product_ids is not None:
-            cursor.execute("DELETE FROM grouping_products WHERE group_id = %s", (group_id,))
-            if new_product_ids:
-                # Pastikan new_product_ids adalah list of int
-                new_product_ids = [int(pid) for pid in new_product_ids if isinstance(pid, (int, str)) and str(pid).isdigit()]
-
-                if new_product_ids:
-                    values = [(group_id, pid) for pid in new_product_ids]
-                    cursor.executemany(
-                        "INSERT INTO grouping_products (group_id, product_id) VALUES (%s, %s)",
-                        values
-                    )
+            # Pastikan new_product_ids adalah list of int
+            wanted = {int(pid) for pid in new_product_ids if isinstance(pid, (int, str)) and str(pid).isdigit()}
+
+            cursor.execute("SELECT product_id FROM grouping_products WHERE group_id = %s FOR UPDATE", (group_id,))
+            current = {row['product_id'] for row in cursor.fetchall()}
+
+            to_remove = sorted(current - wanted)
+            to_add = sorted(wanted - current)
+
+            for start in range(0, len(to_remove), 1000):
+                chunk = to_remove[start:start + 1000]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(
+                    f"DELETE FROM grouping_products WHERE group_id = %s AND product_id IN ({placeholders})",
+                    (group_id, *chunk)
+                )
+            if to_add:
+                cursor.executemany(
+                    "INSERT INTO grouping_products (group_id, product_id) VALUES (%s, %s)",
+                    [(group_id, pid) for pid in to_add]
+                )
+            logger.debug("Grup %s: +%d -%d produk", group_id, len(to_add), len(to_remove))
         conn.commit()
+        groups_changed()
         return True
     except Exception as e:
-        print(f"[ERROR] Gagal update grup produk: {e}")
+        logger.error("Gagal update grup produk: %s", e)
         conn.rollback()
         return False
     finally:
@@ -443,9 +858,10 @@ def delete_product_group(group_id):
         # ON DELETE CASCADE pada FK akan menghapus entri di grouping_products secara otomatis
         cursor.execute("DELETE FROM product_groups WHERE id = %s", (group_id,))
         conn.commit()
+        groups_changed()
         return cursor.rowcount > 0
     except Exception as e:
-        print(f"[ERROR] Gagal menghapus grup produk: {e}")
+        logger.error("Gagal menghapus grup produk: %s", e)
         conn.rollback()
         return False
     finally:
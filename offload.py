@@ -0,0 +1,102 @@
+"""
+Executor untuk pekerjaan CPU di mode ASGI, supaya event loop tidak ikut
+tertahan.
+
+- Hash password (PBKDF2) jalan di thread pool: hashlib melepas GIL selama
+  iterasi, jadi beberapa login bisa diverifikasi paralel.
+- Pembuatan Excel (pandas/openpyxl/xlsxwriter) memegang GIL hampir sepanjang
+  waktu, jadi dijalankan di process pool terpisah. Fungsi yang dikirim ke
+  process pool harus top-level di modul ini supaya bisa di-pickle.
+"""
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+HASH_THREADS = int(os.environ.get('PINVENTORY_HASH_THREADS', 4))
+EXCEL_WORKERS = int(os.environ.get('PINVENTORY_EXCEL_WORKERS', 2))
+
+_hash_executor = None
+_excel_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_hash_executor():
+    global _hash_executor
+    with _executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(max_workers=HASH_THREADS, thread_name_prefix='hash')
+        return _hash_executor
+
+
+def _get_excel_executor():
+    global _excel_executor
+    with _executor_lock:
+        if _excel_executor is None:
+            # spawn: proses anak tidak mewarisi socket pool MySQL milik induk
+            _excel_executor = ProcessPoolExecutor(
+                max_workers=EXCEL_WORKERS, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _excel_executor
+
+
+def shutdown():
+    global _hash_executor, _excel_executor
+    with _executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False)
+            _hash_executor = None
+        if _excel_executor is not None:
+            _excel_executor.shutdown(wait=False, cancel_futures=True)
+            _excel_executor = None
+
+
+# --- PASSWORD ---
+
+async def check_password_hash(password_hash, password):
+    from werkzeug.security import check_password_hash as check
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), check, password_hash, password)
+
+
+async def generate_password_hash(password):
+    from werkzeug.security import generate_password_hash as generate
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), generate, password)
+
+
+# --- EXCEL ---
+
+def _build_products_xlsx(products):
+    from exporter_products import export_products_to_excel
+    return export_products_to_excel(products).getvalue()
+
+
+def _write_timelog_xlsx(start, end, change_type):
+    from exporter_timelog import write_logs_xlsx
+    from time_log import iter_time_logs
+
+    fd, path = tempfile.mkstemp(prefix="timelog_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_logs_xlsx(iter_time_logs(start, end, change_type), path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+async def build_products_xlsx(products):
+    """Bytes xlsx untuk list produk, dibuat di process pool."""
+    return await asyncio.get_running_loop().run_in_executor(_get_excel_executor(), _build_products_xlsx, products)
+
+
+async def write_timelog_xlsx(start, end, change_type):
+    """
+    Tulis export timelog ke file sementara di process pool (baris dibaca
+    langsung oleh proses anak dari cursor server-side). Kembalikan path-nya;
+    pemanggil wajib menghapus file setelah dikirim.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_excel_executor(), _write_timelog_xlsx, start, end, change_type
+    )
@@ -0,0 +1,49 @@
+import base64
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def parse_limit(value):
+    """Ubah parameter limit dari query string jadi int di antara 1..MAX_PAGE_SIZE."""
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Parameter limit harus berupa angka")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def parse_fields(value, allowed):
+    """
+    Ubah "name,barcode" jadi list kolom yang valid (urutan sesuai input).
+    Kembalikan None kalau parameter tidak diisi (semua kolom).
+    """
+    if not value:
+        return None
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Field tidak dikenal: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def encode_cursor(*parts):
+    raw = '|'.join(p.isoformat() if isinstance(p, datetime) else str(p) for p in parts)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, count):
+    """Kembalikan list string sebanyak `count` dari cursor, atau None kalau kosong."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+    except Exception:
+        raise ValueError("Cursor tidak valid")
+    if len(parts) != count:
+        raise ValueError("Cursor tidak valid")
+    return parts
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MISS = object()
+
+
+class ProductCache:
+    """
+    Cache LRU thread-safe untuk lookup produk per barcode, dengan TTL dan
+    batas ukuran. Penulis wajib memanggil invalidate() setelah transaksi yang
+    mengubah baris products di-commit (bukan sebelumnya: pembaca bisa mengisi
+    ulang cache dengan baris lama yang masih terlihat).
+
+    Untuk mencegah nilai basi tersimpan (pembaca mengambil dari DB, penulis
+    invalidate, lalu pembaca menyimpan nilai lama), pembaca mengambil token
+    lewat begin_read() sebelum query dan put_if_fresh() menolak menyimpan
+    kalau sudah ada penulisan sejak token itu diambil.
+    """
+
+    def __init__(self, maxsize=10000, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # barcode -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, barcode):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(barcode)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[barcode]
+                self._stats['misses'] += 1
+                return MISS
+            self._data.move_to_end(barcode)
+            self._stats['hits'] += 1
+            return dict(entry[1])
+
+    def begin_read(self):
+        with self._lock:
+            return self._writes
+
+    def put_if_fresh(self, barcode, value, token):
+        with self._lock:
+            if token != self._writes:
+                return False
+            self._store(barcode, value)
+            return True
+
+    def put(self, barcode, value):
+        """Write-through dari penulis yang sudah commit nilai terbaru."""
+        with self._lock:
+            self._writes += 1
+            self._store(barcode, value)
+
+    def _store(self, barcode, value):
+        self._data[barcode] = (time.monotonic() + self.ttl, dict(value))
+        self._data.move_to_end(barcode)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def invalidate(self, barcode):
+        with self._lock:
+            self._writes += 1
+            self._stats['invalidations'] += 1
+            self._data.pop(barcode, None)
+
+    def clear(self):
+        with self._lock:
+            self._writes += 1
+            self._stats['invalidations'] += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+                **self._stats,
+            }
+
+
+product_cache = ProductCache(
+    maxsize=int(os.environ.get('PINVENTORY_PRODUCT_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('PINVENTORY_PRODUCT_CACHE_TTL', 30)),
+)
@@ -0,0 +1,160 @@
+"""
+Feed perubahan produk untuk delta sync (/api/products/changes).
+
+Setiap jalur tulis produk menambahkan baris ke product_changes di dalam
+transaksinya sendiri. Klien menyimpan cursor (id terakhir yang sudah dilihat)
+dan hanya mengambil produk yang berubah sesudahnya. Import yang mengganti
+seluruh katalog dicatat sebagai baris dengan barcode NULL, yang memaksa klien
+melakukan sinkronisasi penuh.
+
+Baris lama dibuang lewat cron:
+    python product_changes.py prune [hari]
+"""
+import os
+import sys
+from mysql_database import connect
+from pagination import DEFAULT_PAGE_SIZE, encode_cursor, decode_cursor
+
+CHANGE_RETENTION_DAYS = int(os.environ.get('PINVENTORY_CHANGE_RETENTION_DAYS', 30))
+# id AUTO_INCREMENT dibagikan saat INSERT, bukan saat commit: transaksi yang
+# lebih lama bisa commit id kecil setelah id besar terlihat. Cursor hanya
+# maju sampai baris yang sudah lebih tua dari jeda ini; baris sesudahnya
+# dikirim ulang di poll berikutnya (aman karena yang dikirim adalah stok terkini).
+SYNC_LAG_SECONDS = int(os.environ.get('PINVENTORY_SYNC_LAG_SECONDS', 5))
+PRUNE_CHUNK_SIZE = 5000
+
+INSERT_CHANGE = "INSERT INTO product_changes (barcode) VALUES (%s)"
+
+
+def record_product_changes(cursor, barcodes):
+    """Catat perubahan produk dalam transaksi pemanggil."""
+    barcodes = list(dict.fromkeys(barcodes))
+    if barcodes:
+        cursor.executemany(INSERT_CHANGE, [(b,) for b in barcodes])
+
+
+def record_catalog_reset(cursor):
+    """Catat bahwa seluruh katalog diganti; klien dengan cursor lebih lama wajib resync."""
+    cursor.execute("INSERT INTO product_changes (barcode) VALUES (NULL)")
+
+
+def _parse_since(since):
+    parts = decode_cursor(since, 1)
+    if parts is None:
+        return None
+    try:
+        return int(parts[0])
+    except ValueError:
+        raise ValueError("Cursor tidak valid")
+
+
+def get_product_changes(since=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Produk yang berubah setelah cursor `since`.
+    Kembalikan dict {items, deleted, next_cursor, has_more, resync_required}:
+    items berisi baris produk terkini, deleted barcode yang sudah tidak ada.
+    Kalau resync_required True, klien harus mengunduh ulang /api/products
+    lalu melanjutkan dari next_cursor.
+    """
+    since_id = _parse_since(since)
+
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(id) AS first_id, MAX(id) AS last_id FROM product_changes")
+        bounds = cursor.fetchone()
+        first_id = bounds['first_id'] or 0
+        last_id = bounds['last_id'] or 0
+
+        cursor.execute(
+            "SELECT id FROM product_changes WHERE id > %s AND changed_at > NOW() - INTERVAL %s SECOND "
+            "ORDER BY id LIMIT 1",
+            (since_id or 0, SYNC_LAG_SECONDS)
+        )
+        unstable = cursor.fetchone()
+        stable_id = unstable['id'] - 1 if unstable else last_id
+
+        resync = (
+            since_id is None
+            or since_id > last_id
+            or (first_id and since_id < first_id - 1)
+        )
+        if not resync:
+            cursor.execute(
+                "SELECT id FROM product_changes WHERE barcode IS NULL AND id > %s LIMIT 1", (since_id,)
+            )
+            resync = cursor.fetchone() is not None
+
+        if resync:
+            cursor.close()
+            return {'items': [], 'deleted': [], 'next_cursor': encode_cursor(stable_id),
+                    'has_more': False, 'resync_required': True}
+
+        cursor.execute(
+            "SELECT barcode, MAX(id) AS change_id FROM product_changes "
+            "WHERE id > %s AND barcode IS NOT NULL "
+            "GROUP BY barcode ORDER BY change_id LIMIT %s",
+            (since_id, limit)
+        )
+        changes = cursor.fetchall()
+
+        products = {}
+        if changes:
+            placeholders = ', '.join(['%s'] * len(changes))
+            cursor.execute(
+                f"SELECT id, name, barcode, quantity FROM products WHERE barcode IN ({placeholders})",
+                [row['barcode'] for row in changes]
+            )
+            products = {row['barcode']: row for row in cursor.fetchall()}
+        cursor.close()
+
+    items = [products[row['barcode']] for row in changes if row['barcode'] in products]
+    deleted = [row['barcode'] for row in changes if row['barcode'] not in products]
+
+    full_page = len(changes) == limit
+    # Halaman tidak penuh berarti semua perubahan sampai last_id sudah terkirim
+    next_id = min(changes[-1]['change_id'], stable_id) if full_page else stable_id
+    next_id = max(next_id, since_id)
+    return {'items': items, 'deleted': deleted, 'next_cursor': encode_cursor(next_id),
+            'has_more': full_page and next_id > since_id, 'resync_required': False}
+
+
+def prune_product_changes(keep_days=CHANGE_RETENTION_DAYS, chunk_size=PRUNE_CHUNK_SIZE):
+    """
+    Hapus baris yang lebih tua dari `keep_days` hari, per chunk. Baris
+    terakhir selalu disimpan supaya cursor terbaru tetap dikenali.
+    Kembalikan jumlah baris yang dihapus.
+    """
+    deleted = 0
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(id) AS last_id FROM product_changes")
+        last_id = cursor.fetchone()['last_id']
+        if last_id is None:
+            cursor.close()
+            return 0
+        while True:
+            cursor.execute(
+                "DELETE FROM product_changes WHERE changed_at < NOW() - INTERVAL %s DAY AND id < %s "
+                "ORDER BY id LIMIT %s",
+                (keep_days, last_id, chunk_size)
+            )
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < chunk_size:
+                break
+        cursor.close()
+    return deleted
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else None
+    if command == 'prune':
+        keep_days = int(argv[2]) if len(argv) > 2 else CHANGE_RETENTION_DAYS
+        print(f"{prune_product_changes(keep_days)} baris product_changes dihapus")
+        return 0
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,175 @@
+"""
+Rollup harian pergerakan stok (qty masuk/keluar per hari, barcode, staff).
+Diperbarui secara inkremental setiap kali log ditulis, dan bisa dibangun
+ulang dari inventory_logs:
+
+    python rollups.py rebuild [YYYY-MM-DD] [YYYY-MM-DD]
+"""
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from mysql_database import connect
+
+# Pergerakan dicatat di hari server (CURRENT_DATE), sama dengan NOW() di log
+_UPSERT_ROLLUP_ROW = "(CURRENT_DATE(), %s, %s, %s, %s, %s)"
+_UPSERT_ROLLUP_TAIL = """
+    ON DUPLICATE KEY UPDATE
+        qty_in = qty_in + VALUES(qty_in),
+        qty_out = qty_out + VALUES(qty_out),
+        events = events + VALUES(events)
+"""
+_ROLLUP_CHUNK = 500
+
+SUMMARY_GROUPS = {
+    'day': 'day',
+    'barcode': 'barcode',
+    'username': 'username',
+}
+
+
+def record_movements(cursor, movements):
+    """
+    Tambahkan pergerakan hari ini ke rollup dalam transaksi pemanggil.
+    `movements` adalah iterable (barcode, username, qty_change).
+    """
+    for query, params in movement_statements(movements):
+        cursor.execute(query, params)
+
+
+def movement_statements(movements):
+    """Pasangan (sql, params) yang dijalankan record_movements; dipakai juga mode async."""
+    totals = defaultdict(lambda: [0, 0, 0])
+    for barcode, username, qty_change in movements:
+        entry = totals[(barcode, username or '')]
+        if qty_change > 0:
+            entry[0] += qty_change
+        else:
+            entry[1] += -qty_change
+        entry[2] += 1
+
+    items = list(totals.items())
+    for start in range(0, len(items), _ROLLUP_CHUNK):
+        chunk = items[start:start + _ROLLUP_CHUNK]
+        params = []
+        for (barcode, username), (qty_in, qty_out, events) in chunk:
+            params.extend([barcode, username, qty_in, qty_out, events])
+        yield (
+            "INSERT INTO inventory_daily_rollups (day, barcode, username, qty_in, qty_out, events) VALUES "
+            + ", ".join([_UPSERT_ROLLUP_ROW] * len(chunk)) + _UPSERT_ROLLUP_TAIL,
+            params
+        )
+
+
+def remove_movement(cursor, log_row):
+    """Kurangi rollup untuk satu baris log yang dihapus (dict dengan timestamp, barcode, username, qty_change)."""
+    qty_change = log_row['qty_change']
+    cursor.execute("""
+        UPDATE inventory_daily_rollups
+        SET qty_in = qty_in - %s, qty_out = qty_out - %s, events = events - 1
+        WHERE day = DATE(%s) AND barcode = %s AND username = %s
+    """, (max(qty_change, 0), max(-qty_change, 0), log_row['timestamp'],
+          log_row['barcode'], log_row['username'] or ''))
+
+
+def rebuild_rollups(start_date=None, end_date=None):
+    """
+    Bangun ulang rollup untuk hari [start_date, end_date) dari inventory_logs,
+    per bulan supaya tiap transaksi tetap kecil. Tanpa argumen: seluruh log.
+    Kembalikan jumlah baris rollup yang ditulis.
+    """
+    with connect() as conn:
+        cursor = conn.cursor()
+        if start_date is None or end_date is None:
+            cursor.execute("SELECT MIN(timestamp) AS first_ts, MAX(timestamp) AS last_ts FROM inventory_logs")
+            bounds = cursor.fetchone()
+            if not bounds or bounds['first_ts'] is None:
+                cursor.execute("DELETE FROM inventory_daily_rollups")
+                conn.commit()
+                return 0
+            start_date = start_date or bounds['first_ts'].date()
+            end_date = end_date or bounds['last_ts'].date() + timedelta(days=1)
+
+        start_date = _as_date(start_date)
+        end_date = _as_date(end_date)
+
+        written = 0
+        window_start = start_date
+        while window_start < end_date:
+            next_month = (window_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            window_end = min(next_month, end_date)
+
+            cursor.execute(
+                "DELETE FROM inventory_daily_rollups WHERE day >= %s AND day < %s",
+                (window_start, window_end)
+            )
+            cursor.execute("""
+                INSERT INTO inventory_daily_rollups (day, barcode, username, qty_in, qty_out, events)
+                SELECT DATE(timestamp), barcode, COALESCE(username, ''),
+                       SUM(GREATEST(qty_change, 0)), SUM(GREATEST(-qty_change, 0)), COUNT(*)
+                FROM inventory_logs
+                WHERE timestamp >= %s AND timestamp < %s
+                GROUP BY DATE(timestamp), barcode, COALESCE(username, '')
+            """, (window_start, window_end))
+            written += cursor.rowcount
+            conn.commit()
+            window_start = window_end
+
+        cursor.close()
+    return written
+
+
+def get_rollup_summary(start_date, end_date, group_by='day', barcode=None, username=None):
+    """
+    Total qty masuk/keluar untuk hari [start_date, end_date] (inklusif),
+    dikelompokkan per day, barcode atau username. Dibaca dari rollup,
+    bukan dari inventory_logs.
+    """
+    if group_by not in SUMMARY_GROUPS:
+        raise ValueError(f"group_by harus salah satu dari: {', '.join(SUMMARY_GROUPS)}")
+    column = SUMMARY_GROUPS[group_by]
+
+    query = f"""
+        SELECT {column}, SUM(qty_in) AS qty_in, SUM(qty_out) AS qty_out, SUM(events) AS events
+        FROM inventory_daily_rollups
+        WHERE day >= %s AND day <= %s
+    """
+    params = [_as_date(start_date), _as_date(end_date)]
+    if barcode:
+        query += " AND barcode = %s"
+        params.append(barcode)
+    if username:
+        query += " AND username = %s"
+        params.append(username)
+    query += f" GROUP BY {column} ORDER BY {column}"
+
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    for row in rows:
+        if isinstance(row.get('day'), date):
+            row['day'] = row['day'].isoformat()
+        for key in ('qty_in', 'qty_out', 'events'):
+            row[key] = int(row[key] or 0)
+    return rows
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'rebuild':
+        print(__doc__)
+        sys.exit(2)
+    start = sys.argv[2] if len(sys.argv) > 2 else None
+    end = sys.argv[3] if len(sys.argv) > 3 else None
+    if end:
+        end = _as_date(end) + timedelta(days=1)
+    print(f"{rebuild_rollups(start, end)} baris rollup ditulis")
@@ -0,0 +1,208 @@
+import threading
+import time
+from mysql_database import connect
+from product_cache import product_cache
+from change_version import products_changed
+from rollups import record_movements
+from product_changes import record_product_changes
+from storage import PRODUCT_NOT_FOUND, NEGATIVE_STOCK, parse_batch_events
+
+
+# Stok diubah dengan satu UPDATE bersyarat, jadi tidak ada read-modify-write
+# yang bisa balapan antar scanner. Baris yang sudah di-UPDATE terkunci sampai
+# commit, sehingga SELECT berikutnya membaca stok milik transaksi ini sendiri.
+UPDATE_STOCK = """
+    UPDATE products SET quantity = quantity + %s
+    WHERE barcode = %s AND quantity >= %s
+"""
+SELECT_PRODUCT = "SELECT name, quantity FROM products WHERE barcode = %s"
+INSERT_LOG = """
+    INSERT INTO inventory_logs (name, barcode, qty_change, action_type, timestamp, username, current_stock)
+    VALUES (%s, %s, %s, %s, NOW(), %s, %s)
+"""
+
+_BATCH_CHUNK = 500
+
+_stats_lock = threading.Lock()
+_stats = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+
+
+def apply_scan(barcode, qty, action, username, conn=None):
+    """
+    Terapkan satu scan (masuk/keluar) dalam satu transaksi di satu koneksi:
+    UPDATE stok bersyarat (tidak boleh minus), baca stok baru, tulis log, commit.
+    Kembalikan (True, {"name", "quantity"}) atau (False, pesan_error).
+    Kalau conn diberikan, pemanggil yang mengurus commit dan close; cache dan
+    versi ETag baru diperbarui setelah pemanggil commit (conn.on_commit).
+    """
+    started = time.perf_counter()
+    external_connection = conn is not None
+    if not external_connection:
+        conn = connect()
+
+    try:
+        success, result = _apply(conn, barcode, qty, action, username)
+        if not external_connection:
+            if success:
+                conn.commit()
+                _after_write([barcode])
+            else:
+                conn.rollback()
+        elif success:
+            conn.on_commit(lambda: _after_write([barcode]))
+        return success, result
+    except Exception:
+        if not external_connection:
+            conn.rollback()
+        raise
+    finally:
+        if not external_connection:
+            conn.close()
+        record_scan_time((time.perf_counter() - started) * 1000)
+
+
+def _apply(conn, barcode, qty, action, username):
+    delta = qty if action == 'in' else -qty
+    cursor = conn.cursor()
+    try:
+        cursor.execute(UPDATE_STOCK, (delta, barcode, max(-delta, 0)))
+        if cursor.rowcount == 0:
+            # Hanya jalur gagal yang butuh query tambahan untuk membedakan
+            # barcode tidak ada dengan stok yang tidak cukup
+            cursor.execute(SELECT_PRODUCT, (barcode,))
+            if cursor.fetchone() is None:
+                return False, PRODUCT_NOT_FOUND
+            return False, NEGATIVE_STOCK
+
+        cursor.execute(SELECT_PRODUCT, (barcode,))
+        product = cursor.fetchone()
+
+        cursor.execute(INSERT_LOG, (
+            product['name'],
+            barcode,
+            delta,
+            'IN' if action == 'in' else 'OUT',
+            username,
+            product['quantity'],
+        ))
+        record_movements(cursor, [(barcode, username, delta)])
+        record_product_changes(cursor, [barcode])
+        return True, {"name": product['name'], "quantity": product['quantity']}
+    finally:
+        cursor.close()
+
+
+def apply_scan_batch(events):
+    """
+    Terapkan banyak event scan {barcode, qty, action, username} dalam satu
+    transaksi: semua barcode diambil dengan satu SELECT ... FOR UPDATE,
+    stok dihitung berurutan di memori, lalu UPDATE dan INSERT log ditulis
+    secara bulk. Event yang gagal (barcode tidak ada, stok minus, data tidak
+    valid) dilewati tanpa membatalkan event lainnya.
+    Kembalikan list hasil per item sesuai urutan input.
+    """
+    results, parsed = parse_batch_events(events)
+    if not parsed:
+        return results
+
+    with connect() as conn:
+        cursor = conn.cursor()
+        try:
+            barcodes = sorted({item[1] for item in parsed})
+            products = {}
+            for chunk in _chunks(barcodes, _BATCH_CHUNK):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(
+                    f"SELECT id, name, barcode, quantity FROM products WHERE barcode IN ({placeholders}) FOR UPDATE",
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    products[row['barcode']] = row
+
+            stock = {barcode: row['quantity'] for barcode, row in products.items()}
+            log_rows = []
+            for index, barcode, qty, action, username in parsed:
+                product = products.get(barcode)
+                if product is None:
+                    results[index] = {'index': index, 'success': False, 'barcode': barcode, 'message': PRODUCT_NOT_FOUND}
+                    continue
+
+                delta = qty if action == 'in' else -qty
+                new_qty = stock[barcode] + delta
+                if new_qty < 0:
+                    results[index] = {'index': index, 'success': False, 'barcode': barcode, 'message': NEGATIVE_STOCK}
+                    continue
+
+                stock[barcode] = new_qty
+                log_rows.append((
+                    product['name'], barcode, delta,
+                    'IN' if action == 'in' else 'OUT',
+                    username, new_qty
+                ))
+                results[index] = {
+                    'index': index, 'success': True, 'barcode': barcode,
+                    'product': {'name': product['name'], 'quantity': new_qty}
+                }
+
+            changed = [(products[b]['id'], q) for b, q in stock.items() if q != products[b]['quantity']]
+            for chunk in _chunks(changed, _BATCH_CHUNK):
+                cases = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+                placeholders = ', '.join(['%s'] * len(chunk))
+                params = [value for pair in chunk for value in pair]
+                params.extend(product_id for product_id, _ in chunk)
+                cursor.execute(
+                    f"UPDATE products SET quantity = CASE id {cases} END WHERE id IN ({placeholders})",
+                    params
+                )
+
+            for chunk in _chunks(log_rows, _BATCH_CHUNK):
+                values = ', '.join(['(%s, %s, %s, %s, NOW(), %s, %s)'] * len(chunk))
+                cursor.execute(
+                    "INSERT INTO inventory_logs (name, barcode, qty_change, action_type, timestamp, username, current_stock) "
+                    f"VALUES {values}",
+                    [value for row in chunk for value in row]
+                )
+            record_movements(cursor, [(row[1], row[4], row[2]) for row in log_rows])
+            record_product_changes(cursor, [row[1] for row in log_rows])
+
+            conn.commit()
+        finally:
+            cursor.close()
+
+    if log_rows:
+        _after_write({row[1] for row in log_rows})
+    return results
+
+
+def _after_write(barcodes):
+    """
+    Dipanggil setelah commit. Cache di-invalidate, bukan diisi nilai baru:
+    dua scan yang commit berurutan bisa menulis cache dalam urutan terbalik,
+    sedangkan pembaca berikutnya selalu membaca stok yang sudah commit.
+    """
+    for barcode in barcodes:
+        product_cache.invalidate(barcode)
+    products_changed()
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def record_scan_time(elapsed_ms):
+    with _stats_lock:
+        _stats['count'] += 1
+        _stats['total_ms'] += elapsed_ms
+        if elapsed_ms > _stats['max_ms']:
+            _stats['max_ms'] = elapsed_ms
+
+
+def get_scan_stats():
+    with _stats_lock:
+        count = _stats['count']
+        return {
+            'count': count,
+            'avg_ms': round(_stats['total_ms'] / count, 3) if count else 0.0,
+            'max_ms': round(_stats['max_ms'], 3),
+        }
@@ -0,0 +1,191 @@
+"""
+Launcher produksi Pinventory (pengganti app.run(debug=True)).
+
+Di Linux app dijalankan di gunicorn: beberapa proses worker gthread dengan
+beberapa thread masing-masing, app dimuat sekali di master lalu di-fork
+(preload). Di Windows (build PyInstaller untuk kasir) atau kalau gunicorn
+tidak terpasang, dipakai waitress dengan batas yang sama.
+
+    python serve.py                          # app Flask (app:app) di 0.0.0.0:5000
+    python serve.py --app time_log:app --bind 0.0.0.0:5050
+    python serve.py --asgi                   # asgi_app:app dengan worker uvicorn
+
+Konfigurasi lewat argumen atau env:
+    PINVENTORY_BIND                alamat listen (default 0.0.0.0:5000)
+    PINVENTORY_WORKERS             jumlah proses (default 2 x CPU + 1, maks 12)
+    PINVENTORY_THREADS             thread per proses (default 4; 2 kalau CPU > 8)
+    PINVENTORY_BACKLOG             koneksi yang menunggu di-accept (default 256)
+    PINVENTORY_WORKER_CONNECTIONS  koneksi terbuka per worker (default thread x 4)
+    PINVENTORY_TIMEOUT             detik sebelum worker yang macet di-restart (default 60)
+    PINVENTORY_GRACEFUL_TIMEOUT    detik menunggu request berjalan saat restart (default 30)
+    PINVENTORY_MAX_REQUESTS        request per worker sebelum diganti baru (default 5000, 0 = mati)
+    PINVENTORY_PIDFILE             file pid master (default tmp/pinventory.pid)
+
+State bersama antar worker ada di database, bukan di memori proses: token
+yang dicabut (logout/refresh) disimpan di tabel revoked_tokens dan terlihat
+di worker lain paling lama PINVENTORY_REVOCATION_SYNC_INTERVAL detik kemudian
+(lihat auth_tokens.py). Metrik /api/metrics tetap per worker.
+
+Restart tanpa memutus request (gunicorn):
+    kill -HUP  $(cat tmp/pinventory.pid)    worker diganti bertahap, kode tetap (preload)
+    kill -USR2 $(cat tmp/pinventory.pid)    master baru dengan kode baru, lalu
+    kill -QUIT $(cat tmp/pinventory.pid.oldbin)
+"""
+import argparse
+import importlib
+import logging
+import os
+import sys
+
+from app_logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+CPU_COUNT = os.cpu_count() or 1
+MAX_WORKERS = 12
+# Batas max_connections bawaan MySQL; setiap worker punya pool koneksinya sendiri
+DB_MAX_CONNECTIONS = int(os.environ.get('PINVENTORY_DB_MAX_CONNECTIONS', 151))
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def default_workers(cpu_count=CPU_COUNT):
+    return min(cpu_count * 2 + 1, MAX_WORKERS)
+
+
+def default_threads(cpu_count=CPU_COUNT):
+    # Thread menunggu MySQL, bukan CPU; di mesin besar lebih banyak proses,
+    # lebih sedikit thread per proses supaya total koneksi DB tetap wajar
+    return 2 if cpu_count > 8 else 4
+
+
+def server_options(bind=None, workers=None, threads=None, pidfile=None):
+    threads = threads or _env_int('PINVENTORY_THREADS', default_threads())
+    return {
+        'bind': bind or os.environ.get('PINVENTORY_BIND', '0.0.0.0:5000'),
+        'workers': workers or _env_int('PINVENTORY_WORKERS', default_workers()),
+        'threads': threads,
+        'backlog': _env_int('PINVENTORY_BACKLOG', 256),
+        'worker_connections': _env_int('PINVENTORY_WORKER_CONNECTIONS', threads * 4),
+        'timeout': _env_int('PINVENTORY_TIMEOUT', 60),
+        'graceful_timeout': _env_int('PINVENTORY_GRACEFUL_TIMEOUT', 30),
+        'max_requests': _env_int('PINVENTORY_MAX_REQUESTS', 5000),
+        'pidfile': pidfile or os.environ.get('PINVENTORY_PIDFILE', os.path.join('tmp', 'pinventory.pid')),
+    }
+
+
+def _check_connection_budget(options, asgi=False):
+    from jobs import JOB_WORKERS
+    from mysql_database import POOL_CONFIG
+
+    # Satu thread request atau job memakai paling banyak satu koneksi pool
+    per_worker = min(options['threads'] + JOB_WORKERS, POOL_CONFIG['size'] + POOL_CONFIG['max_overflow'])
+    if asgi:
+        from async_db import ASYNC_POOL_CONFIG
+        per_worker += ASYNC_POOL_CONFIG['maxsize']
+    total = options['workers'] * per_worker
+    if total > DB_MAX_CONNECTIONS:
+        logger.warning(
+            "%d worker x %d koneksi pool = %d, melebihi max_connections MySQL (%d). "
+            "Kurangi PINVENTORY_WORKERS atau PINVENTORY_DB_POOL_OVERFLOW.",
+            options['workers'], per_worker, total, DB_MAX_CONNECTIONS
+        )
+
+
+def _gunicorn_available():
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_gunicorn(application, options, asgi=False):
+    from gunicorn.app.base import BaseApplication
+
+    class PinventoryServer(BaseApplication):
+        def load_config(self):
+            config = {
+                'bind': [options['bind']],
+                'workers': options['workers'],
+                'worker_class': 'uvicorn.workers.UvicornWorker' if asgi else 'gthread',
+                'threads': options['threads'],
+                'backlog': options['backlog'],
+                'worker_connections': options['worker_connections'],
+                'timeout': options['timeout'],
+                'graceful_timeout': options['graceful_timeout'],
+                'keepalive': 5,
+                'max_requests': options['max_requests'],
+                # Jitter supaya worker tidak diganti bersamaan
+                'max_requests_jitter': options['max_requests'] // 10,
+                'preload_app': True,
+                'pidfile': options['pidfile'],
+                'accesslog': None,
+            }
+            for key, value in config.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return application
+
+    if options['pidfile']:
+        os.makedirs(os.path.dirname(options['pidfile']) or '.', exist_ok=True)
+    PinventoryServer().run()
+
+
+def run_waitress(application, options):
+    from waitress import serve
+    from mysql_database import POOL_CONFIG
+
+    # Satu proses berbagi satu pool: thread tidak boleh melebihi isi pool
+    threads = min(options['workers'] * options['threads'], POOL_CONFIG['size'] + POOL_CONFIG['max_overflow'])
+    logger.info("waitress di %s: %d thread", options['bind'], threads)
+    serve(
+        application,
+        listen=options['bind'],
+        threads=threads,
+        backlog=options['backlog'],
+        connection_limit=options['workers'] * options['worker_connections'],
+        channel_timeout=options['timeout'],
+    )
+
+
+def run(application, bind=None, workers=None, threads=None, asgi=False, pidfile=None):
+    """Jalankan `application` (objek WSGI, atau ASGI kalau asgi=True) di server produksi."""
+    setup_logging()
+    options = server_options(bind, workers, threads, pidfile)
+    _check_connection_budget(options, asgi)
+
+    if sys.platform != 'win32' and _gunicorn_available():
+        logger.info("gunicorn di %s: %d worker x %d thread", options['bind'], options['workers'], options['threads'])
+        run_gunicorn(application, options, asgi)
+    elif asgi:
+        raise RuntimeError("Mode ASGI membutuhkan gunicorn dan uvicorn (Linux)")
+    else:
+        run_waitress(application, options)
+
+
+def _load(target):
+    module_name, _, attr = target.partition(':')
+    return getattr(importlib.import_module(module_name), attr or 'app')
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Jalankan Pinventory di server produksi")
+    parser.add_argument('--app', help="modul:atribut (default app:app, atau asgi_app:app dengan --asgi)")
+    parser.add_argument('--asgi', action='store_true', help="mode async (asgi_app.py) dengan worker uvicorn")
+    parser.add_argument('--bind')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--threads', type=int)
+    args = parser.parse_args(argv[1:])
+
+    target = args.app or ('asgi_app:app' if args.asgi else 'app:app')
+    run(_load(target), args.bind, args.workers, args.threads, args.asgi)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,597 @@
+"""
+Backend penyimpanan SQLite embedded untuk instalasi satu kasir.
+
+- journal_mode=WAL: pembaca tidak menunggu penulis, dan commit hanya
+  menambah ke file WAL (tanpa menulis ulang halaman database)
+- synchronous=NORMAL: fsync hanya saat checkpoint; aman terhadap crash
+  aplikasi, transaksi terakhir bisa hilang hanya saat listrik padam
+- satu koneksi per thread; SQL disimpan sebagai konstanta sehingga
+  statement cache sqlite3 memakai ulang statement yang sudah di-prepare
+- transaksi tulis memakai BEGIN IMMEDIATE supaya kunci tulis diambil di
+  awal, bukan gagal dengan SQLITE_BUSY di tengah transaksi
+- query paging/export/grup memakai SQL yang sama dengan backend MySQL
+  (helper *_query di mysql_database), placeholder %s diganti ?
+- ringkasan masuk/keluar dihitung langsung dari inventory_logs (volume satu
+  kasir kecil), jadi tidak ada tabel rollup yang bisa tertinggal
+- setiap execute/executemany dicatat ke metrics (jumlah dan waktu query per
+  route) seperti cursor bertimer MySQL; BEGIN/COMMIT dan PRAGMA tidak dihitung
+- product_changes ditulis di transaksi yang sama dengan perubahan stok;
+  penulis dikunci satu per satu, jadi id selalu terlihat berurutan dan
+  feed delta tidak butuh jeda SYNC_LAG_SECONDS seperti di MySQL
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from change_version import products_changed, groups_changed
+from metrics import record_query, record_rows
+from mysql_database import (
+    ALL_GROUP_SUMMARIES_QUERY, ONE_GROUP_SUMMARY_QUERY, finish_logs_page, finish_products_page, format_group_summary,
+    group_members_query, logs_filtered_query, logs_page_query, products_page_query,
+)
+from pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+from rollups import SUMMARY_GROUPS, _as_date
+from storage import StorageBackend, PRODUCT_NOT_FOUND, NEGATIVE_STOCK, parse_batch_events
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PATH = os.environ.get('PINVENTORY_SQLITE_PATH', os.path.join('data', 'pinventory.db'))
+SCHEMA_VERSION = 3
+CHANGE_RETENTION_DAYS = int(os.environ.get('PINVENTORY_CHANGE_RETENTION_DAYS', 30))
+ITER_BATCH_SIZE = 2000
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",      # 16 MB per koneksi
+    "PRAGMA mmap_size = 268435456",    # 256 MB
+)
+STATEMENT_CACHE_SIZE = 256
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    barcode TEXT NOT NULL UNIQUE,
+    quantity INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS inventory_logs (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    barcode TEXT NOT NULL,
+    qty_change INTEGER NOT NULL,
+    action_type TEXT,
+    timestamp DATETIME NOT NULL,
+    username TEXT,
+    current_stock INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON inventory_logs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_barcode_timestamp ON inventory_logs (barcode, timestamp);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    phone TEXT,
+    role TEXT NOT NULL DEFAULT 'staff'
+);
+CREATE INDEX IF NOT EXISTS idx_users_role ON users (role);
+CREATE TABLE IF NOT EXISTS product_groups (
+    id INTEGER PRIMARY KEY,
+    group_name TEXT NOT NULL,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_groups_name ON product_groups (group_name);
+CREATE TABLE IF NOT EXISTS grouping_products (
+    group_id INTEGER NOT NULL REFERENCES product_groups (id) ON DELETE CASCADE,
+    product_id INTEGER NOT NULL REFERENCES products (id) ON DELETE CASCADE,
+    PRIMARY KEY (group_id, product_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_grouping_product ON grouping_products (product_id);
+-- versi 2: feed delta sync; AUTOINCREMENT supaya id tidak dipakai ulang setelah prune
+CREATE TABLE IF NOT EXISTS product_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    barcode TEXT,
+    changed_at DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_product_changes_barcode ON product_changes (barcode, id);
+CREATE INDEX IF NOT EXISTS idx_product_changes_changed_at ON product_changes (changed_at);
+-- versi 3: daftar cabut token, expires_at dalam detik epoch
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti TEXT PRIMARY KEY,
+    expires_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens (expires_at);
+"""
+
+_SELECT_PRODUCT = "SELECT id, name, quantity FROM products WHERE barcode = ?"
+_UPDATE_STOCK = """
+    UPDATE products SET quantity = quantity + ?
+    WHERE barcode = ? AND quantity >= ?
+    RETURNING name, quantity
+"""
+_INSERT_LOG = """
+    INSERT INTO inventory_logs (name, barcode, qty_change, action_type, timestamp, username, current_stock)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_CHANGE = "INSERT INTO product_changes (barcode, changed_at) VALUES (?, ?)"
+_SIGN_FILTERS = {"Masuk": " AND qty_change > 0", "Keluar": " AND qty_change < 0"}
+# Kolom pengelompokan ringkasan; username NULL disamakan dengan '' seperti rollup MySQL
+_SUMMARY_COLUMNS = {
+    'day': "substr(timestamp, 1, 10)",
+    'barcode': "barcode",
+    'username': "COALESCE(username, '')",
+}
+sqlite3.register_converter('DATETIME', lambda raw: datetime.strptime(raw.decode(), TIMESTAMP_FORMAT))
+
+
+class _TimedConnection(sqlite3.Connection):
+    """Koneksi sqlite3 yang mencatat jumlah dan waktu query ke metrics."""
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_query(time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            record_query(time.perf_counter() - started)
+
+
+def _control(conn, statement):
+    # Kontrol transaksi/pragma: bukan query data, tidak masuk metrics
+    return sqlite3.Connection.execute(conn, statement)
+
+
+def _dict_factory(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _format_ts(value):
+    return value.strftime(TIMESTAMP_FORMAT) if isinstance(value, datetime) else value
+
+
+def _valid_ids(product_ids):
+    return [int(pid) for pid in product_ids if isinstance(pid, (int, str)) and str(pid).isdigit()]
+
+
+def _sqlite_query(query, params):
+    """SQL dari helper mysql_database untuk sqlite3: placeholder ? dan datetime sebagai teks."""
+    return query.replace('%s', '?'), [_format_ts(p) for p in params]
+
+
+class SQLiteBackend(StorageBackend):
+
+    name = 'sqlite'
+
+    def __init__(self, path=SQLITE_PATH):
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            raise RuntimeError(f"SQLite {sqlite3.sqlite_version} terlalu lama, minimal 3.35 (UPDATE ... RETURNING)")
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            isolation_level=None,           # transaksi diatur sendiri lewat BEGIN
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False,
+            factory=_TimedConnection,
+        )
+        conn.row_factory = _dict_factory
+        for pragma in PRAGMAS:
+            _control(conn, pragma)
+        return conn
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        if conn.execute("PRAGMA user_version").fetchone()['user_version'] < SCHEMA_VERSION:
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._prune_product_changes()
+
+    def _prune_product_changes(self, keep_days=CHANGE_RETENTION_DAYS):
+        # Pengganti cron `product_changes.py prune` di MySQL: dijalankan saat
+        # aplikasi kasir start. Baris terakhir disimpan supaya cursor terbaru tetap dikenali.
+        cutoff = _format_ts(datetime.now() - timedelta(days=keep_days))
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM product_changes WHERE changed_at < ? "
+                "AND id < (SELECT MAX(id) FROM product_changes)",
+                (cutoff,)
+            )
+
+    def _iter(self, query, params):
+        # Koneksi sendiri per generator: statement yang masih terbuka tidak
+        # mengganggu transaksi tulis di koneksi thread ini
+        conn = self._connect()
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(ITER_BATCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        _control(conn, "BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            _control(conn, "ROLLBACK")
+            raise
+        _control(conn, "COMMIT")
+
+    # --- produk ---
+
+    def get_all_products(self):
+        return self._conn().execute("SELECT * FROM products").fetchall()
+
+    def get_products_page(self, after=None, limit=100, fields=None):
+        query, params = _sqlite_query(*products_page_query(after, limit, fields))
+        return finish_products_page(self._conn().execute(query, params).fetchall(), limit, fields)
+
+    def iter_products(self):
+        return self._iter("SELECT id, name, barcode, quantity FROM products ORDER BY id", ())
+
+    def get_product_by_barcode(self, barcode):
+        row = self._conn().execute(_SELECT_PRODUCT, (barcode,)).fetchone()
+        return {"name": row['name'], "quantity": row['quantity']} if row else None
+
+    def import_products(self, filepath, username=None):
+        import pandas as pd
+        from inventory_importer import clean_inventory_frame
+
+        started = time.perf_counter()
+        df, skipped = clean_inventory_frame(pd.read_excel(filepath, dtype={'barcode': str}))
+        rows = [(str(name), str(barcode), int(quantity)) for name, barcode, quantity in df.itertuples(index=False, name=None)]
+
+        timestamp = _format_ts(datetime.now())
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM products")
+            conn.executemany("INSERT INTO products (name, barcode, quantity) VALUES (?, ?, ?)", rows)
+            conn.executemany(_INSERT_LOG, [
+                (name, barcode, quantity, 'IN', timestamp, username, quantity) for name, barcode, quantity in rows
+            ])
+            # barcode NULL: seluruh katalog diganti, klien delta sync wajib resync
+            conn.execute(_INSERT_CHANGE, (None, timestamp))
+        products_changed()
+
+        seconds = time.perf_counter() - started
+        record_rows('import', 'products', len(rows), seconds)
+        return {
+            'imported': len(rows),
+            'skipped': skipped,
+            'seconds': round(seconds, 3),
+            'rows_per_sec': round(len(rows) / seconds, 1) if seconds > 0 else 0.0,
+        }
+
+    def get_product_changes(self, since=None, limit=DEFAULT_PAGE_SIZE):
+        parts = decode_cursor(since, 1)
+        try:
+            since_id = int(parts[0]) if parts else None
+        except ValueError:
+            raise ValueError("Cursor tidak valid")
+
+        conn = self._conn()
+        # Satu snapshot untuk semua query di bawah
+        _control(conn, "BEGIN")
+        try:
+            bounds = conn.execute("SELECT MIN(id) AS first_id, MAX(id) AS last_id FROM product_changes").fetchone()
+            first_id = bounds['first_id'] or 0
+            last_id = bounds['last_id'] or 0
+
+            resync = since_id is None or since_id > last_id or (first_id and since_id < first_id - 1)
+            if not resync:
+                resync = conn.execute(
+                    "SELECT 1 FROM product_changes WHERE barcode IS NULL AND id > ? LIMIT 1", (since_id,)
+                ).fetchone() is not None
+            if resync:
+                return {'items': [], 'deleted': [], 'next_cursor': encode_cursor(last_id),
+                        'has_more': False, 'resync_required': True}
+
+            changes = conn.execute(
+                "SELECT barcode, MAX(id) AS change_id FROM product_changes "
+                "WHERE id > ? AND barcode IS NOT NULL "
+                "GROUP BY barcode ORDER BY change_id LIMIT ?",
+                (since_id, limit)
+            ).fetchall()
+            products = {}
+            if changes:
+                placeholders = ', '.join(['?'] * len(changes))
+                products = {row['barcode']: row for row in conn.execute(
+                    f"SELECT id, name, barcode, quantity FROM products WHERE barcode IN ({placeholders})",
+                    [row['barcode'] for row in changes]
+                )}
+        finally:
+            _control(conn, "COMMIT")
+
+        items = [products[row['barcode']] for row in changes if row['barcode'] in products]
+        deleted = [row['barcode'] for row in changes if row['barcode'] not in products]
+        full_page = len(changes) == limit
+        next_id = changes[-1]['change_id'] if full_page else last_id
+        return {'items': items, 'deleted': deleted, 'next_cursor': encode_cursor(next_id),
+                'has_more': full_page, 'resync_required': False}
+
+    def add_product(self, name, barcode, quantity, username):
+        with self._transaction() as conn:
+            row = conn.execute(_SELECT_PRODUCT, (barcode,)).fetchone()
+            if row:
+                name = row['name']
+                new_qty = row['quantity'] + int(quantity)
+                conn.execute("UPDATE products SET quantity = ? WHERE id = ?", (new_qty, row['id']))
+            else:
+                new_qty = int(quantity)
+                conn.execute("INSERT INTO products (name, barcode, quantity) VALUES (?, ?, ?)",
+                             (name, barcode, new_qty))
+            timestamp = _format_ts(datetime.now())
+            conn.execute(_INSERT_LOG, (name, barcode, quantity, None, timestamp, username, new_qty))
+            conn.execute(_INSERT_CHANGE, (barcode, timestamp))
+        products_changed()
+
+    # --- scan ---
+
+    def _apply(self, conn, barcode, qty, action, username, timestamp):
+        delta = qty if action == 'in' else -qty
+        rows = conn.execute(_UPDATE_STOCK, (delta, barcode, max(-delta, 0))).fetchall()
+        if not rows:
+            if conn.execute(_SELECT_PRODUCT, (barcode,)).fetchone() is None:
+                return False, PRODUCT_NOT_FOUND
+            return False, NEGATIVE_STOCK
+        product = rows[0]
+        conn.execute(_INSERT_LOG, (
+            product['name'], barcode, delta, 'IN' if action == 'in' else 'OUT',
+            timestamp, username, product['quantity'],
+        ))
+        conn.execute(_INSERT_CHANGE, (barcode, timestamp))
+        return True, {"name": product['name'], "quantity": product['quantity']}
+
+    def apply_scan(self, barcode, qty, action, username):
+        with self._transaction() as conn:
+            success, result = self._apply(conn, barcode, qty, action, username, _format_ts(datetime.now()))
+        if success:
+            products_changed()
+        return success, result
+
+    def apply_scan_batch(self, events):
+        # Di SQLite satu statement hanya beberapa mikrodetik tanpa round trip
+        # jaringan, jadi event cukup diterapkan satu per satu dalam satu transaksi
+        results, parsed = parse_batch_events(events)
+        if not parsed:
+            return results
+
+        timestamp = _format_ts(datetime.now())
+        with self._transaction() as conn:
+            for index, barcode, qty, action, username in parsed:
+                success, result = self._apply(conn, barcode, qty, action, username, timestamp)
+                if success:
+                    results[index] = {'index': index, 'success': True, 'barcode': barcode, 'product': result}
+                else:
+                    results[index] = {'index': index, 'success': False, 'barcode': barcode, 'message': result}
+        if any(r['success'] for r in results):
+            products_changed()
+        return results
+
+    # --- log ---
+
+    def get_inventory_logs_filtered(self, start_date=None, end_date=None, change_type=None):
+        query, params = _sqlite_query(*logs_filtered_query(start_date, end_date, change_type))
+        return self._conn().execute(query, params).fetchall()
+
+    def get_inventory_logs_page(self, start_date=None, end_date=None, change_type=None, after=None, limit=100, fields=None):
+        query, params = _sqlite_query(*logs_page_query(start_date, end_date, change_type, after, limit, fields))
+        return finish_logs_page(self._conn().execute(query, params).fetchall(), limit, fields)
+
+    def iter_inventory_logs(self, start_date=None, end_date=None, change_type=None):
+        return self._iter(*_sqlite_query(*logs_filtered_query(start_date, end_date, change_type)))
+
+    def delete_inventory_log(self, log_id):
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM inventory_logs WHERE id = ?", (log_id,)).rowcount
+        return deleted > 0
+
+    def delete_inventory_logs(self, start_date, end_date, change_type="Semua"):
+        with self._transaction() as conn:
+            deleted = conn.execute(
+                "DELETE FROM inventory_logs WHERE timestamp >= ? AND timestamp < ?" + _SIGN_FILTERS.get(change_type, ""),
+                (_format_ts(start_date), _format_ts(end_date))
+            ).rowcount
+        return deleted
+
+    def get_movement_summary(self, start_date, end_date, group_by='day', barcode=None, username=None):
+        if group_by not in SUMMARY_GROUPS:
+            raise ValueError(f"group_by harus salah satu dari: {', '.join(SUMMARY_GROUPS)}")
+        column = _SUMMARY_COLUMNS[group_by]
+
+        query = f"""
+            SELECT {column} AS {group_by}, SUM(MAX(qty_change, 0)) AS qty_in,
+                   SUM(MAX(-qty_change, 0)) AS qty_out, COUNT(*) AS events
+            FROM inventory_logs
+            WHERE timestamp >= ? AND timestamp < ?
+        """
+        params = [_as_date(start_date).isoformat(), (_as_date(end_date) + timedelta(days=1)).isoformat()]
+        if barcode:
+            query += " AND barcode = ?"
+            params.append(barcode)
+        if username:
+            query += " AND COALESCE(username, '') = ?"
+            params.append(username)
+        query += f" GROUP BY {column} ORDER BY {column}"
+        return self._conn().execute(query, params).fetchall()
+
+    # --- user ---
+
+    def get_user(self, username):
+        return self._conn().execute(
+            "SELECT username, password, role, phone FROM users WHERE username = ?", (username,)
+        ).fetchone()
+
+    def set_user_password(self, username, password_hash):
+        with self._transaction() as conn:
+            conn.execute("UPDATE users SET password = ? WHERE username = ?", (password_hash, username))
+
+    def add_revoked_token(self, jti, expires_at):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO revoked_tokens (jti, expires_at) VALUES (?, ?) "
+                "ON CONFLICT (jti) DO UPDATE SET expires_at = MAX(expires_at, excluded.expires_at)",
+                (jti, expires_at)
+            )
+            conn.execute("DELETE FROM revoked_tokens WHERE expires_at < ?", (int(time.time()),))
+
+    def get_revoked_tokens(self):
+        rows = self._conn().execute(
+            "SELECT jti, expires_at FROM revoked_tokens WHERE expires_at >= ?", (int(time.time()),)
+        )
+        return {row['jti']: row['expires_at'] for row in rows}
+
+    def get_all_staff(self):
+        return self._conn().execute(
+            "SELECT id, username, phone, role FROM users WHERE role IN ('staff', 'supervisor')"
+        ).fetchall()
+
+    def add_staff(self, username, password, phone=None):
+        hashed_pw = generate_password_hash(password, method='pbkdf2:sha256', salt_length=16)
+        try:
+            with self._transaction() as conn:
+                conn.execute("INSERT INTO users (username, password, role, phone) VALUES (?, ?, 'staff', ?)",
+                             (username, hashed_pw, phone))
+        except sqlite3.IntegrityError as e:
+            logger.warning("Gagal menambahkan staff %s: %s", username, e)
+            return False
+        return True
+
+    def update_staff(self, username, password=None, phone=None, role=None):
+        fields, params = [], []
+        if password:
+            fields.append("password = ?")
+            params.append(generate_password_hash(password, method='pbkdf2:sha256', salt_length=16))
+        if phone is not None:
+            fields.append("phone = ?")
+            params.append(phone)
+        if role is not None:
+            fields.append("role = ?")
+            params.append(role)
+        if not fields:
+            return False
+
+        params.append(username)
+        with self._transaction() as conn:
+            updated = conn.execute(f"UPDATE users SET {', '.join(fields)} WHERE username = ?", params).rowcount
+        return updated > 0
+
+    def delete_staff(self, username):
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM users WHERE username = ?", (username,)).rowcount
+        return deleted > 0
+
+    # --- grup produk ---
+
+    def create_product_group(self, group_name, description=None, product_ids=()):
+        try:
+            with self._transaction() as conn:
+                group_id = conn.execute(
+                    "INSERT INTO product_groups (group_name, description) VALUES (?, ?)", (group_name, description)
+                ).lastrowid
+                conn.executemany("INSERT INTO grouping_products (group_id, product_id) VALUES (?, ?)",
+                                 [(group_id, pid) for pid in _valid_ids(product_ids)])
+        except sqlite3.Error as e:
+            logger.error("Gagal membuat grup produk: %s", e)
+            return False
+        groups_changed()
+        return True
+
+    def get_all_product_groups(self):
+        rows = self._conn().execute("""
+            SELECT pg.id, pg.group_name, pg.description,
+                   p.id AS product_id, p.name AS product_name, p.barcode, p.quantity
+            FROM product_groups pg
+            LEFT JOIN grouping_products gp ON pg.id = gp.group_id
+            LEFT JOIN products p ON gp.product_id = p.id
+            ORDER BY pg.group_name, p.name
+        """).fetchall()
+
+        groups = {}
+        for row in rows:
+            group = groups.setdefault(row['id'], {
+                'id': row['id'], 'group_name': row['group_name'],
+                'description': row['description'], 'products': [],
+            })
+            if row['product_id'] is not None:
+                group['products'].append({
+                    'id': row['product_id'], 'name': row['product_name'],
+                    'barcode': row['barcode'], 'quantity': row['quantity'],
+                })
+        return list(groups.values())
+
+    def get_product_group(self, group_id):
+        query, params = _sqlite_query(ONE_GROUP_SUMMARY_QUERY, [group_id])
+        row = self._conn().execute(query, params).fetchone()
+        return format_group_summary(row) if row else None
+
+    def get_product_group_summaries(self):
+        return [format_group_summary(row) for row in self._conn().execute(ALL_GROUP_SUMMARIES_QUERY)]
+
+    def get_group_members_page(self, group_id, after=None, limit=100):
+        query, params = _sqlite_query(*group_members_query(group_id, after, limit))
+        return finish_products_page(self._conn().execute(query, params).fetchall(), limit)
+
+    def update_product_group(self, group_id, new_group_name=None, new_description=None, new_product_ids=None):
+        updates, params = [], []
+        if new_group_name is not None:
+            updates.append("group_name = ?")
+            params.append(new_group_name)
+        if new_description is not None:
+            updates.append("description = ?")
+            params.append(new_description)
+
+        try:
+            with self._transaction() as conn:
+                if updates:
+                    conn.execute(f"UPDATE product_groups SET {', '.join(updates)} WHERE id = ?", (*params, group_id))
+                if new_product_ids is not None:
+                    wanted = set(_valid_ids(new_product_ids))
+                    current = {row['product_id'] for row in conn.execute(
+                        "SELECT product_id FROM grouping_products WHERE group_id = ?", (group_id,))}
+                    conn.executemany("DELETE FROM grouping_products WHERE group_id = ? AND product_id = ?",
+                                     [(group_id, pid) for pid in current - wanted])
+                    conn.executemany("INSERT INTO grouping_products (group_id, product_id) VALUES (?, ?)",
+                                     [(group_id, pid) for pid in wanted - current])
+        except sqlite3.Error as e:
+            logger.error("Gagal update grup produk: %s", e)
+            return False
+        groups_changed()
+        return True
+
+    def delete_product_group(self, group_id):
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM product_groups WHERE id = ?", (group_id,)).rowcount
+        groups_changed()
+        return deleted > 0
@@ -0,0 +1,174 @@
+"""
+Laporan waktu startup dan memori API, untuk menangkap regresi cold start
+(misalnya modul berat yang kembali di-import di level modul).
+
+Setiap pengukuran memakai interpreter baru:
+  1. `python -X importtime -c "import app"`: waktu import kumulatif per modul
+  2. import app lalu GET /api/health lewat test client: waktu sampai siap
+     dan RSS proses saat itu
+  3. daftar modul berat (pandas, openpyxl, ...) yang ikut termuat saat startup
+
+    python startup_report.py
+    python startup_report.py --module time_log --top 40
+    python startup_report.py --max-ready-ms 1500 --max-rss-mb 120
+
+Exit code 1 kalau ada modul berat yang termuat atau batas terlampaui, jadi
+bisa dipasang di CI. Hasil disimpan dalam format bench.py (default
+bench_results/startup-<waktu>.json), bandingkan dengan `bench.py compare`.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from bench import RESULTS_DIR
+
+# Hanya boleh dimuat oleh jalur import/export, bukan saat startup
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'xlsxwriter', 'mysql.connector', 'pyarrow')
+
+
+def current_rss_mb():
+    """RSS proses ini dalam MB, atau None kalau tidak bisa dibaca."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+    except ImportError:
+        return None
+
+
+def probe(module_name):
+    """Dijalankan di interpreter baru: import app, panggil /api/health, ukur."""
+    import importlib
+
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+
+    status = None
+    app = getattr(module, 'app', None)
+    if hasattr(app, 'test_client'):
+        status = app.test_client().get('/api/health').status_code
+    ready = time.perf_counter()
+
+    return {
+        'import_ms': round((imported - started) * 1000, 1),
+        'ready_ms': round((ready - started) * 1000, 1),
+        'health_status': status,
+        'rss_mb': current_rss_mb(),
+        'heavy_loaded': sorted(name for name in HEAVY_MODULES if name in sys.modules),
+        'module_count': len(sys.modules),
+    }
+
+
+def parse_importtime(stderr):
+    """Baris `import time:` jadi list (modul, self_us, cumulative_us, kedalaman)."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            depth = (len(name) - len(name.lstrip())) // 2
+            entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return entries
+
+
+def importtime_breakdown(module_name, top=25):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module_name} gagal:\n{result.stderr[-2000:]}")
+
+    entries = parse_importtime(result.stderr)
+    # Baris dicetak setelah modul selesai di-import, jadi pohon modul target
+    # adalah baris-baris sesudah entri tingkat atas sebelumnya (site,
+    # encodings, dll. milik start interpreter) sampai entri target itu sendiri
+    top_level = [i for i, entry in enumerate(entries) if entry[3] == 0]
+    start = top_level[-2] + 1 if len(top_level) > 1 else 0
+    subtree = entries[start:top_level[-1] + 1] if top_level else []
+
+    top_entries = sorted(subtree, key=lambda e: e[2], reverse=True)[:top]
+    return {
+        'total_import_ms': round(subtree[-1][2] / 1000, 1) if subtree else None,
+        'top_cumulative_ms': {name: round(cumulative / 1000, 1) for name, _, cumulative, _ in top_entries},
+    }
+
+
+def run_report(module_name, top=25):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--probe', module_name],
+        capture_output=True, text=True
+    )
+    wall_ms = round((time.perf_counter() - started) * 1000, 1)
+    if result.returncode != 0:
+        raise RuntimeError(f"Probe {module_name} gagal:\n{result.stderr[-2000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    # Termasuk start interpreter, seperti yang dialami worker/exe baru
+    report['process_ready_ms'] = wall_ms
+    report['importtime'] = importtime_breakdown(module_name, top)
+    return report
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Laporan waktu startup dan RSS")
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--max-ready-ms', type=float, help="batas process_ready_ms")
+    parser.add_argument('--max-rss-mb', type=float, help="batas RSS saat siap")
+    parser.add_argument('--output')
+    parser.add_argument('--probe', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv[1:])
+
+    if args.probe:
+        print(json.dumps(probe(args.probe)))
+        return 0
+
+    report = run_report(args.module, args.top)
+
+    print(f"{args.module}: siap dalam {report['process_ready_ms']} ms "
+          f"(import {report['import_ms']} ms), RSS {report['rss_mb']} MB, {report['module_count']} modul")
+    for name, ms in report['importtime']['top_cumulative_ms'].items():
+        print(f"  {ms:>9.1f} ms  {name}")
+
+    problems = []
+    if report['heavy_loaded']:
+        problems.append(f"modul berat termuat saat startup: {', '.join(report['heavy_loaded'])}")
+    if args.max_ready_ms and report['process_ready_ms'] > args.max_ready_ms:
+        problems.append(f"process_ready_ms {report['process_ready_ms']} > {args.max_ready_ms}")
+    if args.max_rss_mb and report['rss_mb'] and report['rss_mb'] > args.max_rss_mb:
+        problems.append(f"rss_mb {report['rss_mb']} > {args.max_rss_mb}")
+    for problem in problems:
+        print(f"[REGRESI] {problem}")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"startup-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump({
+            'environment': {'started_at': datetime.now().isoformat(timespec='seconds'),
+                            'python': sys.version.split()[0], 'module': args.module},
+            'results': {'startup': report},
+        }, f, indent=2)
+    print(f"Hasil disimpan di {output}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,273 @@
+"""
+Antarmuka backend penyimpanan untuk semua operasi data yang dipakai
+endpoint: produk (paging, import, delta sync), scan, log (paging, export,
+hapus rentang, ringkasan), user dan grup produk.
+
+    PINVENTORY_STORAGE=mysql   (default) MySQL lewat pool pymysql
+    PINVENTORY_STORAGE=sqlite  SQLite embedded (WAL) di PINVENTORY_SQLITE_PATH,
+                               untuk instalasi satu kasir (build app.spec)
+
+Yang tetap khusus MySQL: job background (async=1, import mode=stream,
+/api/jobs; endpoint menjawab 501 kalau backend.supports_jobs False), mode
+ASGI, partisi log dan CLI pemeliharaan (migrations, rollups, product_changes).
+
+Kesesuaian kedua backend diuji di tests/test_storage.py. Benchmark
+latensi scan:
+    python storage.py bench sqlite|mysql [jumlah_scan]
+"""
+import os
+import sys
+from abc import ABC, abstractmethod
+import tempfile
+import threading
+import time
+import uuid
+
+STORAGE_BACKEND = os.environ.get('PINVENTORY_STORAGE', 'mysql')
+
+PRODUCT_NOT_FOUND = 'Barcode not found'
+NEGATIVE_STOCK = 'Quantity cannot be negative'
+MAX_BATCH_SIZE = 1000
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class StorageBackend(ABC):
+    """
+    Operasi yang dipakai endpoint. Baris dikembalikan sebagai dict dengan
+    nama kolom yang sama dengan tabel MySQL; timestamp sebagai datetime.
+    """
+
+    # Nilai PINVENTORY_STORAGE untuk backend ini
+    name = None
+    # Job background (tabel jobs + thread pool) hanya ada di MySQL
+    supports_jobs = False
+
+    # --- produk ---
+
+    @abstractmethod
+    def get_all_products(self):
+        """Semua produk {id, name, barcode, quantity}."""
+
+    @abstractmethod
+    def get_products_page(self, after=None, limit=100, fields=None):
+        """Halaman produk urut id (keyset). Kembalikan (rows, next_cursor_atau_None)."""
+
+    @abstractmethod
+    def iter_products(self):
+        """Generator semua produk urut id, untuk export streaming."""
+
+    @abstractmethod
+    def import_products(self, filepath, username=None):
+        """
+        Ganti seluruh katalog dengan isi file Excel dan tulis log import.
+        Kembalikan dict {imported, skipped, seconds, rows_per_sec}.
+        """
+
+    @abstractmethod
+    def get_product_changes(self, since=None, limit=100):
+        """Feed delta sync, bentuk hasil sama dengan product_changes.get_product_changes."""
+
+    @abstractmethod
+    def get_product_by_barcode(self, barcode):
+        """{"name", "quantity"} atau None."""
+
+    @abstractmethod
+    def add_product(self, name, barcode, quantity, username):
+        """Tambah produk baru atau tambahkan quantity ke produk yang ada, lalu tulis log."""
+
+    # --- scan ---
+
+    @abstractmethod
+    def apply_scan(self, barcode, qty, action, username):
+        """Kembalikan (True, {"name", "quantity"}) atau (False, pesan_error) seperti scan_engine.apply_scan."""
+
+    @abstractmethod
+    def apply_scan_batch(self, events):
+        """Hasil per event seperti scan_engine.apply_scan_batch."""
+
+    # --- log ---
+
+    @abstractmethod
+    def get_inventory_logs_filtered(self, start_date=None, end_date=None, change_type=None):
+        """Log di [start_date, end_date] urut timestamp DESC; change_type "Masuk"/"Keluar" menyaring qty."""
+
+    @abstractmethod
+    def get_inventory_logs_page(self, start_date=None, end_date=None, change_type=None, after=None, limit=100, fields=None):
+        """Halaman log urut timestamp DESC, id DESC (keyset). Kembalikan (rows, next_cursor_atau_None)."""
+
+    @abstractmethod
+    def iter_inventory_logs(self, start_date=None, end_date=None, change_type=None):
+        """Generator log urut timestamp DESC, untuk export streaming."""
+
+    @abstractmethod
+    def delete_inventory_log(self, log_id):
+        """Hapus satu log. Kembalikan False kalau tidak ada."""
+
+    @abstractmethod
+    def delete_inventory_logs(self, start_date, end_date, change_type="Semua"):
+        """Hapus log dengan timestamp di [start_date, end_date). Kembalikan jumlah yang dihapus."""
+
+    @abstractmethod
+    def get_movement_summary(self, start_date, end_date, group_by='day', barcode=None, username=None):
+        """
+        Total qty masuk/keluar untuk hari [start_date, end_date] (inklusif)
+        per day, barcode atau username, bentuk sama dengan rollups.get_rollup_summary.
+        """
+
+    # --- user ---
+
+    @abstractmethod
+    def get_user(self, username):
+        """{"username", "password", "role", "phone"} atau None."""
+
+    @abstractmethod
+    def set_user_password(self, username, password_hash):
+        """Ganti hash password (rehash saat login)."""
+
+    @abstractmethod
+    def add_revoked_token(self, jti, expires_at):
+        """Cabut token `jti` sampai `expires_at` (detik epoch), terlihat oleh semua proses."""
+
+    @abstractmethod
+    def get_revoked_tokens(self):
+        """Dict jti -> expires_at untuk token yang dicabut dan belum lewat masanya."""
+
+    @abstractmethod
+    def get_all_staff(self):
+        """User dengan role staff/supervisor: {id, username, phone, role}."""
+
+    @abstractmethod
+    def add_staff(self, username, password, phone=None):
+        """Tambah user role staff. Kembalikan False kalau username sudah ada."""
+
+    @abstractmethod
+    def update_staff(self, username, password=None, phone=None, role=None):
+        """Ubah field yang diberikan. Kembalikan False kalau user tidak ada atau tidak ada field."""
+
+    @abstractmethod
+    def delete_staff(self, username):
+        """Kembalikan False kalau user tidak ada."""
+
+    # --- grup produk ---
+
+    @abstractmethod
+    def create_product_group(self, group_name, description=None, product_ids=()):
+        """Buat grup beserta anggotanya. Kembalikan False kalau gagal."""
+
+    @abstractmethod
+    def get_all_product_groups(self):
+        """Semua grup beserta list produk anggotanya."""
+
+    @abstractmethod
+    def get_product_group(self, group_id):
+        """Satu grup dengan member_count dan total_quantity, atau None."""
+
+    @abstractmethod
+    def get_product_group_summaries(self):
+        """Semua grup dengan member_count dan total_quantity, tanpa daftar produk."""
+
+    @abstractmethod
+    def get_group_members_page(self, group_id, after=None, limit=100):
+        """Anggota grup urut product id (keyset). Kembalikan (rows, next_cursor_atau_None)."""
+
+    @abstractmethod
+    def update_product_group(self, group_id, new_group_name=None, new_description=None, new_product_ids=None):
+        """Ubah nama/deskripsi dan terapkan selisih anggota. Kembalikan False kalau gagal."""
+
+    @abstractmethod
+    def delete_product_group(self, group_id):
+        """Kembalikan False kalau grup tidak ada."""
+
+
+def parse_batch_events(events):
+    """
+    Validasi event batch. Kembalikan (results, parsed): results berisi hasil
+    gagal untuk event yang tidak valid (None untuk sisanya), parsed berisi
+    tuple (index, barcode, qty, action, username) yang siap diterapkan.
+    """
+    if len(events) > MAX_BATCH_SIZE:
+        raise ValueError(f"Maksimal {MAX_BATCH_SIZE} event per batch")
+
+    results = [None] * len(events)
+    parsed = []
+    for index, event in enumerate(events):
+        try:
+            barcode = str(event.get('barcode') or '').strip()
+            action = event.get('action')
+            qty = int(event.get('qty', 1))
+        except (AttributeError, TypeError, ValueError):
+            results[index] = {'index': index, 'success': False, 'message': 'Data event tidak valid'}
+            continue
+        if not barcode or not action:
+            results[index] = {'index': index, 'success': False, 'message': 'Barcode dan action wajib diisi'}
+            continue
+        parsed.append((index, barcode, qty, action, event.get('username')))
+    return results, parsed
+
+
+def create_backend(name=STORAGE_BACKEND, **options):
+    if name == 'mysql':
+        from mysql_backend import MySQLBackend
+        return MySQLBackend()
+    if name == 'sqlite':
+        from sqlite_backend import SQLiteBackend
+        return SQLiteBackend(**options)
+    raise ValueError(f"Backend penyimpanan tidak dikenal: {name}")
+
+
+def get_backend():
+    """Backend global sesuai PINVENTORY_STORAGE, dibuat sekali per proses."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+# --- BENCHMARK ---
+
+def bench_scan_latency(backend, scans=2000, products=200):
+    """Latensi apply_scan berurutan pada satu backend (ms per scan)."""
+    from bench import _percentile
+
+    prefix = uuid.uuid4().hex[:8]
+    barcodes = [f"bench{prefix}{i}" for i in range(products)]
+    for barcode in barcodes:
+        backend.add_product(f"Produk {barcode}", barcode, 1000000, 'bench')
+
+    latencies = []
+    for i in range(scans):
+        started = time.perf_counter()
+        backend.apply_scan(barcodes[i % products], 1, 'in' if i % 2 == 0 else 'out', 'bench')
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        'scans': scans,
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+        'scans_per_sec': round(scans / (sum(latencies) / 1000), 1),
+    }
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else None
+    name = argv[2] if len(argv) > 2 else STORAGE_BACKEND
+    if command != 'bench':
+        print(__doc__)
+        return 2
+
+    options = {}
+    if name == 'sqlite' and 'PINVENTORY_SQLITE_PATH' not in os.environ:
+        options['path'] = os.path.join(tempfile.mkdtemp(), 'pinventory.db')
+    backend = create_backend(name, **options)
+    scans = int(argv[3]) if len(argv) > 3 else 2000
+    print(name, bench_scan_latency(backend, scans))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,81 @@
+"""
+Fixture bersama. Test aplikasi memakai backend SQLite di tmp_path, jadi
+bisa jalan tanpa server MySQL. Env diset sebelum modul aplikasi diimport:
+app.py membuat backend dan membaca PINVENTORY_* saat import.
+"""
+import os
+import tempfile
+import uuid
+
+import pytest
+
+_SCRATCH = tempfile.mkdtemp(prefix='pinventory-tests-')
+os.environ.setdefault('PINVENTORY_STORAGE', 'sqlite')
+os.environ.setdefault('PINVENTORY_SQLITE_PATH', os.path.join(_SCRATCH, 'pinventory.db'))
+os.environ.setdefault('PINVENTORY_STATE_DIR', os.path.join(_SCRATCH, 'state'))
+os.environ.setdefault('PINVENTORY_SECRET_KEY', 'test-secret')
+
+import auth_tokens  # noqa: E402
+import change_version  # noqa: E402
+import storage  # noqa: E402
+
+RUN_MYSQL = os.environ.get('PINVENTORY_TEST_MYSQL', '').lower() in ('1', 'true', 'yes')
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    # ETag versi katalog jangan menyentuh tmp/state milik aplikasi
+    monkeypatch.setattr(change_version, 'STATE_DIR', str(tmp_path / 'state'))
+
+
+@pytest.fixture
+def mysql_database(monkeypatch):
+    if not RUN_MYSQL:
+        pytest.skip("set PINVENTORY_TEST_MYSQL=1 untuk menjalankan kasus MySQL")
+    import pymysql
+    import mysql_database
+    import product_changes
+    from migrations import migrate
+    from product_cache import product_cache
+
+    name = f"pinventory_test_{uuid.uuid4().hex[:12]}"
+    server = {k: v for k, v in mysql_database.DB_CONFIG.items() if k != 'database'}
+    admin = pymysql.connect(**server)
+    admin.cursor().execute(f"CREATE DATABASE `{name}`")
+
+    monkeypatch.setitem(mysql_database.DB_CONFIG, 'database', name)
+    # Test membaca perubahan yang baru saja ditulis
+    monkeypatch.setattr(product_changes, 'SYNC_LAG_SECONDS', 0)
+    mysql_database.reset_pool()
+    product_cache.clear()
+    try:
+        migrate()
+        yield name
+    finally:
+        mysql_database.reset_pool()
+        product_cache.clear()
+        admin.cursor().execute(f"DROP DATABASE `{name}`")
+        admin.close()
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    """Backend SQLite baru sebagai backend global (storage.get_backend())."""
+    backend = storage.create_backend('sqlite', path=str(tmp_path / 'pinventory.db'))
+    monkeypatch.setattr(storage, '_backend', backend)
+    # Salinan daftar cabut token milik test sebelumnya jangan terbawa
+    monkeypatch.setattr(auth_tokens, '_revoked', {})
+    monkeypatch.setattr(auth_tokens, '_revoked_synced_at', None)
+    return backend
+
+
+@pytest.fixture
+def flask_app(sqlite_backend, monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(app_module, 'backend', sqlite_backend)
+    return app_module
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.app.test_client()
@@ -0,0 +1,160 @@
+"""Mode ASGI (asgi_app.py): route native, ETag/kompresi, auth, fallback ke Flask dan offload."""
+import asyncio
+import importlib
+import io
+import sys
+
+import pytest
+
+import storage
+
+for _module in ('starlette', 'a2wsgi', 'aiomysql', 'httpx'):
+    pytest.importorskip(_module)
+
+from starlette.testclient import TestClient  # noqa: E402
+
+import offload  # noqa: E402
+
+
+def _awaitable(fn):
+    async def wrapper(*args, **kwargs):
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+@pytest.fixture
+def asgi(flask_app, sqlite_backend, monkeypatch):
+    """asgi_app dengan query aiomysql diganti backend SQLite test (tanpa lifespan, jadi tanpa pool)."""
+    monkeypatch.setattr(storage, 'STORAGE_BACKEND', 'mysql')
+    monkeypatch.delitem(sys.modules, 'asgi_app', raising=False)
+    import asgi_app
+
+    monkeypatch.setattr(asgi_app, 'backend', sqlite_backend)
+    monkeypatch.setattr(asgi_app.async_db, 'get_all_products', _awaitable(sqlite_backend.get_all_products))
+    monkeypatch.setattr(asgi_app.async_db, 'apply_scan', _awaitable(sqlite_backend.apply_scan))
+    return asgi_app
+
+
+@pytest.fixture
+def asgi_client(asgi):
+    return TestClient(asgi.app)
+
+
+def test_refuses_sqlite_storage(monkeypatch):
+    monkeypatch.setattr(storage, 'STORAGE_BACKEND', 'sqlite')
+    monkeypatch.delitem(sys.modules, 'asgi_app', raising=False)
+    with pytest.raises(RuntimeError):
+        importlib.import_module('asgi_app')
+
+
+def test_health(asgi_client):
+    response = asgi_client.get('/api/health')
+    assert response.status_code == 200 and response.json() == {'status': 'ok'}
+
+
+def test_products_not_modified_without_query(asgi, asgi_client, sqlite_backend, monkeypatch):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    first = asgi_client.get('/api/products')
+    assert first.status_code == 200 and first.json()[0]['barcode'] == 'A1'
+
+    async def no_query():
+        raise AssertionError("pool tidak boleh dipakai untuk 304")
+    monkeypatch.setattr(asgi.async_db, 'get_all_products', no_query)
+    cached = asgi_client.get('/api/products', headers={'If-None-Match': first.headers['ETag']})
+    assert cached.status_code == 304 and cached.content == b''
+    assert cached.headers['ETag'] == first.headers['ETag']
+
+
+def test_products_compressed_with_etag_variant(asgi_client, sqlite_backend):
+    for i in range(100):
+        sqlite_backend.add_product(f'Produk dengan nama panjang {i}', f'899{i:010d}', i, 'admin')
+    compressed = asgi_client.get('/api/products', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'].endswith('-gzip"') and len(compressed.json()) == 100
+
+    cached = asgi_client.get('/api/products', headers={'Accept-Encoding': 'gzip',
+                                                       'If-None-Match': compressed.headers['ETag']})
+    assert cached.status_code == 304
+
+
+def test_scan_native(asgi_client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+
+    response = asgi_client.post('/api/scan', json={'barcode': 'A1', 'qty': 2, 'action': 'out'})
+    assert response.status_code == 200
+    assert response.json() == {'success': True, 'product': {'name': 'Produk A', 'quantity': 3}}
+    assert asgi_client.post('/api/scan', json={'barcode': 'A1', 'qty': 9, 'action': 'out'}).status_code == 400
+    assert asgi_client.post('/api/scan', json={'barcode': 'Z9', 'action': 'in'}).status_code == 404
+    assert asgi_client.post('/api/scan', json={'barcode': 'A1'}).status_code == 400
+    assert asgi_client.post('/api/scan', content=b'{bukan json').status_code == 400
+
+
+def test_batch_scan_native(asgi_client, sqlite_backend, monkeypatch):
+    sqlite_backend.add_product('Produk A', 'A1', 1, 'admin')
+    response = asgi_client.post('/api/scan/batch', json={'events': [
+        {'barcode': 'A1', 'action': 'out'}, {'barcode': 'A1', 'action': 'out'}, {'barcode': 'A1', 'action': 'in'},
+    ]})
+    assert response.status_code == 200
+    assert (response.json()['applied'], response.json()['failed']) == (2, 1)
+    assert sqlite_backend.get_product_by_barcode('A1')['quantity'] == 1
+
+    assert asgi_client.post('/api/scan/batch', json=[]).status_code == 400
+    monkeypatch.setattr(storage, 'MAX_BATCH_SIZE', 1)
+    assert asgi_client.post('/api/scan/batch', json=[{'barcode': 'A1', 'action': 'in'}] * 2).status_code == 413
+
+
+def test_invalid_token_rejected(asgi_client):
+    response = asgi_client.get('/api/products', headers={'Authorization': 'Bearer bukan-token'})
+    assert response.status_code == 401 and response.json()['success'] is False
+
+
+def test_other_routes_fall_back_to_flask(asgi_client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    response = asgi_client.get('/api/products/changes')
+    assert response.status_code == 200 and response.json()['resync_required']
+
+
+def test_offload_password_hash():
+    async def roundtrip():
+        password_hash = await offload.generate_password_hash('rahasia')
+        return (await offload.check_password_hash(password_hash, 'rahasia'),
+                await offload.check_password_hash(password_hash, 'salah'))
+    try:
+        assert asyncio.run(roundtrip()) == (True, False)
+    finally:
+        offload.shutdown()
+
+
+def test_offload_products_xlsx():
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    products = [{'id': 1, 'name': 'Produk A', 'barcode': 'A1', 'quantity': 5}]
+    try:
+        data = asyncio.run(offload.build_products_xlsx(products))
+    finally:
+        offload.shutdown()
+    sheet = pd.read_excel(io.BytesIO(data))
+    assert sheet['name'].tolist() == ['Produk A'] and 'id' not in sheet.columns
+
+
+# --- MySQL ---
+
+def test_async_db_scan_and_page(mysql_database):
+    import async_db
+    from mysql_database import add_product
+
+    add_product('Produk A', 'A1', 5, 'admin')
+
+    async def scenario():
+        try:
+            scanned = await async_db.apply_scan('A1', 2, 'out', 'kasir')
+            rejected = await async_db.apply_scan('A1', 9, 'out', 'kasir')
+            items, next_cursor = await async_db.get_products_page(limit=10, fields=['barcode', 'quantity'])
+            return scanned, rejected, items, next_cursor
+        finally:
+            await async_db.close_pool()
+
+    scanned, rejected, items, next_cursor = asyncio.run(scenario())
+    assert scanned == (True, {'name': 'Produk A', 'quantity': 3})
+    assert rejected == (False, storage.NEGATIVE_STOCK)
+    assert items == [{'barcode': 'A1', 'quantity': 3}] and next_cursor is None
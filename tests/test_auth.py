@@ -0,0 +1,105 @@
+"""Token sesi: login, refresh, logout (daftar cabut bersama) dan require_role."""
+import logging
+
+import pytest
+
+import auth_tokens
+
+
+@pytest.fixture
+def users(sqlite_backend):
+    sqlite_backend.add_staff('kasir', 'rahasia')
+    sqlite_backend.add_staff('bos', 'rahasia')
+    sqlite_backend.update_staff('bos', role='admin')
+
+
+@pytest.fixture
+def auth_required(flask_app, monkeypatch):
+    monkeypatch.setattr(flask_app, 'REQUIRE_AUTH', True)
+
+
+def _login(client, username):
+    response = client.post('/api/login', json={'username': username, 'password': 'rahasia'})
+    assert response.status_code == 200
+    return response.get_json()['token']
+
+
+def _bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_login_token_carries_role(client, users):
+    token = _login(client, 'bos')
+    claims = auth_tokens.verify_token(token)
+    assert claims['sub'] == 'bos' and claims['role'] == 'admin'
+    assert client.post('/api/login', json={'username': 'bos', 'password': 'salah'}).status_code == 401
+
+
+def test_logout_revokes_token(client, users, auth_required):
+    token = _login(client, 'kasir')
+    assert client.get('/api/products', headers=_bearer(token)).status_code == 200
+    assert client.post('/api/logout', headers=_bearer(token)).status_code == 200
+
+    response = client.get('/api/products', headers=_bearer(token))
+    assert response.status_code == 401
+    assert response.get_json()['message'] == 'Token sudah dicabut'
+
+
+def test_revocation_visible_to_other_process(client, users, monkeypatch):
+    token = _login(client, 'kasir')
+    client.post('/api/logout', headers=_bearer(token))
+
+    # Worker lain: salinan lokal kosong, daftar dimuat dari tabel revoked_tokens
+    monkeypatch.setattr(auth_tokens, '_revoked', {})
+    monkeypatch.setattr(auth_tokens, '_revoked_synced_at', None)
+    with pytest.raises(auth_tokens.TokenError):
+        auth_tokens.verify_token(token)
+
+
+def test_refresh_rotates_token(client, users):
+    token = _login(client, 'kasir')
+    response = client.post('/api/token/refresh', headers=_bearer(token))
+    assert response.status_code == 200
+    new_token = response.get_json()['token']
+
+    assert auth_tokens.verify_token(new_token)['sub'] == 'kasir'
+    with pytest.raises(auth_tokens.TokenError):
+        auth_tokens.verify_token(token)
+    assert client.post('/api/token/refresh', headers=_bearer(token)).status_code == 401
+
+
+def test_tampered_and_expired_tokens_rejected():
+    token, _ = auth_tokens.issue_token('kasir', 'staff')
+    signature = token.split('.')[1]
+    forged, _ = auth_tokens.issue_token('kasir', 'admin')
+    with pytest.raises(auth_tokens.TokenError):
+        auth_tokens.verify_token(f"{forged.split('.')[0]}.{signature}")
+
+    expired, _ = auth_tokens.issue_token('kasir', 'staff', ttl=-10)
+    with pytest.raises(auth_tokens.TokenError):
+        auth_tokens.verify_token(expired)
+    assert auth_tokens.verify_token(expired, allow_expired_for=60)['sub'] == 'kasir'
+
+
+def test_require_role_with_auth(client, users, auth_required):
+    assert client.get('/api/staff').status_code == 401
+    assert client.get('/api/staff', headers=_bearer(_login(client, 'kasir'))).status_code == 403
+    assert client.get('/api/staff', headers=_bearer(_login(client, 'bos'))).status_code == 200
+
+
+def test_require_role_without_auth_is_consistent(client, users):
+    # Tanpa REQUIRE_AUTH anonim boleh lewat, jadi token role lain juga
+    assert client.get('/api/staff').status_code == 200
+    assert client.get('/api/staff', headers=_bearer(_login(client, 'kasir'))).status_code == 200
+
+
+def test_startup_warning_when_auth_disabled(flask_app, monkeypatch, caplog):
+    monkeypatch.setattr(flask_app, 'REQUIRE_AUTH', False)
+    with caplog.at_level(logging.WARNING):
+        flask_app.warn_if_auth_disabled()
+    assert 'PINVENTORY_REQUIRE_AUTH tidak aktif' in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(flask_app, 'REQUIRE_AUTH', True)
+    flask_app.warn_if_auth_disabled()
+    assert caplog.text == ''
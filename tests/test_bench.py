@@ -0,0 +1,104 @@
+"""Helper benchmark (bench.py) dan load test HTTP (loadtest.py)."""
+import argparse
+import asyncio
+import json
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+import auth_tokens
+import bench
+import loadtest
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert bench._percentile(values, 50) == 51
+    assert bench._percentile(values, 99) == 99
+    assert bench._percentile(values, 100) == 100
+    assert bench._percentile([7], 95) == 7
+    assert bench._percentile([], 50) is None
+
+
+def test_timed_reports_seconds_and_peak():
+    result, seconds, peak_mb = bench._timed(lambda n: bytearray(n), 4 * 1024 * 1024)
+    assert len(result) == 4 * 1024 * 1024
+    assert seconds >= 0 and peak_mb >= 4
+
+
+def _write_report(path, results):
+    path.write_text(json.dumps({'results': results}))
+    return str(path)
+
+
+def test_compare(tmp_path, capsys):
+    before = _write_report(tmp_path / 'a.json', {'scan': {'p95_ms': 10.0, 'ok': True}, 'import': {'seconds': 0}})
+    after = _write_report(tmp_path / 'b.json', {'scan': {'p95_ms': 7.5, 'ok': True}, 'import': {'seconds': 2}})
+
+    assert bench.main(['bench.py', 'compare', before, after]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines] == ['import.seconds', 'scan.p95_ms']
+    assert lines[1].split()[-1] == '-25.0%' and lines[0].split()[-1] == '-'
+
+
+def test_run_refuses_non_bench_database(monkeypatch, capsys):
+    import mysql_database
+
+    monkeypatch.setitem(mysql_database.DB_CONFIG, 'database', 'inventory_db')
+    assert bench.main(['bench.py', 'run']) == 2
+    assert 'akan dikosongkan' in capsys.readouterr().out
+
+    monkeypatch.setitem(mysql_database.DB_CONFIG, 'database', 'inventory_bench')
+    assert bench.main(['bench.py', 'run', '--only', 'scan,terbang']) == 2
+    assert 'terbang' in capsys.readouterr().out
+
+
+def _seed_bench_products(backend, count):
+    for i in range(count):
+        backend.add_product(f'Produk {i}', bench._barcode(i), 1000, 'bench')
+
+
+def test_bench_scan_through_app(flask_app, sqlite_backend):
+    _seed_bench_products(sqlite_backend, 10)
+    result = bench.bench_scan(products=10, scans=25, threads=4)
+    assert (result['scans'], result['threads'], result['errors']) == (25, 4, 0)
+    assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms'] <= result['max_ms']
+
+    # Thread lebih banyak dari scan: thread tanpa jatah tidak dijalankan
+    assert bench.bench_scan(products=10, scans=2, threads=4)['threads'] == 2
+
+
+@pytest.fixture
+def live_server(flask_app):
+    server = make_server('127.0.0.1', 0, flask_app.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    thread.join()
+
+
+def test_loadtest_against_live_server(live_server, sqlite_backend):
+    _seed_bench_products(sqlite_backend, 3)
+    args = argparse.Namespace(url=live_server, scanners=3, duration=0.5, think_ms=0, timeout=5,
+                              products=3, barcodes=None, token=None)
+    result = asyncio.run(loadtest.run_load(args))
+
+    assert result['ok'] > 0 and result['errors'] == 0
+    assert not any(key.startswith('status_') for key in result)
+    assert result['p50_ms'] <= result['p99_ms'] <= result['max_ms']
+    # Scan bergantian masuk/keluar: stok tidak pernah habis
+    assert all(sqlite_backend.get_product_by_barcode(bench._barcode(i))['quantity'] >= 999 for i in range(3))
+
+
+def test_loadtest_report_comparable_with_bench(live_server, sqlite_backend, tmp_path):
+    _seed_bench_products(sqlite_backend, 1)
+    token, _ = auth_tokens.issue_token('bench', 'admin')
+    output = tmp_path / 'load.json'
+    assert loadtest.main(['loadtest.py', '--url', live_server, '--scanners', '2', '--duration', '0.3',
+                          '--barcodes', bench._barcode(0), '--token', token, '--output', str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report['results']['loadtest']['ok'] > 0
+    assert 'token' not in report['params']
+    assert bench.compare(str(output), str(output)) == 0
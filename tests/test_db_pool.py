@@ -0,0 +1,134 @@
+"""Pool koneksi: pakai ulang, batas overflow, rollback saat dikembalikan, health check."""
+import threading
+
+import pytest
+
+from db_pool import ConnectionPool, PoolExhausted, SERVER_STATUS_IN_TRANS
+
+
+class FakeConnection:
+    """Pengganti koneksi pymysql: mencatat rollback/close/ping."""
+
+    def __init__(self):
+        self.open = True
+        self.server_status = 0
+        self.rollbacks = 0
+        self.commits = 0
+        self.healthy = True
+
+    def ping(self, reconnect=False):
+        if not self.healthy:
+            raise ConnectionError("server pergi")
+
+    def commit(self):
+        self.commits += 1
+        self.server_status = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.server_status = 0
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def created():
+    return []
+
+
+@pytest.fixture
+def make_pool(created):
+    def factory(**options):
+        def creator():
+            conn = FakeConnection()
+            created.append(conn)
+            return conn
+        return ConnectionPool(creator, **options)
+    return factory
+
+
+def test_connection_is_reused(make_pool, created):
+    pool = make_pool(size=2)
+    with pool.acquire() as conn:
+        first = conn._raw
+    with pool.acquire() as conn:
+        assert conn._raw is first
+    stats = pool.stats()
+    assert len(created) == 1
+    assert (stats['created'], stats['reused'], stats['checked_out'], stats['idle']) == (1, 1, 0, 1)
+
+
+def test_overflow_limit_and_timeout(make_pool, created):
+    pool = make_pool(size=1, max_overflow=1, timeout=0.05)
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+
+    # Koneksi overflow ditutup saat dikembalikan, hanya `size` yang disimpan
+    first.close()
+    second.close()
+    assert pool.stats()['total'] == 1 and pool.stats()['discarded'] == 1
+    assert sum(not conn.open for conn in created) == 1
+
+
+def test_waiter_gets_released_connection(make_pool):
+    pool = make_pool(size=1, max_overflow=0, timeout=2)
+    held = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    threading.Timer(0.05, held.close).start()
+    waiter.join(timeout=3)
+    assert got and got[0]._raw is held._raw
+    assert pool.stats()['waits'] >= 1
+
+
+def test_open_transaction_rolled_back_on_release(make_pool, created):
+    pool = make_pool()
+    conn = pool.acquire()
+    conn._raw.server_status = SERVER_STATUS_IN_TRANS
+    conn.close()
+    conn.close()  # close kedua tidak melepas koneksi dua kali
+    assert created[0].rollbacks == 1
+    assert pool.stats()['checked_out'] == 0
+
+
+def test_on_commit_runs_only_after_commit(make_pool):
+    pool = make_pool()
+    calls = []
+    with pool.acquire() as conn:
+        conn.on_commit(lambda: calls.append('batal'))
+        conn.rollback()
+        conn.on_commit(lambda: calls.append('commit'))
+        conn.commit()
+    assert calls == ['commit']
+
+
+def test_unhealthy_idle_connection_replaced(make_pool, created):
+    pool = make_pool(ping_interval=0)
+    with pool.acquire():
+        pass
+    created[0].healthy = False
+    with pool.acquire() as conn:
+        assert conn._raw is created[1]
+    assert pool.stats()['health_check_failed'] == 1
+
+
+def test_expired_idle_connection_closed(make_pool, created):
+    pool = make_pool(idle_timeout=0)
+    with pool.acquire():
+        pass
+    with pool.acquire():
+        pass
+    assert len(created) == 2 and not created[0].open
+
+
+def test_creator_failure_frees_slot():
+    def broken():
+        raise ConnectionError("tidak bisa konek")
+    pool = ConnectionPool(broken, size=1, max_overflow=0)
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+    assert pool.stats()['total'] == 0 and pool.stats()['checked_out'] == 0
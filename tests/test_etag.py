@@ -0,0 +1,77 @@
+"""ETag / If-None-Match untuk /api/products dan /api/groups."""
+import change_version
+
+
+def _etag(response):
+    return response.headers['ETag']
+
+
+def test_products_not_modified_without_query(client, flask_app, sqlite_backend, monkeypatch):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    first = client.get('/api/products')
+    assert first.status_code == 200 and first.get_etag()[1] is False
+
+    # 304 dijawab dari versi data saja, tanpa menyentuh backend
+    def no_query():
+        raise AssertionError("backend tidak boleh dipanggil untuk 304")
+    monkeypatch.setattr(flask_app.backend, 'get_all_products', no_query)
+    cached = client.get('/api/products', headers={'If-None-Match': _etag(first)})
+    assert cached.status_code == 304 and cached.data == b''
+    assert _etag(cached) == _etag(first)
+
+
+def test_write_changes_etag(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    etag = _etag(client.get('/api/products'))
+
+    client.post('/api/scan', json={'barcode': 'A1', 'qty': 1, 'action': 'out'})
+    response = client.get('/api/products', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and _etag(response) != etag
+    assert response.get_json()[0]['quantity'] == 4
+
+
+def test_etag_depends_on_url(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    full = client.get('/api/products')
+    page = client.get('/api/products?limit=1')
+    assert _etag(full) != _etag(page)
+    assert client.get('/api/products?limit=1', headers={'If-None-Match': _etag(full)}).status_code == 200
+
+
+def test_product_writes_invalidate_groups_but_not_the_reverse():
+    products, groups = change_version.current('products'), change_version.current('groups')
+    change_version.groups_changed()
+    assert change_version.current('products') == products
+    assert change_version.current('groups') != groups
+
+    groups = change_version.current('groups')
+    change_version.products_changed()
+    assert change_version.current('products') != products
+    assert change_version.current('groups') != groups
+
+
+def test_group_endpoints_conditional(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    client.post('/api/groups', json={'group_name': 'Grup', 'product_ids': []})
+    listing = client.get('/api/groups')
+    assert client.get('/api/groups', headers={'If-None-Match': _etag(listing)}).status_code == 304
+
+    group_id = listing.get_json()[0]['id']
+    client.put(f'/api/groups/{group_id}', json={'description': 'baru'})
+    assert client.get('/api/groups', headers={'If-None-Match': _etag(listing)}).status_code == 200
+
+
+def test_compressed_etag_variant_matches(client, sqlite_backend):
+    for i in range(100):
+        sqlite_backend.add_product(f'Produk dengan nama panjang {i}', f'899{i:010d}', i, 'admin')
+    compressed = client.get('/api/products', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' in compressed.headers
+
+    cached = client.get('/api/products', headers={'Accept-Encoding': 'gzip', 'If-None-Match': _etag(compressed)})
+    assert cached.status_code == 304 and _etag(cached) == _etag(compressed)
+    assert 'Accept-Encoding' in cached.headers['Vary']
+
+
+def test_error_responses_have_no_etag(client):
+    response = client.get('/api/products?limit=abc')
+    assert response.status_code == 400 and 'ETag' not in response.headers
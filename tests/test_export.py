@@ -0,0 +1,119 @@
+"""Export timelog dan produk: xlsx constant-memory dan format CSV/NDJSON/Parquet, di-stream per chunk."""
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime
+
+import pytest
+
+import export_formats
+import exporter_timelog
+
+openpyxl = pytest.importorskip('openpyxl')
+pytest.importorskip('xlsxwriter')
+
+
+def _seed_logs(backend):
+    backend.add_product('Produk A', 'A1', 5, 'kasir1')
+    backend.apply_scan('A1', 2, 'out', 'kasir2')
+
+
+def _logs(count):
+    return ({'username': 'kasir', 'barcode': f'{8990000000000 + i}', 'name': f'Produk {i}',
+             'qty_change': 1 if i % 2 else -1, 'timestamp': datetime(2024, 1, 2, 3, 4, i % 60)}
+            for i in range(count))
+
+
+def test_write_logs_xlsx(tmp_path):
+    path = str(tmp_path / 'log.xlsx')
+    assert exporter_timelog.write_logs_xlsx(_logs(3), path) == 3
+
+    rows = list(openpyxl.load_workbook(path).active.iter_rows(values_only=True))
+    assert rows[0] == ('Staff', 'Barcode', 'Item Name', 'Quantity', 'Type', 'Timestamp')
+    # Barcode tetap teks (tidak jadi angka 8.99E+12), timestamp tetap datetime
+    assert rows[1] == ('kasir', '8990000000000', 'Produk 0', 1, 'Keluar', datetime(2024, 1, 2, 3, 4, 0))
+    assert [row[4] for row in rows[1:]] == ['Keluar', 'Masuk', 'Keluar']
+    assert exporter_timelog.write_logs_xlsx(iter(()), str(tmp_path / 'kosong.xlsx')) == 0
+
+
+def test_stream_logs_to_excel_chunks_and_cleans_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    chunks = list(exporter_timelog.stream_logs_to_excel(_logs(500), chunk_size=1024))
+
+    assert len(chunks) > 1 and all(len(chunk) <= 1024 for chunk in chunks)
+    assert openpyxl.load_workbook(io.BytesIO(b''.join(chunks))).active.max_row == 501
+    assert os.listdir(tmp_path) == []
+
+
+def test_stream_removes_temp_file_when_client_disconnects(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    stream = exporter_timelog.stream_logs_to_excel(_logs(500), chunk_size=1024)
+    next(stream)
+    stream.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_timelog_export_endpoint(client, sqlite_backend):
+    _seed_logs(sqlite_backend)
+    today = date.today().isoformat()
+
+    response = client.get(f'/api/timelog/export?start={today}&end={today}')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    assert response.headers['Cache-Control'].startswith('no-cache')
+    rows = list(openpyxl.load_workbook(io.BytesIO(response.data)).active.iter_rows(values_only=True))
+    assert sorted((row[0], row[3], row[4]) for row in rows[1:]) == [('kasir1', 5, 'Masuk'), ('kasir2', 2, 'Keluar')]
+
+    keluar = client.get(f'/api/timelog/export?start={today}&end={today}&type=Keluar')
+    assert openpyxl.load_workbook(io.BytesIO(keluar.data)).active.max_row == 2
+    assert client.get('/api/timelog/export?start=02-01-2024').status_code == 400
+
+
+# --- CSV / NDJSON / PARQUET ---
+
+def test_csv_and_ndjson_writers(monkeypatch):
+    monkeypatch.setattr(export_formats, 'FLUSH_ROWS', 2)
+    rows = [{'name': 'Produk, "A"', 'barcode': '001', 'qty_change': -2,
+             'timestamp': datetime(2024, 1, 2, 3, 4, 5), 'username': 'kasir', 'current_stock': 3}] * 3
+
+    chunks = list(export_formats.iter_csv(iter(rows), export_formats.LOG_COLUMNS))
+    assert len(chunks) == 2
+    lines = b''.join(chunks).decode().splitlines()
+    assert lines[0] == 'name,barcode,qty_change,timestamp,username,current_stock'
+    assert lines[1] == '"Produk, ""A""",001,-2,2024-01-02 03:04:05,kasir,3'
+
+    chunks = list(export_formats.iter_ndjson(iter(rows), export_formats.LOG_COLUMNS))
+    assert len(chunks) == 2
+    first = json.loads(b''.join(chunks).splitlines()[0])
+    assert first['timestamp'] == '2024-01-02 03:04:05' and first['barcode'] == '001'
+
+
+def test_parquet_round_trip():
+    pq = pytest.importorskip('pyarrow.parquet')
+    rows = [{'id': i, 'name': f'Produk {i}', 'barcode': f'B{i}', 'quantity': i} for i in range(3)]
+    data = b''.join(export_formats.iter_parquet(iter(rows), export_formats.PRODUCT_COLUMNS))
+    assert pq.read_table(io.BytesIO(data)).to_pylist() == rows
+
+
+@pytest.mark.parametrize('fmt, mimetype', [('csv', 'text/csv'), ('ndjson', 'application/x-ndjson')])
+def test_export_endpoints_formats(client, sqlite_backend, fmt, mimetype):
+    _seed_logs(sqlite_backend)
+    today = date.today().isoformat()
+
+    products = client.get(f'/api/products/export?format={fmt}')
+    assert products.mimetype == mimetype
+    assert products.headers['Content-Disposition'].endswith(f'.{fmt}')
+    assert b'A1' in products.data
+
+    logs = client.get(f'/api/timelog/export?start={today}&end={today}&format={fmt}')
+    assert logs.status_code == 200 and logs.mimetype == mimetype
+    assert logs.data.count(b'kasir') == 2
+
+
+def test_export_rejects_unknown_format_and_missing_pyarrow(flask_app, client, monkeypatch):
+    response = client.get('/api/products/export?format=pdf')
+    assert response.status_code == 400 and 'pdf' in response.get_json()['error']
+
+    monkeypatch.setattr(flask_app, 'parquet_available', lambda: False)
+    assert client.get('/api/timelog/export?format=parquet').status_code == 501
@@ -0,0 +1,80 @@
+"""Grup produk lewat /api/groups: update keanggotaan sebagai selisih dan agregat di SQL."""
+
+
+def _seed(backend, count=4):
+    for i in range(count):
+        backend.add_product(f'Produk {i}', f'B{i}', i + 1, 'admin')
+    return [p['id'] for p in backend.iter_products()]
+
+
+def _create(client, ids, name='Grup 1'):
+    response = client.post('/api/groups', json={'group_name': name, 'description': 'rak depan', 'product_ids': ids})
+    assert response.status_code == 201
+    return next(g['id'] for g in client.get('/api/groups').get_json() if g['group_name'] == name)
+
+
+def _membership_writes(backend):
+    """Catat statement INSERT/DELETE ke grouping_products di koneksi thread ini."""
+    writes = []
+
+    def trace(statement):
+        if 'grouping_products' in statement and statement.lstrip().startswith(('INSERT', 'DELETE')):
+            writes.append(statement.split()[0])
+    backend._conn().set_trace_callback(trace)
+    return writes
+
+
+def test_update_writes_only_the_diff(client, sqlite_backend):
+    ids = _seed(sqlite_backend)
+    group_id = _create(client, ids[:3])
+
+    writes = _membership_writes(sqlite_backend)
+    response = client.put(f'/api/groups/{group_id}', json={'product_ids': [ids[1], ids[2], ids[3], 'x', -1]})
+    sqlite_backend._conn().set_trace_callback(None)
+    assert response.status_code == 200
+    # Anggota yang tetap tidak dihapus lalu ditulis ulang: satu keluar, satu masuk
+    assert sorted(writes) == ['DELETE', 'INSERT']
+
+    members, _ = sqlite_backend.get_group_members_page(group_id, limit=10)
+    assert [m['barcode'] for m in members] == ['B1', 'B2', 'B3']
+
+
+def test_update_without_product_ids_keeps_members(client, sqlite_backend):
+    ids = _seed(sqlite_backend)
+    group_id = _create(client, ids[:2])
+    assert client.put(f'/api/groups/{group_id}', json={'group_name': 'Grup baru'}).status_code == 200
+
+    group = client.get(f'/api/groups/{group_id}').get_json()
+    assert group['group_name'] == 'Grup baru' and group['member_count'] == 2
+
+
+def test_group_aggregates(client, sqlite_backend):
+    ids = _seed(sqlite_backend)
+    group_id = _create(client, ids[1:3])
+    empty_id = _create(client, [], name='Kosong')
+
+    group = client.get(f'/api/groups/{group_id}').get_json()
+    assert (group['member_count'], group['total_quantity']) == (2, 2 + 3)
+    assert 'products' not in group
+
+    summaries = {g['id']: g for g in client.get('/api/groups?summary=1').get_json()}
+    assert summaries[group_id] == group
+    assert (summaries[empty_id]['member_count'], summaries[empty_id]['total_quantity']) == (0, 0)
+
+    full = {g['id']: g for g in client.get('/api/groups').get_json()}
+    assert sorted(p['barcode'] for p in full[group_id]['products']) == ['B1', 'B2']
+
+
+def test_group_members_page_and_missing_group(client, sqlite_backend):
+    ids = _seed(sqlite_backend)
+    group_id = _create(client, ids)
+
+    page = client.get(f'/api/groups/{group_id}/products?limit=3').get_json()
+    rest = client.get(f"/api/groups/{group_id}/products?limit=3&cursor={page['next_cursor']}").get_json()
+    assert [m['barcode'] for m in page['items'] + rest['items']] == ['B0', 'B1', 'B2', 'B3']
+    assert rest['next_cursor'] is None
+
+    assert client.get('/api/groups/9999').status_code == 404
+    assert client.delete(f'/api/groups/{group_id}').status_code == 200
+    assert client.delete(f'/api/groups/{group_id}').status_code == 404
+    assert client.post('/api/groups', json={'description': 'tanpa nama'}).status_code == 400
@@ -0,0 +1,157 @@
+"""Import katalog: upload lewat endpoint, bulk insert per chunk dan import streaming per batch."""
+import io
+import os
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('openpyxl')
+
+from inventory_importer import clean_inventory_frame  # noqa: E402
+
+
+def _xlsx_bytes(rows):
+    buffer = io.BytesIO()
+    pd.DataFrame(rows, columns=['name', 'barcode', 'quantity']).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def test_clean_inventory_frame():
+    frame = pd.DataFrame({
+        'name': [' Produk A ', 'Produk B', '', 'Produk A', 'Produk C'],
+        'barcode': ["'A1", 'B1', 'C1', 'A1', 'D1'],
+        'quantity': [3, 4, 5, 2, 'banyak'],
+    })
+    clean, dropped = clean_inventory_frame(frame)
+    assert dropped == 2
+    assert list(clean.itertuples(index=False, name=None)) == [('Produk A', 'A1', 5), ('Produk B', 'B1', 4)]
+
+
+def test_import_endpoint_replaces_catalog(client, sqlite_backend, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sqlite_backend.add_product('Lama', 'OLD', 9, 'admin')
+    content = _xlsx_bytes([('Produk A', 'A1', 3), ('Produk B', 'B1', 4), ('Produk A', 'A1', 2), ('', 'C1', 1)])
+
+    response = client.post('/api/products/import', data={'file': (io.BytesIO(content), 'katalog.xlsx'),
+                                                         'username': 'admin'},
+                           content_type='multipart/form-data')
+    stats = response.get_json()
+    assert response.status_code == 200
+    assert (stats['imported'], stats['skipped']) == (2, 1) and 'rows_per_sec' in stats
+    assert [(p['barcode'], p['quantity']) for p in sqlite_backend.iter_products()] == [('A1', 5), ('B1', 4)]
+
+    # Satu log per produk hasil import, bukan per baris file
+    imported = [log for log in sqlite_backend.get_inventory_logs_filtered() if log['username'] == 'admin'
+                and log['barcode'] != 'OLD']
+    assert sorted((log['barcode'], log['qty_change']) for log in imported) == [('A1', 5), ('B1', 4)]
+
+
+def test_import_endpoint_rejects_missing_columns(client, sqlite_backend, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sqlite_backend.add_product('Lama', 'OLD', 9, 'admin')
+    buffer = io.BytesIO()
+    pd.DataFrame({'nama': ['Produk A'], 'barcode': ['A1']}).to_excel(buffer, index=False)
+
+    response = client.post('/api/products/import', data={'file': (io.BytesIO(buffer.getvalue()), 'katalog.xlsx')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 500 and 'kolom' in response.get_json()['error']
+    assert sqlite_backend.get_product_by_barcode('OLD')['quantity'] == 9
+    assert client.post('/api/products/import', data={}).status_code == 400
+
+
+def test_upload_filename_cannot_escape_tmp(client, sqlite_backend, tmp_path, monkeypatch):
+    from werkzeug.datastructures import FileStorage
+
+    monkeypatch.chdir(tmp_path)
+    saved = []
+    original_save = FileStorage.save
+    monkeypatch.setattr(FileStorage, 'save', lambda self, dst, *a: saved.append(dst) or original_save(self, dst, *a))
+    upload = (io.BytesIO(_xlsx_bytes([('Produk A', 'A1', 3)])), '../../katalog.xlsx')
+
+    response = client.post('/api/products/import', data={'file': upload},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.get_json()['imported'] == 1
+    assert sqlite_backend.get_product_by_barcode('A1') == {'name': 'Produk A', 'quantity': 3}
+    # File sementara ditulis (lalu dihapus) di dalam tmp/, tidak di luar
+    assert len(saved) == 1
+    assert os.path.dirname(os.path.abspath(saved[0])) == str(tmp_path / 'tmp')
+    assert saved[0].endswith('.xlsx') and os.listdir(tmp_path / 'tmp') == []
+
+
+# --- MySQL ---
+
+def _write_csv(path, rows):
+    pd.DataFrame(rows, columns=['name', 'barcode', 'quantity']).to_csv(path, index=False)
+    return str(path)
+
+
+def _query(sql):
+    from mysql_database import connect
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+def test_bulk_import_in_chunks(mysql_database):
+    from inventory_importer import bulk_import_inventory
+    from mysql_database import add_product
+
+    add_product('Lama', 'OLD', 9, 'admin')
+    frame = pd.DataFrame({
+        'name': [f'Produk {i}' for i in range(5)],
+        'barcode': [f'B{i}' for i in range(5)],
+        'quantity': list(range(1, 6)),
+    })
+    clean, _ = clean_inventory_frame(frame)
+    assert bulk_import_inventory(clean, username='admin', chunk_size=2) == 5
+
+    products = _query("SELECT barcode, quantity FROM products ORDER BY barcode")
+    assert [(p['barcode'], p['quantity']) for p in products] == [(f'B{i}', i + 1) for i in range(5)]
+    logs = _query("SELECT barcode, current_stock FROM inventory_logs WHERE username = 'admin' AND barcode <> 'OLD'")
+    assert len(logs) == 5 and all(log['current_stock'] == int(log['barcode'][1:]) + 1 for log in logs)
+
+
+def test_stream_import_commits_per_batch(mysql_database, tmp_path):
+    from inventory_importer import stream_import_inventory
+
+    path = _write_csv(tmp_path / 'katalog.csv', [
+        ('Produk A', 'A1', 3), ('Produk B', 'B1', 4),
+        ('Produk A', 'A1', 2), ('Produk C', 'C1', 1),
+    ])
+    visible = []
+
+    def on_progress(processed, imported, skipped):
+        # Dibaca dari koneksi lain: batch sudah di-commit
+        visible.append(_query("SELECT COUNT(*) AS n FROM products")[0]['n'])
+
+    stats = stream_import_inventory(path, username='admin', on_progress=on_progress, batch_size=2)
+    assert stats['imported'] == 4 and visible == [2, 3]
+
+    logs = _query("SELECT barcode, qty_change, current_stock FROM inventory_logs ORDER BY id")
+    # current_stock adalah stok sesudah upsert, bukan qty baris import
+    assert [(log['barcode'], log['qty_change'], log['current_stock']) for log in logs] == [
+        ('A1', 3, 3), ('B1', 4, 4), ('A1', 2, 5), ('C1', 1, 1),
+    ]
+
+
+def test_stream_import_cancelled_keeps_committed_batches(mysql_database, tmp_path):
+    from inventory_importer import stream_import_inventory
+    from storage import create_backend
+
+    backend = create_backend('mysql')
+    cursor = backend.get_product_changes(None)['next_cursor']
+    path = _write_csv(tmp_path / 'katalog.csv', [
+        ('Produk A', 'A1', 3), ('Produk B', 'B1', 4), ('Produk C', 'C1', 1),
+    ])
+
+    def cancel_after_first_batch(processed, imported, skipped):
+        raise RuntimeError("dibatalkan")
+
+    with pytest.raises(RuntimeError):
+        stream_import_inventory(path, on_progress=cancel_after_first_batch, batch_size=2)
+    assert [row['barcode'] for row in _query("SELECT barcode FROM products ORDER BY barcode")] == ['A1', 'B1']
+    assert backend.get_product_changes(cursor)['resync_required']
@@ -0,0 +1,143 @@
+"""Siklus hidup job background: pembatalan, file input, dan job yatim."""
+import json
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import job_tasks  # noqa: F401 - mendaftarkan products_import
+import jobs
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / 'upload.xlsx'
+    path.write_bytes(b'isi upload')
+    return path
+
+
+@pytest.fixture
+def job_store(monkeypatch):
+    """Status job di dict, pengganti tabel jobs untuk test tanpa MySQL."""
+    store = {'cancel_requested': False, 'updates': []}
+    monkeypatch.setattr(jobs, '_cancel_requested', lambda job_id: store['cancel_requested'])
+    monkeypatch.setattr(jobs, '_update_job', lambda job_id, **fields: store['updates'].append(fields))
+    return store
+
+
+def _run(job_id, kind, params, input_file=None):
+    # _run_job melepas slot antrian yang diambil submit_job
+    assert jobs._pending.acquire(blocking=False)
+    if input_file:
+        jobs._input_files[job_id] = str(input_file)
+    jobs._run_job(job_id, kind, params)
+
+
+def test_cancel_requested_before_start_removes_input(job_store, upload):
+    job_store['cancel_requested'] = True
+    _run('job-batal', 'products_import', {'filepath': str(upload)}, input_file=upload)
+
+    assert not upload.exists()
+    assert 'job-batal' not in jobs._input_files
+    assert [u['state'] for u in job_store['updates']] == ['cancelled']
+
+
+def test_failure_before_start_removes_input(job_store, upload, monkeypatch):
+    def broken_update(job_id, **fields):
+        if fields.get('state') == 'running':
+            raise RuntimeError("database putus")
+        job_store['updates'].append(fields)
+    monkeypatch.setattr(jobs, '_update_job', broken_update)
+
+    _run('job-gagal', 'products_import', {'filepath': str(upload)}, input_file=upload)
+    assert not upload.exists()
+    assert job_store['updates'][-1]['state'] == 'failed'
+
+
+def test_started_job_owns_its_input(job_store, upload, monkeypatch):
+    seen = []
+
+    def keep_input(ctx, filepath):
+        seen.append(filepath)
+        return {'ok': True}
+    monkeypatch.setitem(jobs._registry, 'test_keep_input', (keep_input, 'filepath'))
+
+    _run('job-jalan', 'test_keep_input', {'filepath': str(upload)}, input_file=upload)
+    # Job yang sudah berjalan yang memutuskan nasib inputnya, bukan runner
+    assert seen == [str(upload)] and upload.exists()
+    assert job_store['updates'][-1]['state'] == 'done'
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="liveness pid hanya diperiksa di POSIX")
+def test_owner_alive():
+    host = socket.gethostname()
+    assert jobs._owner_alive(jobs._owner()) is True
+    assert jobs._owner_alive(f"{host}:{_dead_pid()}") is False
+    assert jobs._owner_alive("host-lain:1234") is None
+    assert jobs._owner_alive(None) is None
+
+
+# --- MySQL (tabel jobs) ---
+
+def _insert_job(cursor, job_id, state, owner, params, age_seconds=0):
+    cursor.execute(
+        "INSERT INTO jobs (id, kind, state, params, owner, created_at) "
+        "VALUES (%s, 'products_import', %s, %s, %s, NOW() - INTERVAL %s SECOND)",
+        (job_id, state, json.dumps(params), owner, age_seconds)
+    )
+
+
+def test_fail_stale_jobs(mysql_database, tmp_path):
+    from mysql_database import connect
+
+    dead_input = tmp_path / 'dead.xlsx'
+    dead_input.write_bytes(b'x')
+    host = socket.gethostname()
+    with connect() as conn:
+        cursor = conn.cursor()
+        _insert_job(cursor, 'dead', 'running', f"{host}:{_dead_pid()}", {'filepath': str(dead_input)})
+        _insert_job(cursor, 'remote-old', 'queued', 'host-lain:1', {}, age_seconds=7200)
+        _insert_job(cursor, 'remote-new', 'queued', 'host-lain:1', {})
+        _insert_job(cursor, 'mine-old', 'queued', jobs._owner(), {}, age_seconds=7200)
+        conn.commit()
+        cursor.close()
+
+    assert jobs.fail_stale_jobs(timeout=3600) == 2
+    states = {job_id: jobs.get_job(job_id)['state'] for job_id in ('dead', 'remote-old', 'remote-new', 'mine-old')}
+    assert states == {'dead': 'failed', 'remote-old': 'failed', 'remote-new': 'queued', 'mine-old': 'queued'}
+    assert not dead_input.exists()
+
+
+def test_submit_then_cancel_before_start(mysql_database, upload, monkeypatch):
+    from mysql_database import connect
+
+    started = []
+
+    def slow_start(ctx, filepath):
+        started.append(filepath)
+        return {}
+    monkeypatch.setitem(jobs._registry, 'test_slow_start', (slow_start, 'filepath'))
+
+    # Tahan runner sampai cancel_requested diset dari "worker lain"
+    original = jobs._cancel_requested
+    monkeypatch.setattr(jobs, '_cancel_requested', lambda job_id: time.sleep(0.2) or original(job_id))
+    job_id = jobs.submit_job('test_slow_start', filepath=str(upload))
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = %s", (job_id,))
+        conn.commit()
+        cursor.close()
+
+    deadline = time.monotonic() + 5
+    while jobs.get_job(job_id)['state'] == 'queued' and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert jobs.get_job(job_id)['state'] == 'cancelled'
+    assert started == [] and not upload.exists()
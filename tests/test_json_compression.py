@@ -0,0 +1,79 @@
+"""JSON provider orjson dan kompresi respons, lewat endpoint Flask yang sebenarnya."""
+import gzip
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import compression
+import json_provider
+
+
+@pytest.fixture
+def orjson_client(flask_app):
+    pytest.importorskip('orjson')
+    assert json_provider.install_json_provider(flask_app.app) == 'orjson'
+    assert isinstance(flask_app.app.json, json_provider.OrjsonProvider)
+    return flask_app.app.test_client()
+
+
+def test_health_with_orjson_provider(orjson_client):
+    response = orjson_client.get('/api/health')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == {'status': 'ok'}
+
+
+def test_products_with_orjson_provider(orjson_client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'tester')
+    response = orjson_client.get('/api/products')
+    assert response.status_code == 200
+    assert [(p['barcode'], p['quantity']) for p in response.get_json()] == [('A1', 5)]
+
+
+def test_orjson_output_matches_default_provider():
+    pytest.importorskip('orjson')
+    app = Flask(__name__)
+    payload = {'b': [1, 2], 'a': {'when': datetime(2024, 1, 2, 3, 4, 5), 'price': Decimal('1.50')}}
+    with app.app_context():
+        expected = DefaultJSONProvider(app).response(payload).get_data()
+        actual = json_provider.OrjsonProvider(app).response(payload).get_data()
+    assert json.loads(actual) == json.loads(expected)
+    # Key tetap diurutkan seperti provider bawaan
+    assert actual.index(b'"a"') < actual.index(b'"b"')
+
+
+def _seed_catalog(backend, count=100):
+    for i in range(count):
+        backend.add_product(f'Produk dengan nama panjang {i}', f'899{i:010d}', i, 'tester')
+
+
+def test_large_response_gzip(client, sqlite_backend, monkeypatch):
+    monkeypatch.setattr(compression, 'ENCODINGS', ('gzip',))
+    _seed_catalog(sqlite_backend)
+
+    response = client.get('/api/products', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(json.loads(gzip.decompress(response.data))) == 100
+    assert response.get_etag()[0].endswith('-gzip')
+
+
+def test_brotli_preferred_when_available(client, sqlite_backend):
+    if compression.brotli is None:
+        pytest.skip("brotli tidak terpasang")
+    _seed_catalog(sqlite_backend)
+    response = client.get('/api/products', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert len(json.loads(compression.brotli.decompress(response.data))) == 100
+
+
+def test_no_compression_without_accept_encoding_or_small_body(client, sqlite_backend):
+    _seed_catalog(sqlite_backend)
+    assert 'Content-Encoding' not in client.get('/api/products', headers={'Accept-Encoding': ''}).headers
+    # Respons kecil tidak sebanding dengan biaya kompresi
+    assert 'Content-Encoding' not in client.get('/api/health', headers={'Accept-Encoding': 'gzip'}).headers
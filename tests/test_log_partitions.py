@@ -0,0 +1,163 @@
+"""Partisi bulanan inventory_logs: batas partisi dan bulk delete lewat TRUNCATE PARTITION."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import log_partitions
+
+
+def _partition_rows(*bounds):
+    """Baris information_schema.partitions untuk batas atas `bounds` (None = pmax)."""
+    return [{'name': f"p{log_partitions._add_months(upper, -1):%Y%m}" if upper else 'pmax',
+             'description': f"'{upper:%Y-%m-%d %H:%M:%S}'" if upper else 'MAXVALUE', 'rows': 10}
+            for upper in bounds]
+
+
+class FakeCursor:
+    """Cursor palsu untuk bulk_delete_logs: mencatat query, DELETE menghapus `delete_rows` baris per panggilan."""
+
+    def __init__(self, partitions, delete_rows=()):
+        self.partitions = partitions
+        self.delete_rows = list(delete_rows)
+        self.queries = []
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        self.queries.append((' '.join(query.split()), params))
+        if query.lstrip().startswith('DELETE'):
+            self.rowcount = self.delete_rows.pop(0) if self.delete_rows else 0
+
+    def fetchall(self):
+        return self.partitions
+
+    def fetchone(self):
+        return {'total': 7}
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    def install(partitions, delete_rows=()):
+        cursor = FakeCursor(partitions, delete_rows)
+        conn = FakeConnection(cursor)
+        monkeypatch.setattr(log_partitions, 'connect', lambda: conn)
+        return cursor, conn
+    return install
+
+
+def test_month_helpers():
+    assert log_partitions._add_months(datetime(2024, 11, 1), 3) == datetime(2025, 2, 1)
+    assert log_partitions._month_start(datetime(2024, 2, 29, 13, 5)) == datetime(2024, 2, 1)
+    assert log_partitions._partition_clause(datetime(2024, 12, 1)) == \
+        "PARTITION p202412 VALUES LESS THAN ('2025-01-01 00:00:00')"
+
+
+def test_list_partitions_bounds():
+    cursor = FakeCursor(_partition_rows(datetime(2024, 1, 1), datetime(2024, 2, 1), None))
+    partitions = log_partitions.list_partitions(cursor)
+    assert [(p['name'], p['lower'], p['upper']) for p in partitions] == [
+        ('p202312', None, datetime(2024, 1, 1)),
+        ('p202401', datetime(2024, 1, 1), datetime(2024, 2, 1)),
+        ('pmax', datetime(2024, 2, 1), None),
+    ]
+
+
+def test_bulk_delete_truncates_covered_partitions(fake_db):
+    cursor, conn = fake_db(
+        _partition_rows(datetime(2024, 1, 1), datetime(2024, 2, 1), datetime(2024, 3, 1), datetime(2024, 4, 1), None),
+        delete_rows=[3, 2],
+    )
+    deleted = log_partitions.bulk_delete_logs(datetime(2024, 1, 20), datetime(2024, 3, 10))
+
+    queries = [query for query, _ in cursor.queries]
+    # Februari tercakup penuh: truncate; tepi Januari dan Maret dihapus per chunk
+    assert "ALTER TABLE inventory_logs TRUNCATE PARTITION p202402" in queries
+    edges = [params[:2] for query, params in cursor.queries if query.startswith('DELETE')]
+    assert edges == [(datetime(2024, 1, 20), datetime(2024, 2, 1)), (datetime(2024, 3, 1), datetime(2024, 3, 10))]
+    assert deleted == 7 + 3 + 2
+
+
+def test_bulk_delete_in_chunks_without_partitions(fake_db):
+    cursor, conn = fake_db([], delete_rows=[2, 2, 1])
+    assert log_partitions.bulk_delete_logs(datetime(2024, 1, 1), datetime(2024, 2, 1), chunk_size=2) == 5
+    # Commit per chunk supaya lock baris dilepas di antara chunk
+    assert conn.commits == 3
+    assert all(params[-1] == 2 for _, params in cursor.queries if params)
+
+
+def test_sign_filter_never_truncates(fake_db):
+    cursor, _ = fake_db(_partition_rows(datetime(2024, 1, 1), datetime(2024, 2, 1), None), delete_rows=[4])
+    assert log_partitions.bulk_delete_logs(datetime(2023, 12, 1), datetime(2024, 3, 1), "Keluar") == 4
+    queries = [query for query, _ in cursor.queries]
+    assert not any('TRUNCATE' in query for query in queries)
+    assert queries[-1].endswith("AND qty_change < 0 LIMIT %s")
+
+
+def test_timelog_delete_endpoint(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'kasir')
+    sqlite_backend.apply_scan('A1', 1, 'out', 'kasir')
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+
+    response = client.post('/api/timelog/delete', json={
+        'start_date': today.isoformat(), 'end_date': tomorrow.isoformat(), 'type': 'Keluar',
+    })
+    assert response.status_code == 200 and response.get_json()['message'].startswith('1 log')
+    assert len(sqlite_backend.get_inventory_logs_filtered()) == 1
+    assert client.post('/api/timelog/delete', json={'start_date': today.isoformat()}).status_code == 400
+    assert client.post('/api/timelog/delete', json={'start_date': 'kemarin', 'end_date': 'besok'}).status_code == 400
+
+
+# --- MySQL ---
+
+def test_partitioned_bulk_delete(mysql_database):
+    from mysql_database import connect
+
+    now = datetime.now()
+    old_month = log_partitions._add_months(log_partitions._month_start(now), -3)
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO inventory_logs (name, barcode, qty_change, action_type, timestamp, username, current_stock) "
+            "VALUES ('Produk A', 'A1', 1, 'IN', %s, 'kasir', 1)",
+            [(old_month + timedelta(days=day),) for day in range(0, 80, 5)]
+        )
+        conn.commit()
+        cursor.close()
+
+    assert log_partitions.enable_partitioning(months_ahead=1)
+    assert not log_partitions.enable_partitioning()
+    assert log_partitions.ensure_future_partitions(months_ahead=2) == [
+        f"p{log_partitions._add_months(log_partitions._month_start(now), 2):%Y%m}"
+    ]
+
+    # Bulan kedua tercakup penuh, bulan pertama dan ketiga hanya sebagian
+    start = old_month + timedelta(days=10)
+    end = log_partitions._add_months(old_month, 2) + timedelta(days=5)
+    expected = sum(1 for day in range(0, 80, 5) if start <= old_month + timedelta(days=day) < end)
+    assert log_partitions.bulk_delete_logs(start, end) == expected
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) AS total FROM inventory_logs")
+        assert cursor.fetchone()['total'] == 16 - expected
+        cursor.close()
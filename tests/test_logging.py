@@ -0,0 +1,74 @@
+"""Logging antrian: level per modul dan sampling event berfrekuensi tinggi."""
+import logging
+
+import pytest
+
+import app_logging
+from app_logging import SamplingFilter
+
+
+def _record(msg, sample_every=None, name='scan'):
+    record = logging.LogRecord(name, logging.INFO, __file__, 1, msg, None, None)
+    if sample_every is not None:
+        record.sample_every = sample_every
+    return record
+
+
+def test_sampling_filter_passes_one_in_n():
+    sampling = SamplingFilter()
+    passed = [sampling.filter(_record("scan %s", sample_every=3)) for _ in range(7)]
+    assert passed == [True, False, False, True, False, False, True]
+    # Pesan tanpa sample_every (atau N <= 1) selalu lolos
+    assert all(sampling.filter(_record("lain")) for _ in range(3))
+    assert all(sampling.filter(_record("lain", sample_every=1)) for _ in range(3))
+
+
+def test_sampling_counts_per_message():
+    sampling = SamplingFilter()
+    assert sampling.filter(_record("a", sample_every=2))
+    assert sampling.filter(_record("b", sample_every=2))
+    assert not sampling.filter(_record("a", sample_every=2))
+
+
+def test_parse_levels():
+    assert app_logging._parse_levels(" mysql_database=debug, inventory_importer=WARNING,rusak") == {
+        'mysql_database': 'DEBUG', 'inventory_importer': 'WARNING',
+    }
+    assert app_logging._parse_levels(None) == {}
+
+
+@pytest.fixture
+def fresh_logging(monkeypatch):
+    """setup_logging di root logger, dibongkar lagi sesudah test."""
+    root = logging.getLogger()
+    monkeypatch.setattr(app_logging, '_listener', None)
+    monkeypatch.setattr(app_logging, '_queue_handler', None)
+    monkeypatch.setattr(root, 'level', root.level)
+    yield
+    app_logging.shutdown_logging()
+    if app_logging._queue_handler is not None:
+        root.removeHandler(app_logging._queue_handler)
+
+
+def test_setup_logging_writes_through_queue(fresh_logging, monkeypatch, capsys):
+    monkeypatch.setenv('PINVENTORY_LOG_LEVELS', 'test_logging.berisik=ERROR')
+    quiet = logging.getLogger('test_logging.berisik')
+    detail = logging.getLogger('test_logging.detail')
+    for logger in (quiet, detail):
+        monkeypatch.setattr(logger, 'level', logger.level)
+
+    app_logging.setup_logging(level='INFO', module_levels={'test_logging.detail': 'DEBUG'})
+    app_logging.setup_logging()  # panggilan kedua tidak memasang handler lagi
+    assert logging.getLogger().handlers.count(app_logging._queue_handler) == 1
+    assert (quiet.level, detail.level) == (logging.ERROR, logging.DEBUG)
+
+    logging.getLogger('test_logging.app').info("stok diperbarui")
+    quiet.warning("tidak ditulis")
+    for _ in range(4):
+        logging.getLogger('test_logging.app').info("scan", extra={'sample_every': 2})
+    app_logging.shutdown_logging()
+
+    output = capsys.readouterr().err
+    assert "INFO [test_logging.app] stok diperbarui" in output
+    assert "tidak ditulis" not in output
+    assert output.count("] scan") == 2
@@ -0,0 +1,124 @@
+"""GET /api/metrics: request per route, histogram latensi, query DB, throughput import/export."""
+import re
+
+import pytest
+
+import metrics
+
+SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    for name in ('_requests', '_latency', '_in_flight', '_db', '_rows'):
+        monkeypatch.setattr(metrics, name, {})
+
+
+def _scrape(client):
+    response = client.get('/api/metrics')
+    assert response.status_code == 200 and response.content_type == metrics.CONTENT_TYPE
+    return _parse(response.get_data(as_text=True))
+
+
+def _parse(text):
+    """Teks Prometheus jadi {(nama, label tanpa pid): nilai}."""
+    samples = {}
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            labels = tuple((k, v) for k, v in LABEL.findall(labels) if k != 'pid')
+            samples[(name, labels)] = float(value)
+    return samples
+
+
+def test_requests_counted_per_route_and_status(client, sqlite_backend, fresh_metrics):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    client.get('/api/products')
+    client.get('/api/products')
+    client.post('/api/scan', json={'barcode': 'Z9', 'action': 'in'})
+    client.get('/api/products', headers={'Authorization': 'Bearer bukan-token'})
+    client.get('/tidak-ada')
+
+    samples = _scrape(client)
+    route = (('route', '/api/products'), ('method', 'GET'))
+    assert samples[('pinventory_http_requests_total', route + (('status', '200'),))] == 2
+    # Ditolak auth tetap tercatat: hook metrics terpasang sebelum authenticate
+    assert samples[('pinventory_http_requests_total', route + (('status', '401'),))] == 1
+    assert samples[('pinventory_http_requests_total',
+                    (('route', '/api/scan'), ('method', 'POST'), ('status', '404')))] == 1
+    assert samples[('pinventory_http_requests_total',
+                    (('route', 'unmatched'), ('method', 'GET'), ('status', '404')))] == 1
+    assert samples[('pinventory_http_requests_in_flight', (('route', '/api/products'),))] == 0
+
+
+def test_latency_histogram_is_cumulative(client, fresh_metrics):
+    for _ in range(3):
+        client.get('/api/health')
+
+    samples = _scrape(client)
+    route = (('route', '/api/health'), ('method', 'GET'))
+    buckets = [samples[('pinventory_http_request_duration_seconds_bucket', route + (('le', le),))]
+               for le in [repr(b) for b in metrics.LATENCY_BUCKETS] + ['+Inf']]
+    assert buckets == sorted(buckets) and buckets[-1] == 3
+    assert samples[('pinventory_http_request_duration_seconds_count', route)] == 3
+    assert samples[('pinventory_http_request_duration_seconds_sum', route)] > 0
+
+
+def test_db_queries_per_route(client, sqlite_backend, fresh_metrics):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    client.post('/api/scan', json={'barcode': 'A1', 'action': 'in'})
+    client.get('/api/health')
+
+    samples = _scrape(client)
+    assert samples[('pinventory_db_queries_total', (('route', '/api/scan'),))] >= 2
+    assert samples[('pinventory_db_query_seconds_total', (('route', '/api/scan'),))] > 0
+    assert ('pinventory_db_queries_total', (('route', '/api/health'),)) not in samples
+    # add_product di luar request
+    assert samples[('pinventory_db_queries_total', (('route', metrics.BACKGROUND_ROUTE),))] >= 1
+
+
+def test_export_and_import_rows(client, sqlite_backend, fresh_metrics, tmp_path):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    for i in range(3):
+        sqlite_backend.add_product(f'Produk {i}', f'B{i}', 1, 'admin')
+    response = client.get('/api/products/export?format=csv')
+    assert response.status_code == 200 and len(response.get_data(as_text=True).splitlines()) == 4
+
+    catalog = tmp_path / 'katalog.xlsx'
+    pd.DataFrame({'name': ['Produk X'], 'barcode': ['X1'], 'quantity': [2]}).to_excel(catalog, index=False)
+    sqlite_backend.import_products(str(catalog), 'admin')
+
+    samples = _scrape(client)
+    assert samples[('pinventory_rows_total', (('operation', 'export'), ('kind', 'products')))] == 3
+    assert samples[('pinventory_rows_total', (('operation', 'import'), ('kind', 'products')))] == 1
+
+
+def test_cache_metrics_without_mysql_pool(client, fresh_metrics):
+    samples = _scrape(client)
+    assert ('pinventory_product_cache_lookups_total', (('result', 'hit'),)) in samples
+    assert not any(name.startswith('pinventory_db_pool') for name, _ in samples)
+
+
+def test_track_rows_and_label_escaping(fresh_metrics):
+    assert list(metrics.track_rows(iter('abc'), 'export', 'ti"me\nlog')) == ['a', 'b', 'c']
+    text = metrics.render()
+    assert 'kind="ti\\"me\\nlog"' in text
+    assert _parse(text)[('pinventory_rows_total', (('operation', 'export'), ('kind', 'ti\\"me\\nlog')))] == 3
+
+
+# --- MySQL ---
+
+def test_mysql_pool_and_query_metrics(mysql_database, monkeypatch, fresh_metrics):
+    import storage
+    from mysql_database import add_product
+
+    monkeypatch.setattr(storage, '_backend', storage.create_backend('mysql'))
+    add_product('Produk A', 'A1', 5, 'admin')
+
+    samples = _parse(metrics.render())
+    assert samples[('pinventory_db_queries_total', (('route', metrics.BACKGROUND_ROUTE),))] >= 1
+    assert samples[('pinventory_db_pool_connections', (('state', 'total'),))] >= 1
+    assert ('pinventory_db_pool_events_total', (('event', 'created'),)) in samples
@@ -0,0 +1,89 @@
+"""Migrasi skema: urutan versi, cek data ganda sebelum index unik, penggabungan barcode ganda."""
+import pytest
+
+import migrations
+from migrations import MIGRATIONS, MigrationError
+
+
+class ScriptedCursor:
+    """Cursor palsu: hasil fetch diambil berurutan dari `results`."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.queries = []
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+
+def test_migration_versions_are_sequential():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == list(range(1, len(MIGRATIONS) + 1))
+    assert all(description and callable(step) for _, description, step in MIGRATIONS)
+
+
+def test_require_unique_lists_duplicates():
+    duplicates = [{'value': f'B{i}', 'copies': 2} for i in range(migrations.DUPLICATE_SAMPLE + 3)]
+    cursor = ScriptedCursor([None, duplicates])
+    with pytest.raises(MigrationError) as excinfo:
+        migrations._require_unique(cursor, 'products', 'barcode', 'uq_products_barcode', "Gabungkan dulu.")
+    message = str(excinfo.value)
+    assert f"berisi {len(duplicates)} nilai ganda" in message and "'B0' (2x)" in message
+    assert "dan 3 lainnya" in message and message.endswith("Gabungkan dulu.")
+
+
+def test_require_unique_skips_existing_index_and_clean_data():
+    existing = ScriptedCursor([{'1': 1}])
+    migrations._require_unique(existing, 'products', 'barcode', 'uq_products_barcode', "")
+    assert len(existing.queries) == 1
+
+    clean = ScriptedCursor([None, []])
+    migrations._require_unique(clean, 'products', 'barcode', 'uq_products_barcode', "")
+
+
+def test_main_unknown_command(capsys):
+    assert migrations.main(['migrations.py', 'bukan-perintah']) == 2
+    assert 'Pemakaian' in capsys.readouterr().out
+
+
+# --- MySQL ---
+
+def test_migrate_is_idempotent(mysql_database):
+    assert migrations.get_schema_version() == MIGRATIONS[-1][0]
+    assert migrations.migrate() == []
+
+
+def test_duplicate_barcodes_block_unique_index_until_merged(mysql_database):
+    from mysql_database import connect
+
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("ALTER TABLE products DROP INDEX uq_products_barcode")
+        cursor.execute("DELETE FROM schema_migrations WHERE version = 2")
+        cursor.executemany("INSERT INTO products (name, barcode, quantity) VALUES (%s, %s, %s)",
+                           [('Produk A', 'A1', 2), ('Produk A', 'A1', 3), ('Produk B', 'B1', 1)])
+        cursor.execute("INSERT INTO product_groups (group_name) VALUES ('Grup')")
+        cursor.execute("INSERT INTO grouping_products (group_id, product_id) "
+                       "SELECT LAST_INSERT_ID(), MAX(id) FROM products WHERE barcode = 'A1'")
+        conn.commit()
+        cursor.close()
+
+    with pytest.raises(MigrationError, match="merge-duplicate-barcodes"):
+        migrations.migrate()
+
+    assert migrations.merge_duplicate_barcodes() == 1
+    assert migrations.migrate() == [2]
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT p.barcode, p.quantity, COUNT(gp.group_id) AS memberships FROM products p "
+                       "LEFT JOIN grouping_products gp ON gp.product_id = p.id GROUP BY p.id ORDER BY p.barcode")
+        rows = [(row['barcode'], row['quantity'], row['memberships']) for row in cursor.fetchall()]
+        cursor.close()
+    # Keanggotaan grup baris yang dihapus pindah ke baris yang dipertahankan
+    assert rows == [('A1', 5, 1), ('B1', 1, 0)]
@@ -0,0 +1,92 @@
+"""Keyset pagination dan proyeksi field untuk /api/products dan /api/timelog."""
+from datetime import date, datetime
+
+import pytest
+
+from pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, parse_fields, parse_limit
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(datetime(2024, 1, 2, 3, 4, 5), 42)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 2) == ['2024-01-02T03:04:05', '42']
+    assert decode_cursor('', 2) is None
+    for bad in ('%%%', encode_cursor(1, 2, 3)):
+        with pytest.raises(ValueError):
+            decode_cursor(bad, 2)
+
+
+def test_parse_limit_and_fields():
+    assert parse_limit(None) == 100 and parse_limit('0') == 1
+    assert parse_limit(str(MAX_PAGE_SIZE * 10)) == MAX_PAGE_SIZE
+    with pytest.raises(ValueError):
+        parse_limit('sepuluh')
+
+    assert parse_fields('', ('a', 'b')) is None
+    assert parse_fields('b, a,b', ('a', 'b')) == ['b', 'a']
+    with pytest.raises(ValueError):
+        parse_fields('a,password', ('a', 'b'))
+
+
+def _walk(client, url):
+    items, seen_cursors = [], 0
+    page = client.get(url).get_json()
+    items += page['items']
+    while page['next_cursor']:
+        seen_cursors += 1
+        page = client.get(f"{url}&cursor={page['next_cursor']}").get_json()
+        items += page['items']
+    return items, seen_cursors
+
+
+def test_products_keyset_walk(client, sqlite_backend):
+    for i in range(7):
+        sqlite_backend.add_product(f'Produk {i}', f'B{i}', i, 'admin')
+
+    items, pages = _walk(client, '/api/products?limit=3')
+    assert [p['barcode'] for p in items] == [f'B{i}' for i in range(7)] and pages == 2
+    assert set(items[0]) == {'id', 'name', 'barcode', 'quantity'}
+
+
+def test_products_cursor_stable_under_inserts(client, sqlite_backend):
+    for i in range(4):
+        sqlite_backend.add_product(f'Produk {i}', f'B{i}', i, 'admin')
+    first = client.get('/api/products?limit=2').get_json()
+
+    # Keyset (bukan OFFSET): baris baru tidak menggeser halaman berikutnya
+    sqlite_backend.add_product('Produk baru', 'B9', 1, 'admin')
+    second = client.get(f"/api/products?limit=2&cursor={first['next_cursor']}").get_json()
+    assert [p['barcode'] for p in second['items']] == ['B2', 'B3']
+
+
+def test_products_field_projection(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    body = client.get('/api/products?fields=barcode,quantity').get_json()
+    assert body == {'items': [{'barcode': 'A1', 'quantity': 5}], 'next_cursor': None}
+
+
+@pytest.mark.parametrize('query', ['fields=password', 'limit=abc', 'cursor=bukan-cursor'])
+def test_products_bad_parameters(client, query):
+    response = client.get(f'/api/products?{query}')
+    assert response.status_code == 400 and response.get_json()['success'] is False
+
+
+def test_products_without_paging_returns_full_list(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    assert isinstance(client.get('/api/products').get_json(), list)
+
+
+def test_timelog_keyset_walk_and_projection(client, sqlite_backend):
+    for i in range(3):
+        sqlite_backend.add_product(f'Produk {i}', f'B{i}', 5, 'admin')
+        sqlite_backend.apply_scan(f'B{i}', 1, 'out', 'kasir')
+    today = date.today().isoformat()
+
+    items, pages = _walk(client, f'/api/timelog?start={today}&end={today}&limit=4')
+    assert pages == 1 and len(items) == 6 and len({log['id'] for log in items}) == 6
+
+    keluar = client.get(f'/api/timelog?start={today}&end={today}&type=Keluar&fields=barcode,qty_change').get_json()
+    assert sorted(keluar['items'], key=lambda log: log['barcode']) == [
+        {'barcode': f'B{i}', 'qty_change': -1} for i in range(3)
+    ]
+    assert client.get(f'/api/timelog?start={today}&fields=password').status_code == 400
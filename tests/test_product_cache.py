@@ -0,0 +1,77 @@
+"""Cache produk per barcode: LRU, TTL, penolakan nilai basi dan invalidasi setelah commit."""
+import time
+
+from product_cache import MISS, ProductCache
+
+
+def test_hit_miss_and_copies():
+    cache = ProductCache(maxsize=10, ttl=60)
+    assert cache.get('A1') is MISS
+    cache.put('A1', {'name': 'Produk A', 'quantity': 5})
+
+    cached = cache.get('A1')
+    cached['quantity'] = 0  # pemanggil mengubah salinannya sendiri
+    assert cache.get('A1') == {'name': 'Produk A', 'quantity': 5}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (2, 1, round(2 / 3, 4))
+
+
+def test_lru_eviction():
+    cache = ProductCache(maxsize=2, ttl=60)
+    cache.put('A1', {'quantity': 1})
+    cache.put('B1', {'quantity': 2})
+    cache.get('A1')  # A1 jadi yang terbaru dipakai
+    cache.put('C1', {'quantity': 3})
+    assert cache.get('B1') is MISS
+    assert cache.get('A1') != MISS and cache.get('C1') != MISS
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry():
+    cache = ProductCache(ttl=0.01)
+    cache.put('A1', {'quantity': 1})
+    time.sleep(0.02)
+    assert cache.get('A1') is MISS and cache.stats()['size'] == 0
+
+
+def test_stale_read_not_stored():
+    cache = ProductCache()
+    token = cache.begin_read()
+    # Penulis commit dan invalidate sementara pembaca masih memegang baris lama
+    cache.invalidate('A1')
+    assert not cache.put_if_fresh('A1', {'quantity': 5}, token)
+    assert cache.get('A1') is MISS
+
+    token = cache.begin_read()
+    assert cache.put_if_fresh('A1', {'quantity': 4}, token)
+    cache.clear()
+    assert cache.get('A1') is MISS and cache.stats()['invalidations'] == 2
+
+
+def test_cache_stats_endpoint(client):
+    stats = client.get('/api/cache/products').get_json()
+    assert {'size', 'maxsize', 'ttl', 'hit_rate', 'hits', 'misses'} <= set(stats)
+
+
+# --- MySQL (write-through di mysql_database) ---
+
+def test_lookup_cached_and_invalidated_by_scan(mysql_database):
+    import scan_engine
+    from mysql_database import add_product, connect, get_product_by_barcode
+    from product_cache import product_cache
+
+    add_product('Produk A', 'A1', 5, 'admin')
+    assert get_product_by_barcode('A1') == {'name': 'Produk A', 'quantity': 5}
+    hits = product_cache.stats()['hits']
+    assert get_product_by_barcode('A1')['quantity'] == 5
+    assert product_cache.stats()['hits'] == hits + 1
+
+    scan_engine.apply_scan('A1', 2, 'out', 'kasir')
+    assert get_product_by_barcode('A1')['quantity'] == 3
+
+    # Scan di transaksi pemanggil yang di-rollback tidak mengotori cache
+    with connect() as conn:
+        scan_engine.apply_scan('A1', 1, 'out', 'kasir', conn=conn)
+        conn.rollback()
+    assert get_product_by_barcode('A1')['quantity'] == 3
+    assert get_product_by_barcode('X1') is None
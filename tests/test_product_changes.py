@@ -0,0 +1,96 @@
+"""Feed delta sync GET /api/products/changes."""
+import io
+
+import pytest
+
+
+def _changes(client, since=None, limit=None):
+    query = []
+    if since:
+        query.append(f'since={since}')
+    if limit:
+        query.append(f'limit={limit}')
+    response = client.get('/api/products/changes?' + '&'.join(query))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _synced(client):
+    first = _changes(client)
+    assert first['resync_required'] and first['items'] == []
+    return first['next_cursor']
+
+
+def test_changes_since_cursor(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    cursor = _synced(client)
+
+    client.post('/api/scan', json={'barcode': 'A1', 'qty': 1, 'action': 'out'})
+    client.post('/api/scan', json={'barcode': 'A1', 'qty': 1, 'action': 'out'})
+    sqlite_backend.add_product('Produk B', 'B1', 2, 'admin')
+
+    feed = _changes(client, cursor)
+    # Barcode yang berubah berkali-kali muncul sekali dengan nilai terbaru
+    assert [(p['barcode'], p['quantity']) for p in feed['items']] == [('A1', 3), ('B1', 2)]
+    assert feed['deleted'] == [] and not feed['has_more'] and not feed['resync_required']
+    assert _changes(client, feed['next_cursor'])['items'] == []
+
+
+def test_changes_paged(client, sqlite_backend):
+    cursor = _synced(client)
+    for i in range(5):
+        sqlite_backend.add_product(f'Produk {i}', f'B{i}', 1, 'admin')
+
+    barcodes, pages = [], 0
+    while True:
+        feed = _changes(client, cursor, limit=2)
+        barcodes += [p['barcode'] for p in feed['items']]
+        cursor = feed['next_cursor']
+        pages += 1
+        if not feed['has_more']:
+            break
+    assert barcodes == [f'B{i}' for i in range(5)] and pages == 3
+
+
+def test_batch_scan_recorded(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    sqlite_backend.add_product('Produk B', 'B1', 5, 'admin')
+    cursor = _synced(client)
+
+    client.post('/api/scan/batch', json=[{'barcode': 'B1', 'action': 'in'}, {'barcode': 'A1', 'action': 'out'}])
+    assert [p['barcode'] for p in _changes(client, cursor)['items']] == ['B1', 'A1']
+
+
+def test_import_and_pruned_history_require_resync(client, sqlite_backend, tmp_path, monkeypatch):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    cursor = _synced(client)
+
+    buffer = io.BytesIO()
+    pd.DataFrame({'name': ['Produk B'], 'barcode': ['B1'], 'quantity': [1]}).to_excel(buffer, index=False)
+    monkeypatch.chdir(tmp_path)
+    upload = (io.BytesIO(buffer.getvalue()), 'katalog.xlsx')
+    assert client.post('/api/products/import', data={'file': upload},
+                       content_type='multipart/form-data').status_code == 200
+    assert _changes(client, cursor)['resync_required']
+
+    # Riwayat sebelum cursor sudah dipangkas: klien tidak bisa mengejar lagi
+    cursor = _synced(client)
+    for i in range(3):
+        sqlite_backend.add_product(f'Produk {i}', f'C{i}', 1, 'admin')
+    sqlite_backend._conn().execute("DELETE FROM product_changes WHERE id < (SELECT MAX(id) FROM product_changes)")
+    assert _changes(client, cursor)['resync_required']
+
+
+def test_changes_reports_deleted_barcodes(client, sqlite_backend):
+    cursor = _synced(client)
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    sqlite_backend._conn().execute("DELETE FROM products WHERE barcode = 'A1'")
+    feed = _changes(client, cursor)
+    assert feed['items'] == [] and feed['deleted'] == ['A1']
+
+
+def test_changes_bad_cursor(client):
+    response = client.get('/api/products/changes?since=bukan-cursor')
+    assert response.status_code == 400 and response.get_json()['success'] is False
@@ -0,0 +1,82 @@
+"""Rollup harian pergerakan stok dan endpoint /api/timelog/summary."""
+from datetime import date, timedelta
+
+import pytest
+
+import rollups
+
+
+def test_movement_statements_aggregate_per_barcode_and_user():
+    statements = list(rollups.movement_statements([
+        ('A1', 'kasir', 5), ('A1', 'kasir', -2), ('A1', None, 1), ('B1', 'kasir', -3),
+    ]))
+    assert len(statements) == 1
+    query, params = statements[0]
+    assert query.count('(CURRENT_DATE()') == 3 and 'ON DUPLICATE KEY UPDATE' in query
+    rows = [tuple(params[i:i + 5]) for i in range(0, len(params), 5)]
+    assert rows == [('A1', 'kasir', 5, 2, 2), ('A1', '', 1, 0, 1), ('B1', 'kasir', 0, 3, 1)]
+
+
+def test_movement_statements_chunked(monkeypatch):
+    monkeypatch.setattr(rollups, '_ROLLUP_CHUNK', 2)
+    statements = list(rollups.movement_statements([(f'B{i}', 'kasir', 1) for i in range(5)]))
+    assert [len(params) // 5 for _, params in statements] == [2, 2, 1]
+    assert list(rollups.movement_statements([])) == []
+
+
+def _seed(backend):
+    backend.add_product('Produk A', 'A1', 5, 'kasir1')
+    backend.add_product('Produk B', 'B1', 2, 'kasir1')
+    backend.apply_scan('A1', 3, 'out', 'kasir2')
+    backend.apply_scan('B1', 1, 'in', 'kasir2')
+
+
+def test_summary_endpoint(client, sqlite_backend):
+    _seed(sqlite_backend)
+    today = date.today().isoformat()
+
+    body = client.get('/api/timelog/summary').get_json()
+    assert (body['start'], body['end'], body['group_by']) == (today, today, 'day')
+    assert body['summary'] == [{'day': today, 'qty_in': 8, 'qty_out': 3, 'events': 4}]
+
+    by_barcode = client.get(f'/api/timelog/summary?start={today}&group_by=barcode&username=kasir2').get_json()
+    assert [(row['barcode'], row['qty_in'], row['qty_out']) for row in by_barcode['summary']] == [
+        ('A1', 0, 3), ('B1', 1, 0),
+    ]
+    only_a1 = client.get(f'/api/timelog/summary?start={today}&group_by=username&barcode=A1').get_json()
+    assert [(row['username'], row['events']) for row in only_a1['summary']] == [('kasir1', 1), ('kasir2', 1)]
+
+
+@pytest.mark.parametrize('query', ['group_by=bulan', 'start=18-10-2026'])
+def test_summary_bad_parameters(client, query):
+    assert client.get(f'/api/timelog/summary?{query}').status_code == 400
+
+
+def test_ai_logs_endpoint(client, sqlite_backend):
+    _seed(sqlite_backend)
+    today = date.today().isoformat()
+    logs = client.get(f'/api/ai/logs?start_date={today}&end_date={today}&type=Keluar').get_json()
+    assert [(log['barcode'], log['qty_change']) for log in logs] == [('A1', -3)]
+
+
+# --- MySQL (tabel inventory_daily_rollups) ---
+
+def test_rollups_follow_writes_and_rebuild(mysql_database):
+    from storage import create_backend
+
+    backend = create_backend('mysql')
+    _seed(backend)
+    today = date.today()
+    expected = [{'day': today.isoformat(), 'qty_in': 8, 'qty_out': 3, 'events': 4}]
+    assert rollups.get_rollup_summary(today, today) == expected
+
+    # Hapus satu log: rollup hari itu ikut dikurangi
+    scan_out = next(log for log in backend.get_inventory_logs_filtered() if log['qty_change'] == -3)
+    assert backend.delete_inventory_log(scan_out['id'])
+    assert rollups.get_rollup_summary(today, today)[0]['qty_out'] == 0
+
+    # Rebuild dari inventory_logs menghasilkan angka yang sama dengan rollup inkremental
+    incremental = rollups.get_rollup_summary(today, today, 'barcode')
+    assert rollups.rebuild_rollups(today, today + timedelta(days=1)) == 3
+    assert rollups.get_rollup_summary(today, today, 'barcode') == incremental
+    assert rollups.get_rollup_summary(today - timedelta(days=2), today - timedelta(days=1)) == []
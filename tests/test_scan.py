@@ -0,0 +1,149 @@
+"""Scan stok lewat /api/scan dan /api/scan/batch: guard stok minus dalam satu transaksi."""
+import threading
+
+import pytest
+
+import scan_engine
+import storage
+from storage import NEGATIVE_STOCK, PRODUCT_NOT_FOUND
+
+
+def _scan(client, barcode, qty, action):
+    return client.post('/api/scan', json={'barcode': barcode, 'qty': qty, 'action': action, 'username': 'kasir'})
+
+
+def _run_concurrently(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_scan_in_and_out(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+
+    response = _scan(client, 'A1', 2, 'out')
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True, 'product': {'name': 'Produk A', 'quantity': 3}}
+    assert _scan(client, 'A1', 4, 'in').get_json()['product']['quantity'] == 7
+
+    logs = sqlite_backend.get_inventory_logs_filtered()
+    assert sorted((log['qty_change'], log['current_stock']) for log in logs) == [(-2, 3), (4, 7), (5, 5)]
+
+
+def test_scan_guard_rejects_negative_stock(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 2, 'admin')
+
+    response = _scan(client, 'A1', 3, 'out')
+    assert response.status_code == 400 and response.get_json()['message'] == NEGATIVE_STOCK
+    # Scan yang ditolak tidak mengubah stok dan tidak menulis log
+    assert sqlite_backend.get_product_by_barcode('A1')['quantity'] == 2
+    assert len(sqlite_backend.get_inventory_logs_filtered()) == 1
+
+
+def test_scan_unknown_barcode_and_bad_request(client, sqlite_backend):
+    response = _scan(client, 'X1', 1, 'in')
+    assert response.status_code == 404 and response.get_json()['message'] == PRODUCT_NOT_FOUND
+    assert client.post('/api/scan', json={'qty': 1}).status_code == 400
+    assert client.post('/api/scan', data='bukan json', content_type='application/json').status_code == 400
+
+
+def test_concurrent_scans_never_oversell(sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 5, 'admin')
+    outcomes = []
+    _run_concurrently(lambda: outcomes.append(sqlite_backend.apply_scan('A1', 1, 'out', 'kasir')[0]), 12)
+
+    assert outcomes.count(True) == 5
+    assert sqlite_backend.get_product_by_barcode('A1')['quantity'] == 0
+
+
+def test_scan_stats_endpoint(client, monkeypatch):
+    monkeypatch.setattr(scan_engine, '_stats', {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+    scan_engine.record_scan_time(2.0)
+    scan_engine.record_scan_time(4.0)
+    assert client.get('/api/scan/stats').get_json() == {'count': 2, 'avg_ms': 3.0, 'max_ms': 4.0}
+
+
+def test_batch_scan_applies_events_in_order(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 1, 'admin')
+    sqlite_backend.add_product('Produk B', 'B1', 0, 'admin')
+
+    response = client.post('/api/scan/batch', json={'events': [
+        {'barcode': 'A1', 'qty': 2, 'action': 'in', 'username': 'kasir'},
+        {'barcode': 'A1', 'qty': 3, 'action': 'out', 'username': 'kasir'},
+        {'barcode': 'B1', 'qty': 1, 'action': 'out', 'username': 'kasir'},
+        {'barcode': 'X1', 'qty': 1, 'action': 'in', 'username': 'kasir'},
+        {'qty': 1, 'action': 'in'},
+        'bukan event',
+    ]})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['applied'], body['failed']) == (2, 4)
+    # Event kedua memakai stok hasil event pertama di batch yang sama
+    assert [r['success'] for r in body['results']] == [True, True, False, False, False, False]
+    assert body['results'][1]['product']['quantity'] == 0
+    assert [r.get('message') for r in body['results'][2:4]] == [NEGATIVE_STOCK, PRODUCT_NOT_FOUND]
+    assert [r['index'] for r in body['results']] == list(range(6))
+    assert sqlite_backend.get_product_by_barcode('B1')['quantity'] == 0
+
+
+def test_batch_scan_accepts_bare_list(client, sqlite_backend):
+    sqlite_backend.add_product('Produk A', 'A1', 1, 'admin')
+    body = client.post('/api/scan/batch', json=[{'barcode': 'A1', 'action': 'in'}]).get_json()
+    assert body['applied'] == 1 and body['results'][0]['product']['quantity'] == 2
+
+
+def test_batch_scan_rejects_empty_and_oversized(client, monkeypatch):
+    assert client.post('/api/scan/batch', json={'events': []}).status_code == 400
+    assert client.post('/api/scan/batch', json={}).status_code == 400
+
+    monkeypatch.setattr(storage, 'MAX_BATCH_SIZE', 2)
+    events = [{'barcode': 'A1', 'action': 'in'}] * 3
+    assert client.post('/api/scan/batch', json={'events': events}).status_code == 413
+
+
+# --- MySQL (scan_engine) ---
+
+def test_scan_engine_guard_under_concurrency(mysql_database):
+    from mysql_database import add_product, get_product_by_barcode
+
+    add_product('Produk A', 'A1', 5, 'admin')
+    outcomes = []
+    _run_concurrently(lambda: outcomes.append(scan_engine.apply_scan('A1', 1, 'out', 'kasir')), 12)
+
+    assert [ok for ok, _ in outcomes].count(True) == 5
+    assert {result for ok, result in outcomes if not ok} == {NEGATIVE_STOCK}
+    assert get_product_by_barcode('A1')['quantity'] == 0
+    assert scan_engine.apply_scan('X1', 1, 'in', 'kasir') == (False, PRODUCT_NOT_FOUND)
+
+
+@pytest.mark.parametrize('action, expected', [('in', 6), ('out', 4)])
+def test_scan_engine_on_caller_connection(mysql_database, action, expected):
+    from mysql_database import add_product, connect, get_product_by_barcode
+
+    add_product('Produk A', 'A1', 5, 'admin')
+    with connect() as conn:
+        assert scan_engine.apply_scan('A1', 1, action, 'kasir', conn=conn)[0]
+        conn.rollback()
+    # Pemanggil yang memegang transaksi: rollback membatalkan scan
+    assert get_product_by_barcode('A1')['quantity'] == 5
+    with connect() as conn:
+        scan_engine.apply_scan('A1', 1, action, 'kasir', conn=conn)
+        conn.commit()
+    assert get_product_by_barcode('A1')['quantity'] == expected
+
+
+def test_scan_engine_batch(mysql_database):
+    from mysql_database import add_product, get_product_by_barcode
+
+    add_product('Produk A', 'A1', 1, 'admin')
+    results = scan_engine.apply_scan_batch([
+        {'barcode': 'A1', 'qty': 2, 'action': 'in', 'username': 'kasir'},
+        {'barcode': 'A1', 'qty': 5, 'action': 'out', 'username': 'kasir'},
+        {'barcode': 'A1', 'qty': 3, 'action': 'out', 'username': 'kasir'},
+        {'barcode': 'X1', 'qty': 1, 'action': 'in', 'username': 'kasir'},
+    ])
+    assert [r['success'] for r in results] == [True, False, True, False]
+    assert [r['product']['quantity'] for r in results if r['success']] == [3, 0]
+    assert get_product_by_barcode('A1')['quantity'] == 0
@@ -0,0 +1,130 @@
+"""Launcher produksi serve.py: opsi server, budget koneksi DB dan pemilihan gunicorn/waitress."""
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+import serve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_default_workers_and_threads():
+    assert serve.default_workers(1) == 3
+    assert serve.default_workers(4) == 9
+    assert serve.default_workers(32) == serve.MAX_WORKERS
+    assert (serve.default_threads(8), serve.default_threads(16)) == (4, 2)
+
+
+def test_server_options_from_env(monkeypatch):
+    monkeypatch.setenv('PINVENTORY_THREADS', '3')
+    monkeypatch.setenv('PINVENTORY_BACKLOG', '64')
+    monkeypatch.setenv('PINVENTORY_MAX_REQUESTS', '0')
+    options = serve.server_options(bind='127.0.0.1:9000', workers=2)
+    assert (options['bind'], options['workers'], options['threads']) == ('127.0.0.1:9000', 2, 3)
+    assert (options['backlog'], options['worker_connections'], options['max_requests']) == (64, 12, 0)
+    assert options['pidfile'] == os.path.join('tmp', 'pinventory.pid')
+
+    # Argumen menang atas env
+    assert serve.server_options(threads=5)['threads'] == 5
+
+
+def test_connection_budget_warning(monkeypatch, caplog):
+    # threads + JOB_WORKERS (2) = 6 koneksi per worker
+    monkeypatch.setattr(serve, 'DB_MAX_CONNECTIONS', 20)
+    with caplog.at_level(logging.WARNING, logger='serve'):
+        serve._check_connection_budget(serve.server_options(workers=2, threads=4))
+    assert not caplog.records
+
+    with caplog.at_level(logging.WARNING, logger='serve'):
+        serve._check_connection_budget(serve.server_options(workers=4, threads=4))
+    assert 'max_connections' in caplog.text
+
+
+def test_run_picks_server(monkeypatch):
+    calls = []
+    monkeypatch.setattr(serve, 'setup_logging', lambda: None)
+    monkeypatch.setattr(serve, 'run_gunicorn', lambda app, options, asgi: calls.append(('gunicorn', asgi)))
+    monkeypatch.setattr(serve, 'run_waitress', lambda app, options: calls.append(('waitress', False)))
+
+    monkeypatch.setattr(serve, '_gunicorn_available', lambda: False)
+    serve.run(object(), workers=1)
+    with pytest.raises(RuntimeError):
+        serve.run(object(), workers=1, asgi=True)
+
+    monkeypatch.setattr(serve, '_gunicorn_available', lambda: True)
+    monkeypatch.setattr(serve.sys, 'platform', 'linux')
+    serve.run(object(), workers=1, asgi=True)
+    assert calls == [('waitress', False), ('gunicorn', True)]
+
+
+def test_waitress_threads_bounded_by_pool(monkeypatch):
+    waitress = pytest.importorskip('waitress')
+    from mysql_database import POOL_CONFIG
+
+    captured = {}
+    monkeypatch.setattr(waitress, 'serve', lambda app, **kwargs: captured.update(kwargs))
+    serve.run_waitress(object(), serve.server_options(bind='127.0.0.1:0', workers=8, threads=4))
+    assert captured['threads'] == POOL_CONFIG['size'] + POOL_CONFIG['max_overflow']
+    assert captured['connection_limit'] == 8 * 16 and captured['listen'] == '127.0.0.1:0'
+
+
+def test_gunicorn_config(monkeypatch, tmp_path):
+    pytest.importorskip('gunicorn')
+    from gunicorn.app.base import BaseApplication
+
+    captured = {}
+    monkeypatch.setattr(BaseApplication, 'run', lambda self: captured.update(self.cfg.settings))
+    pidfile = str(tmp_path / 'run' / 'pinventory.pid')
+    serve.run_gunicorn(object(), serve.server_options(workers=3, threads=2, pidfile=pidfile))
+
+    assert captured['workers'].value == 3 and captured['threads'].value == 2
+    assert captured['worker_class'].value == 'gthread' and captured['preload_app'].value is True
+    assert captured['max_requests_jitter'].value == 500
+    assert os.path.isdir(tmp_path / 'run')
+
+
+def test_load_target():
+    import app
+    assert serve._load('app') is app.app
+    assert serve._load('app:app') is app.app
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_gunicorn_serves_and_stops(tmp_path):
+    pytest.importorskip('gunicorn')
+    port = _free_port()
+    env = dict(os.environ,
+               PINVENTORY_SQLITE_PATH=str(tmp_path / 'pinventory.db'),
+               PINVENTORY_STATE_DIR=str(tmp_path / 'state'),
+               PINVENTORY_PIDFILE=str(tmp_path / 'pinventory.pid'))
+    process = subprocess.Popen([sys.executable, 'serve.py', '--bind', f'127.0.0.1:{port}', '--workers', '2',
+                                '--threads', '2'], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=2) as response:
+                    assert response.status == 200
+                    break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise
+                time.sleep(0.2)
+        assert (tmp_path / 'pinventory.pid').read_text().strip() == str(process.pid)
+    finally:
+        # SIGTERM: master menunggu request berjalan lalu berhenti
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=30) == 0
@@ -0,0 +1,48 @@
+"""Endpoint Flask dengan PINVENTORY_STORAGE=sqlite: semua jalur data lewat backend."""
+from datetime import date
+
+import mysql_database
+
+
+def test_endpoints_use_sqlite_backend(client, sqlite_backend):
+    for i in range(3):
+        sqlite_backend.add_product(f'Produk {i}', f'B{i}', 10, 'kasir1')
+    sqlite_backend.apply_scan('B0', 4, 'out', 'kasir2')
+
+    page = client.get('/api/products?limit=2').get_json()
+    assert [p['barcode'] for p in page['items']] == ['B0', 'B1'] and page['next_cursor']
+
+    feed = client.get('/api/products/changes').get_json()
+    assert feed['resync_required']
+    assert client.get(f"/api/products/changes?since={feed['next_cursor']}").get_json()['items'] == []
+
+    today = date.today().isoformat()
+    summary = client.get(f'/api/timelog/summary?start={today}&group_by=username').get_json()['summary']
+    assert [(row['username'], row['qty_in'], row['qty_out']) for row in summary] == [
+        ('kasir1', 30, 0), ('kasir2', 0, 4),
+    ]
+
+    logs = client.get(f'/api/timelog?start={today}&end={today}&limit=10').get_json()
+    assert len(logs['items']) == 4
+
+    export = client.get('/api/products/export?format=ndjson')
+    assert export.status_code == 200 and len(export.data.splitlines()) == 3
+
+
+def test_jobs_and_pool_return_501(client):
+    assert client.get('/api/jobs').status_code == 501
+    assert client.get('/api/products/export?async=1').status_code == 501
+    assert client.get('/api/db/pool').status_code == 501
+
+
+def test_sqlite_queries_counted_without_mysql_pool(client, sqlite_backend, monkeypatch):
+    monkeypatch.setattr(mysql_database, '_pool', None)
+    sqlite_backend.add_product('Produk A', 'A1', 1, 'tester')
+    client.get('/api/products?limit=10')
+
+    body = client.get('/api/metrics').get_data(as_text=True)
+    counted = [line for line in body.splitlines()
+               if line.startswith('pinventory_db_queries_total{') and 'route="/api/products"' in line]
+    assert counted and int(counted[0].rsplit(' ', 1)[1]) >= 1
+    assert 'pinventory_db_pool_connections{' not in body
+    assert mysql_database._pool is None
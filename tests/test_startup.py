@@ -0,0 +1,70 @@
+"""Cold start: modul berat tidak dimuat saat import app, dan laporan startup_report.py."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import startup_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTTIME_STDERR = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   encodings
+import time:       200 |        300 | site
+import time:        50 |         50 |     json.decoder
+import time:       150 |        200 |   json
+import time:       400 |        600 | app
+bukan baris importtime
+"""
+
+
+def test_parse_importtime():
+    entries = startup_report.parse_importtime(IMPORTTIME_STDERR)
+    assert entries[0] == ('encodings', 100, 100, 1)
+    assert [(name, depth) for name, _, _, depth in entries] == [
+        ('encodings', 1), ('site', 0), ('json.decoder', 2), ('json', 1), ('app', 0)
+    ]
+
+
+def test_heavy_modules_loaded_only_on_export():
+    pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    script = (
+        "import sys, app\n"
+        "heavy = [m for m in ('pandas', 'openpyxl', 'xlsxwriter', 'mysql.connector', 'pyarrow') if m in sys.modules]\n"
+        "assert heavy == [], heavy\n"
+        "assert app.app.test_client().get('/api/products/export').status_code == 200\n"
+        "assert 'pandas' in sys.modules and 'openpyxl' in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+
+def test_report_for_app(monkeypatch, tmp_path, capsys):
+    monkeypatch.chdir(ROOT)
+    output = tmp_path / 'startup.json'
+    assert startup_report.main(['startup_report.py', '--top', '5', '--output', str(output)]) == 0
+
+    report = json.loads(output.read_text())['results']['startup']
+    assert report['health_status'] == 200 and report['heavy_loaded'] == []
+    assert report['import_ms'] <= report['ready_ms'] <= report['process_ready_ms']
+    assert report['rss_mb'] > 0
+    assert len(report['importtime']['top_cumulative_ms']) == 5
+    assert 'app' in report['importtime']['top_cumulative_ms']
+    assert 'siap dalam' in capsys.readouterr().out
+
+
+def test_report_flags_heavy_module_and_limits(monkeypatch, tmp_path, capsys):
+    pytest.importorskip('pandas')
+    monkeypatch.chdir(ROOT)
+    output = tmp_path / 'startup.json'
+    assert startup_report.main(['startup_report.py', '--module', 'pandas', '--max-rss-mb', '1',
+                                '--output', str(output)]) == 1
+
+    out = capsys.readouterr().out
+    assert 'modul berat termuat saat startup: numpy, pandas' in out
+    assert 'rss_mb' in out
+    assert json.loads(output.read_text())['results']['startup']['health_status'] is None
@@ -0,0 +1,255 @@
+"""
+Kesesuaian perilaku backend penyimpanan. Setiap test memakai database
+sementara: SQLite di tmp_path, MySQL di database `pinventory_test_<acak>`
+yang dibuat lalu di-drop. Kasus MySQL hanya jalan kalau
+PINVENTORY_TEST_MYSQL=1 (koneksi dari variabel PINVENTORY_DB_*).
+"""
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from storage import create_backend, PRODUCT_NOT_FOUND, NEGATIVE_STOCK
+
+
+@pytest.fixture(params=['sqlite', 'mysql'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        return create_backend('sqlite', path=str(tmp_path / 'pinventory.db'))
+    request.getfixturevalue('mysql_database')
+    return create_backend('mysql')
+
+
+def _today_range():
+    start = datetime.combine(date.today(), datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+# --- PRODUK & SCAN ---
+
+def test_add_product_and_scan(backend):
+    assert backend.get_product_by_barcode('A1') is None
+    backend.add_product('Produk A', 'A1', 5, 'tester')
+    assert backend.get_product_by_barcode('A1') == {'name': 'Produk A', 'quantity': 5}
+    backend.add_product('Produk A', 'A1', 2, 'tester')
+    assert backend.get_product_by_barcode('A1')['quantity'] == 7
+
+    assert backend.apply_scan('A1', 3, 'out', 'tester') == (True, {'name': 'Produk A', 'quantity': 4})
+    assert backend.apply_scan('A1', 10, 'out', 'tester') == (False, NEGATIVE_STOCK)
+    assert backend.apply_scan('A1x', 1, 'in', 'tester') == (False, PRODUCT_NOT_FOUND)
+
+
+def test_scan_batch(backend):
+    backend.add_product('Produk A', 'A1', 4, 'tester')
+    results = backend.apply_scan_batch([
+        {'barcode': 'A1', 'qty': 1, 'action': 'in', 'username': 'tester'},
+        {'barcode': 'A1', 'qty': 100, 'action': 'out', 'username': 'tester'},
+        {'barcode': 'A1x', 'qty': 1, 'action': 'in', 'username': 'tester'},
+    ])
+    assert [r['success'] for r in results] == [True, False, False]
+    assert results[0]['product']['quantity'] == 5
+    assert backend.get_product_by_barcode('A1')['quantity'] == 5
+
+
+def test_products_page_and_iter(backend):
+    for i in range(5):
+        backend.add_product(f'Produk {i}', f'B{i}', i, 'tester')
+
+    items, cursor = backend.get_products_page(limit=2)
+    barcodes = [p['barcode'] for p in items]
+    while cursor:
+        items, cursor = backend.get_products_page(cursor, limit=2)
+        barcodes += [p['barcode'] for p in items]
+    assert barcodes == [f'B{i}' for i in range(5)]
+
+    items, _ = backend.get_products_page(limit=10, fields=['barcode'])
+    assert items[0] == {'barcode': 'B0'}
+    assert [p['barcode'] for p in backend.iter_products()] == barcodes
+    assert {p['barcode'] for p in backend.get_all_products()} == set(barcodes)
+
+
+def test_import_products(backend, tmp_path):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    backend.add_product('Lama', 'OLD', 1, 'tester')
+
+    path = tmp_path / 'produk.xlsx'
+    pd.DataFrame({
+        'name': ['Produk A', 'Produk B', '', 'Produk A'],
+        'barcode': ['A1', 'B1', 'C1', 'A1'],
+        'quantity': [3, 4, 5, 2],
+    }).to_excel(path, index=False)
+
+    stats = backend.import_products(str(path), username='admin')
+    assert stats['imported'] == 2 and stats['skipped'] == 1
+    assert backend.get_product_by_barcode('OLD') is None
+    assert backend.get_product_by_barcode('A1') == {'name': 'Produk A', 'quantity': 5}
+
+
+# --- DELTA SYNC ---
+
+def test_product_changes(backend):
+    first = backend.get_product_changes(None)
+    assert first['resync_required']
+
+    backend.add_product('Produk A', 'A1', 5, 'tester')
+    backend.add_product('Produk B', 'B1', 5, 'tester')
+    changes = backend.get_product_changes(first['next_cursor'])
+    assert not changes['resync_required']
+    assert [p['barcode'] for p in changes['items']] == ['A1', 'B1']
+
+    backend.apply_scan('A1', 1, 'out', 'tester')
+    changes = backend.get_product_changes(changes['next_cursor'])
+    assert [(p['barcode'], p['quantity']) for p in changes['items']] == [('A1', 4)]
+
+    unchanged = backend.get_product_changes(changes['next_cursor'])
+    assert unchanged['items'] == [] and not unchanged['has_more']
+    with pytest.raises(ValueError):
+        backend.get_product_changes('bukan-cursor')
+
+
+def test_import_requires_resync(backend, tmp_path):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    cursor = backend.get_product_changes(None)['next_cursor']
+
+    path = tmp_path / 'produk.xlsx'
+    pd.DataFrame({'name': ['Produk A'], 'barcode': ['A1'], 'quantity': [1]}).to_excel(path, index=False)
+    backend.import_products(str(path))
+    assert backend.get_product_changes(cursor)['resync_required']
+
+
+# --- LOG ---
+
+def _seed_logs(backend):
+    backend.add_product('Produk A', 'A1', 5, 'kasir1')
+    backend.add_product('Produk A', 'A1', 2, 'kasir1')
+    backend.apply_scan('A1', 3, 'out', 'kasir2')
+    backend.apply_scan('A1', 1, 'in', 'kasir2')
+
+
+def test_logs_filtered_and_delete_one(backend):
+    _seed_logs(backend)
+    logs = backend.get_inventory_logs_filtered()
+    assert sorted(log['qty_change'] for log in logs) == [-3, 1, 2, 5]
+    assert isinstance(logs[0]['timestamp'], datetime)
+    incoming = backend.get_inventory_logs_filtered(change_type="Masuk")
+    assert len(incoming) == 3 and all(log['qty_change'] > 0 for log in incoming)
+
+    log_id = logs[0]['id']
+    assert backend.delete_inventory_log(log_id)
+    assert not backend.delete_inventory_log(log_id)
+    assert len(backend.get_inventory_logs_filtered()) == 3
+
+
+def test_logs_page_and_iter(backend):
+    _seed_logs(backend)
+    start, end = _today_range()
+
+    items, cursor = backend.get_inventory_logs_page(start, end, "Semua", limit=3)
+    ids = [log['id'] for log in items]
+    assert cursor is not None
+    items, cursor = backend.get_inventory_logs_page(start, end, "Semua", after=cursor, limit=3)
+    ids += [log['id'] for log in items]
+    assert cursor is None and len(set(ids)) == 4
+
+    keluar = list(backend.iter_inventory_logs(start, end, "Keluar"))
+    assert [log['qty_change'] for log in keluar] == [-3]
+    assert isinstance(keluar[0]['timestamp'], datetime)
+
+
+def test_delete_logs_range(backend):
+    _seed_logs(backend)
+    start, end = _today_range()
+    assert backend.delete_inventory_logs(start - timedelta(days=2), start) == 0
+    assert backend.delete_inventory_logs(start, end, "Keluar") == 1
+    assert backend.delete_inventory_logs(start, end) == 3
+    assert backend.get_inventory_logs_filtered() == []
+
+
+def test_movement_summary(backend):
+    _seed_logs(backend)
+    today = date.today()
+
+    by_day = backend.get_movement_summary(today, today, 'day')
+    assert by_day == [{'day': today.isoformat(), 'qty_in': 8, 'qty_out': 3, 'events': 4}]
+
+    by_user = backend.get_movement_summary(today.isoformat(), today.isoformat(), 'username')
+    assert [(row['username'], row['qty_in'], row['qty_out']) for row in by_user] == [
+        ('kasir1', 7, 0), ('kasir2', 1, 3),
+    ]
+    assert backend.get_movement_summary(today, today, 'barcode', username='kasir2')[0]['events'] == 2
+    assert backend.get_movement_summary(today - timedelta(days=3), today - timedelta(days=1)) == []
+    with pytest.raises(ValueError):
+        backend.get_movement_summary(today, today, 'bulan')
+
+
+# --- USER ---
+
+def test_staff(backend):
+    assert backend.get_user('staf1') is None
+    assert backend.add_staff('staf1', 'rahasia', '0800')
+    assert not backend.add_staff('staf1', 'rahasia', '0800')
+    user = backend.get_user('staf1')
+    assert user['role'] == 'staff' and user['password'].startswith('pbkdf2:')
+    assert any(s['username'] == 'staf1' for s in backend.get_all_staff())
+
+    assert backend.update_staff('staf1', phone='0811', role='supervisor')
+    assert backend.get_user('staf1')['role'] == 'supervisor'
+    backend.set_user_password('staf1', 'pbkdf2:sha256:1$x$y')
+    assert backend.get_user('staf1')['password'] == 'pbkdf2:sha256:1$x$y'
+    assert backend.delete_staff('staf1')
+    assert not backend.delete_staff('staf1')
+
+
+# --- GRUP PRODUK ---
+
+def test_product_groups(backend):
+    backend.add_product('Produk A', 'A1', 5, 'tester')
+    backend.add_product('Produk B', 'B1', 7, 'tester')
+    ids = [p['id'] for p in backend.iter_products()]
+
+    assert backend.create_product_group('Grup 1', 'cek', ids)
+    group = next(g for g in backend.get_all_product_groups() if g['group_name'] == 'Grup 1')
+    assert sorted(p['barcode'] for p in group['products']) == ['A1', 'B1']
+
+    summary = backend.get_product_group(group['id'])
+    assert summary['member_count'] == 2 and summary['total_quantity'] == 12
+    assert backend.get_product_group_summaries() == [summary]
+
+    members, cursor = backend.get_group_members_page(group['id'], limit=1)
+    assert [m['barcode'] for m in members] == ['A1'] and cursor is not None
+    members, cursor = backend.get_group_members_page(group['id'], cursor, limit=1)
+    assert [m['barcode'] for m in members] == ['B1'] and cursor is None
+
+    assert backend.update_product_group(group['id'], new_description="baru", new_product_ids=[])
+    summary = backend.get_product_group(group['id'])
+    assert summary['description'] == "baru" and summary['member_count'] == 0
+    assert backend.delete_product_group(group['id'])
+    assert backend.get_product_group(group['id']) is None
+
+
+# --- TOKEN DICABUT ---
+
+def test_revoked_tokens(backend):
+    now = int(time.time())
+    backend.add_revoked_token('jti-aktif', now + 60)
+    backend.add_revoked_token('jti-lama', now - 60)
+    assert backend.get_revoked_tokens() == {'jti-aktif': now + 60}
+
+    # Pencabutan ulang tidak memperpendek masa cabut
+    backend.add_revoked_token('jti-aktif', now + 30)
+    assert backend.get_revoked_tokens() == {'jti-aktif': now + 60}
+
+
+# --- ANTARMUKA ---
+
+def test_incomplete_backend_fails_at_creation():
+    from storage import StorageBackend
+
+    class Partial(StorageBackend):
+        def get_all_products(self):
+            return []
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -1,16 +1,17 @@
 import os
 from datetime import datetime, timedelta
-import xlsxwriter
-from mysql_database import get_inventory_logs_filtered
+from storage import get_backend
 from io import BytesIO
+import logging
 from flask import Flask, request, jsonify
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
 def get_time_logs(start_date_str=None, end_date_str=None, filter_type="Semua"):
     return get_filtered_logs(start_date_str, end_date_str, filter_type)
 
-def get_filtered_logs(start_date_str=None, end_date_str=None, filter_type="Semua"):
+def parse_date_range(start_date_str=None, end_date_str=None):
     try:
         # Tentukan start_date
         if start_date_str:
@@ -29,25 +30,63 @@ def get_filtered_logs(start_date_str=None, end_date_str=None, filter_type="Semua
     except Exception:
         raise ValueError("Format tanggal harus 'YYYY-MM-DD'")
 
+    return start_date, end_date
+
+def format_timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else value
+
+def format_log_row(row):
+    """Bentuk satu baris log seperti yang dikirim /api/timelog tanpa paging."""
+    return {
+        "name": row["name"],
+        "barcode": row["barcode"],
+        "qty_change": row["qty_change"],
+        "timestamp": format_timestamp(row["timestamp"]),
+        "username": row["username"],
+        "current_stock": row["current_stock"],
+    }
+
+def get_filtered_logs(start_date_str=None, end_date_str=None, filter_type="Semua"):
+    start_date, end_date = parse_date_range(start_date_str, end_date_str)
+
     # Ambil log dari database
-    raw_logs = get_inventory_logs_filtered(start_date, end_date, filter_type)
+    raw_logs = get_backend().get_inventory_logs_filtered(start_date, end_date, filter_type)
 
     # Format hasil
-    logs = []
-    for row in raw_logs:
-        logs.append({
-            "name": row["name"],
-            "barcode": row["barcode"],
-            "qty_change": row["qty_change"],
-            "timestamp": row["timestamp"].strftime('%Y-%m-%d %H:%M:%S') if isinstance(row["timestamp"], datetime) else row["timestamp"],
-            "username": row["username"],
-            "current_stock": row["current_stock"],
-        })
+    return [format_log_row(row) for row in raw_logs]
+
+def iter_time_logs(start_date_str=None, end_date_str=None, filter_type="Semua"):
+    """Seperti get_time_logs, tapi streaming dan timestamp tetap datetime."""
+    start_date, end_date = parse_date_range(start_date_str, end_date_str)
+    return get_backend().iter_inventory_logs(start_date, end_date, filter_type)
+
+def delete_time_logs(start_date_str, end_date_str, filter_type="Semua"):
+    """
+    Hapus log dengan timestamp di [start_date, end_date) (MySQL: lalu hitung
+    ulang rollup hari-hari tersebut). Kembalikan jumlah log yang dihapus.
+    """
+    try:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise ValueError("Format tanggal harus 'YYYY-MM-DD'")
+
+    return get_backend().delete_inventory_logs(start_date, end_date, filter_type)
 
-    return logs
+def get_time_logs_page(start_date_str=None, end_date_str=None, filter_type="Semua", after=None, limit=100, fields=None):
+    """Versi berhalaman dari get_time_logs. Kembalikan (logs, next_cursor)."""
+    start_date, end_date = parse_date_range(start_date_str, end_date_str)
+    rows, next_cursor = get_backend().get_inventory_logs_page(start_date, end_date, filter_type, after=after, limit=limit, fields=fields)
+
+    for row in rows:
+        if "timestamp" in row:
+            row["timestamp"] = format_timestamp(row["timestamp"])
+    return rows, next_cursor
 
 
 def export_logs_to_excel(logs):
+    import xlsxwriter
+
     output = BytesIO()
     workbook = xlsxwriter.Workbook(output, {'in_memory': True})
     worksheet = workbook.add_worksheet("Time Logs")
@@ -56,9 +95,6 @@ def export_logs_to_excel(logs):
     for col, header in enumerate(headers):
         worksheet.write(0, col, header)
 
-    # Buat format tanggal DD-MM-YYYY HH:MM:SS
-    datetime_format = workbook.add_format({'num_format': 'dd-mm-yyyy hh:mm:ss'})
-
     for row, log in enumerate(logs, start=1):
         qty = log.get("qty_change", 0)
         log_type = "Masuk" if qty > 0 else "Keluar"
@@ -102,4 +138,9 @@ def api_ai_logs():
         return jsonify({"error": str(e)}), 400
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5050)
+    if os.environ.get('PINVENTORY_DEBUG', '').lower() in ('1', 'true', 'yes'):
+        app.run(debug=True, host="0.0.0.0", port=5050)
+    else:
+        from serve import run
+        run(app, bind=os.environ.get('PINVENTORY_TIMELOG_BIND', '0.0.0.0:5050'),
+            pidfile=os.path.join('tmp', 'pinventory-timelog.pid'))